@@ -1,58 +1,130 @@
 import argparse
+import asyncio
+import fnmatch
+import glob
 import sys
 import os
-import jsonpickle
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, TextIO
+from typing import Dict, Iterator, List, TextIO, Union
 
 from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
-from compex.io.tsv import TsvReader, TsvDocument
-from compex.converter.tsv2competency import convert_tsv_to_competencies
+from compex.extractor.semgrex_cache import SemgrexCache
+from compex.io.serialization import dumps, encode_competencies
+from compex.converter.competency_cache import CompetencyCache
+from compex.converter.tsv2competency import convert_tsv_files_to_competencies
 from compex.evaluator.evaluators import EvaluationSet, FMeasureEvaluator
+from compex.evaluator.significance import bootstrap, compare
+from compex.instrumentation.metrics import metrics
 from compex.model.competency import Competency
-from compex.model.taxonomy import TaxonomyManager, BloomsTaxonomyDimensionEnum
+from compex.model.taxonomy import TaxonomyManager
+from compex.service.batcher import MicroBatcher
+from compex.service.server import ExtractionServer
 
+DEFAULT_BATCH_SIZE = 100
+BREAKDOWNS = ("sentence", "file", "taxonomy")
 
-class BloomsTaxonomyLevelEnumHandler(jsonpickle.handlers.BaseHandler):
-    def flatten(self, obj: BloomsTaxonomyDimensionEnum, data):  # data contains {}
-        data = obj.value
-        return data
+
+class LazyFile(object):
+    """A file matched by FileGlob, that is not opened before it's used.
+
+    Use it as context manager or call open() to get the opened file. name is the path of the file.
+    """
+
+    def __init__(self, path: Path, mode='r', bufsize=-1, encoding=None, errors=None):
+        self.path = path
+        self._mode = mode
+        self._bufsize = bufsize
+        self._encoding = encoding
+        self._errors = errors
+        self._file = None
+
+    @property
+    def name(self) -> str:
+        return str(self.path)
+
+    def open(self):
+        return open(self.path, self._mode, self._bufsize, self._encoding, self._errors)
+
+    def __fspath__(self) -> str:
+        return self.name
+
+    def __enter__(self):
+        self._file = self.open()
+        return self._file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.close()
+        self._file = None
+
+    def __repr__(self):
+        return "LazyFile({!r})".format(self.name)
 
 
 class FileGlob(object):
+    """Argument type of a single file, a folder or a glob pattern.
+
+    A single file is returned as LazyFile, like argparse.FileType returns an opened file. Folders are
+    scanned recursively and globs are expanded to a sorted list of LazyFiles of the files whose names
+    match glob_expr. If allow_stdin is set, "-" is returned as sys.stdin.
+    """
+
     def __init__(self, mode='r', glob_expr='**/*',
-                 bufsize=-1, encoding=None, errors=None):
+                 bufsize=-1, encoding=None, errors=None, allow_stdin=False):
         self._glob_expr = glob_expr
         self._mode = mode
         self._bufsize = bufsize
         self._encoding = encoding
         self._errors = errors
+        self._allow_stdin = allow_stdin
 
     def __call__(self, string):
+        if string == "-" and self._allow_stdin:
+            return sys.stdin
+
         is_File = False
+        is_Glob = False
         if os.path.isfile(string):
             is_File = True
         elif os.path.isdir(string):
             is_File = False
+        elif any(character in string for character in "*?["):
+            is_Glob = True
         else:
             raise argparse.ArgumentTypeError(
                 f"readable_dir:{string} is not a valid path or file")
 
         if is_File:
             file_paths = [Path(string)]
+        elif is_Glob:
+            # Only files matching glob_expr, so e.g. results written next to the inputs are never read as input
+            name_pattern = Path(self._glob_expr).name
+            file_paths = sorted(Path(file_path) for file_path in glob.glob(string, recursive=True)
+                                if os.path.isfile(file_path)
+                                and fnmatch.fnmatch(os.path.basename(file_path), name_pattern))
+            if not file_paths:
+                raise argparse.ArgumentTypeError(
+                    f"{string} does not match any {name_pattern} file")
         else:
-            file_paths = Path(string).rglob(self._glob_expr)
+            # Sort the matches, so the files are always processed in the same order
+            file_paths = sorted(file_path for file_path in Path(string).rglob(
+                self._glob_expr) if file_path.is_file())
+            if not file_paths:
+                raise argparse.ArgumentTypeError(
+                    f"{string} does not contain any {self._glob_expr} file")
 
+        # Files are only opened when they are used, one at a time
         files = []
         for file_path in file_paths:
-            try:
-                files.append(open(file_path, self._mode,
-                                  self._bufsize, self._encoding, self._errors))
-            except OSError as e:
+            if not os.access(file_path, os.R_OK):
                 message = "can't open '%s': %s"
-                raise argparse.ArgumentTypeError(message % (file_path, e))
+                raise argparse.ArgumentTypeError(
+                    message % (file_path, "Permission denied"))
+            files.append(LazyFile(file_path, self._mode,
+                                  self._bufsize, self._encoding, self._errors))
 
-        return files
+        return files[0] if is_File else files
 
 
 def parse_args():
@@ -70,78 +142,394 @@ def parse_args():
                                    help="Consider contexts in evaluation.")
     evaluation_parser.add_argument("--taxonomyjson", action="store", type=argparse.FileType("r"),
                                    help="Check if competency verbs are part of a taxonomy json file. If found, append their taxonomy dimension. If not found, a competency is not valid.")
+    evaluation_parser.add_argument("--batchsize", action="store", type=int, default=DEFAULT_BATCH_SIZE,
+                                   help=f"Maximum number of sentences sent to CoreNLP in a single request. Defaults to {DEFAULT_BATCH_SIZE}.")
+    evaluation_parser.add_argument("--corenlpurl", action="store",
+                                   help="Url of an already running CoreNLP server, e.g. http://localhost:9000. If not set, a CoreNLP server is started from $CORENLP_HOME.")
+    evaluation_parser.add_argument("--workers", action="store", type=int, default=1,
+                                   help="Number of requests sent to CoreNLP concurrently. Defaults to 1.")
+    evaluation_parser.add_argument("--cache", action="store",
+                                   help="Path to a cache file of CoreNLP responses. Only sentences missing in the cache are sent to CoreNLP.")
+    evaluation_parser.add_argument("--cachesize", action="store", type=int, default=SemgrexCache.DEFAULT_MAX_ENTRIES,
+                                   help=f"Maximum number of sentences in the cache. Least recently used sentences are evicted. Defaults to {SemgrexCache.DEFAULT_MAX_ENTRIES}.")
+    evaluation_parser.add_argument("--cachenamespace", action="store",
+                                   help="Name the cached responses of the server given by --corenlpurl are stored under, e.g. its CoreNLP version like corenlp-3.9.1. The version of an attached server is unknown, so it is required with --corenlpurl and --cache or --graphcache. Use a new name when the server changes.")
+    evaluation_parser.add_argument("--graphcache", action="store",
+                                   help="Path to a cache file of dependency graphs. CoreNLP only parses sentences missing in the cache, the semgrex pattern is matched locally. Use it to try different patterns quickly.")
+    evaluation_parser.add_argument("--pattern", action="store",
+                                   help="The semgrex pattern to extract competencies with. Defaults to the pattern of the SemgrexAnnotator.")
+    evaluation_parser.add_argument("--compact", action="store_true",
+                                   help="Print compact json without whitespace and with unescaped non-ASCII characters. Uses orjson, if installed.")
+    evaluation_parser.add_argument("--processes", action="store", type=int, default=1,
+                                   help="Number of processes reading the TSV files in parallel. Defaults to 1.")
+    evaluation_parser.add_argument("--breakdown", action="append", choices=BREAKDOWNS,
+                                   help="Add the evaluation results of each sentence, file or taxonomy dimension to the output. Can be repeated.")
+    evaluation_parser.add_argument("--bootstrap", action="store", type=int, default=0,
+                                   help="Number of bootstrap resamples of the sentences. If set, confidence intervals of precision, recall and f1 are added to the output. Resamples are calculated by --processes processes.")
+    evaluation_parser.add_argument("--confidence", action="store", type=float, default=0.95,
+                                   help="Confidence level of the bootstrap intervals. Defaults to 0.95.")
+    evaluation_parser.add_argument("--seed", action="store", type=int,
+                                   help="Seed of the bootstrap resampling, for reproducible intervals and p-values.")
+    evaluation_parser.add_argument("--comparepattern", action="store",
+                                   help="A second semgrex pattern to compare with --pattern. Adds the differences of precision, recall and f1, their confidence intervals and the p-values of a paired bootstrap test. Requires --bootstrap.")
+    evaluation_parser.add_argument("--goldcache", action="store",
+                                   help="Path to a cache file of the competencies converted from the TSV files. Only files missing in the cache or changed are read again.")
+    evaluation_parser.add_argument("--metrics", action="store",
+                                   help="Write timers, counters and latency histograms of the pipeline stages as json to this file when the run ends. Use - for stderr.")
 
     # Setup extract args
     extract_parser = subparser.add_parser(
         "extract", help="Extract competencies from given plain text sentences. Prints results as json to stdout.")
-    extract_parser.add_argument("sentences", nargs="?", action="store", type=argparse.FileType("r"), default=sys.stdin,
-                                help="Path to either a single file containing one sentence per line or a folder with multiple files. Can also be piped through stdin.")
+    extract_parser.add_argument("sentences", nargs="?", action="store", type=FileGlob(glob_expr="*.txt", mode="r", allow_stdin=True), default=sys.stdin,
+                                help="Path to either a single file containing one sentence per line, a folder with multiple *.txt files (scanned recursively) or a quoted glob pattern like \"handbooks/**/*.txt\", of which only *.txt files are read. Can also be piped through stdin or given as -. The files of a folder or glob are written to separate output files, see --outputdir.")
     extract_parser.add_argument("--taxonomyjson", action="store", type=argparse.FileType("r"),
                                 help="Check if competency verbs are part of a taxonomy json file. If found, append their taxonomy dimension. If not found, a competency is not valid.")
+    extract_parser.add_argument("--batchsize", action="store", type=int, default=DEFAULT_BATCH_SIZE,
+                                help=f"Maximum number of sentences sent to CoreNLP in a single request. Defaults to {DEFAULT_BATCH_SIZE}.")
+    extract_parser.add_argument("--corenlpurl", action="store",
+                                help="Url of an already running CoreNLP server, e.g. http://localhost:9000. If not set, a CoreNLP server is started from $CORENLP_HOME.")
+    extract_parser.add_argument("--workers", action="store", type=int, default=1,
+                                help="Number of requests sent to CoreNLP concurrently. Defaults to 1.")
+    extract_parser.add_argument("--cache", action="store",
+                                help="Path to a cache file of CoreNLP responses. Only sentences missing in the cache are sent to CoreNLP.")
+    extract_parser.add_argument("--cachesize", action="store", type=int, default=SemgrexCache.DEFAULT_MAX_ENTRIES,
+                                help=f"Maximum number of sentences in the cache. Least recently used sentences are evicted. Defaults to {SemgrexCache.DEFAULT_MAX_ENTRIES}.")
+    extract_parser.add_argument("--cachenamespace", action="store",
+                                help="Name the cached responses of the server given by --corenlpurl are stored under, e.g. its CoreNLP version like corenlp-3.9.1. The version of an attached server is unknown, so it is required with --corenlpurl and --cache or --graphcache. Use a new name when the server changes.")
+    extract_parser.add_argument("--graphcache", action="store",
+                                help="Path to a cache file of dependency graphs. CoreNLP only parses sentences missing in the cache, the semgrex pattern is matched locally. Use it to try different patterns quickly.")
+    extract_parser.add_argument("--pattern", action="store",
+                                help="The semgrex pattern to extract competencies with. Defaults to the pattern of the SemgrexAnnotator.")
+    extract_parser.add_argument("--ndjson", action="store_true",
+                                help="Stream the input line by line and print one json object per sentence as soon as it is annotated (newline delimited json). Memory usage does not grow with the input size.")
+    extract_parser.add_argument("--compact", action="store_true",
+                                help="Print compact json without whitespace and with unescaped non-ASCII characters. Uses orjson, if installed.")
+    extract_parser.add_argument("--outputdir", action="store",
+                                help="Directory to write the results of each input file to, as <name>.json or <name>.ndjson. Keeps the folder structure of the input. If not set, results of the files of a folder or glob are written next to them, results of a single file or stdin are printed.")
+    extract_parser.add_argument("--metrics", action="store",
+                                help="Write timers, counters and latency histograms of the pipeline stages as json to this file when the run ends. Use - for stderr.")
+    extract_parser.add_argument("--fileworkers", action="store", type=int, default=1,
+                                help="Number of input files processed concurrently. All files share one CoreNLP server. Defaults to 1.")
+
+    # Setup serve args
+    serve_parser = subparser.add_parser(
+        "serve", help="Serve the extraction over HTTP with a warm CoreNLP server. POST sentences to /extract, one per line or as json list.")
+    serve_parser.add_argument("--host", action="store", default="127.0.0.1",
+                              help="Host to listen on. Defaults to 127.0.0.1.")
+    serve_parser.add_argument("--port", action="store", type=int, default=8000,
+                              help="Port to listen on. Defaults to 8000.")
+    serve_parser.add_argument("--maxwait", action="store", type=float, default=5,
+                              help="Maximum time in milliseconds a sentence waits for sentences of concurrent requests to be batched with. Defaults to 5.")
+    serve_parser.add_argument("--taxonomyjson", action="store", type=argparse.FileType("r"),
+                              help="Check if competency verbs are part of a taxonomy json file. If found, append their taxonomy dimension. If not found, a competency is not valid.")
+    serve_parser.add_argument("--batchsize", action="store", type=int, default=DEFAULT_BATCH_SIZE,
+                              help=f"Maximum number of sentences of a batch, sent to CoreNLP in a single request. Defaults to {DEFAULT_BATCH_SIZE}.")
+    serve_parser.add_argument("--corenlpurl", action="store",
+                              help="Url of an already running CoreNLP server, e.g. http://localhost:9000. If not set, a CoreNLP server is started from $CORENLP_HOME.")
+    serve_parser.add_argument("--workers", action="store", type=int, default=1,
+                              help="Number of batches sent to CoreNLP concurrently. Defaults to 1.")
+    serve_parser.add_argument("--cache", action="store",
+                              help="Path to a cache file of CoreNLP responses. Only sentences missing in the cache are sent to CoreNLP.")
+    serve_parser.add_argument("--cachesize", action="store", type=int, default=SemgrexCache.DEFAULT_MAX_ENTRIES,
+                              help=f"Maximum number of sentences in the cache. Least recently used sentences are evicted. Defaults to {SemgrexCache.DEFAULT_MAX_ENTRIES}.")
+    serve_parser.add_argument("--cachenamespace", action="store",
+                              help="Name the cached responses of the server given by --corenlpurl are stored under, e.g. its CoreNLP version like corenlp-3.9.1. The version of an attached server is unknown, so it is required with --corenlpurl and --cache or --graphcache. Use a new name when the server changes.")
+    serve_parser.add_argument("--graphcache", action="store",
+                              help="Path to a cache file of dependency graphs. CoreNLP only parses sentences missing in the cache, the semgrex pattern is matched locally.")
+    serve_parser.add_argument("--pattern", action="store",
+                              help="The semgrex pattern to extract competencies with. Defaults to the pattern of the SemgrexAnnotator.")
+    serve_parser.add_argument("--compact", action="store_true",
+                              help="Answer compact json without whitespace and with unescaped non-ASCII characters. Uses orjson, if installed.")
+    serve_parser.add_argument("--metrics", action="store",
+                              help="Write timers, counters and latency histograms of the pipeline stages as json to this file when the server stops. Use - for stderr.")
 
     args = parser.parse_args()
 
     # Error handling
+    if args.mode in ("evaluate", "extract", "serve"):
+        if args.batchsize < 1:
+            parser.error("--batchsize must be at least 1.")
+        if args.workers < 1:
+            parser.error("--workers must be at least 1.")
+        if args.cachesize < 1:
+            parser.error("--cachesize must be at least 1.")
+        if args.cachenamespace and not args.corenlpurl:
+            parser.error("--cachenamespace requires --corenlpurl.")
+        if args.corenlpurl and (args.cache or args.graphcache) and not args.cachenamespace:
+            parser.error("--cache and --graphcache require --cachenamespace with --corenlpurl.")
     if args.mode == "evaluate":
         if args.contexts and args.objects is False:
             parser.error("--contexts requires --objects.")
+        if args.processes < 1:
+            parser.error("--processes must be at least 1.")
+        if args.bootstrap < 0:
+            parser.error("--bootstrap must not be negative.")
+        if not 0 < args.confidence < 1:
+            parser.error("--confidence must be between 0 and 1.")
+        if args.comparepattern and args.bootstrap < 1:
+            parser.error("--comparepattern requires --bootstrap.")
+    if args.mode == "extract":
+        if args.fileworkers < 1:
+            parser.error("--fileworkers must be at least 1.")
+    if args.mode == "serve":
+        if args.maxwait < 0:
+            parser.error("--maxwait must not be negative.")
 
     return args
 
 
-def evaluate(tsv_files: List[TextIO], consider_objects: bool = False,
-             consider_contexts: bool = False, taxonomy_json: TextIO = None):
+@contextmanager
+def create_annotator(batch_size: int = DEFAULT_BATCH_SIZE, corenlp_url: str = None, workers: int = 1,
+                     cache_path: str = None, cache_size: int = SemgrexCache.DEFAULT_MAX_ENTRIES,
+                     graph_cache_path: str = None, pattern: str = None,
+                     cache_namespace: str = None) -> Iterator[SemgrexAnnotator]:
+    cache = SemgrexCache(cache_path, cache_size) if cache_path else None
+    graph_cache = SemgrexCache(
+        graph_cache_path, cache_size) if graph_cache_path else None
+    annotator = SemgrexAnnotator(
+        batch_size=batch_size, workers=workers, cache=cache, graph_cache=graph_cache)
+    if pattern:
+        annotator.pattern = pattern
+    if corenlp_url:
+        annotator.session = annotator.create_session(corenlp_url, cache_namespace)
+    try:
+        yield annotator
+    finally:
+        for used_cache in (cache, graph_cache):
+            if used_cache is not None:
+                used_cache.close()
+
+
+def evaluate(tsv_files: Union[LazyFile, List[LazyFile]], consider_objects: bool = False,
+             consider_contexts: bool = False, taxonomy_json: TextIO = None, batch_size: int = DEFAULT_BATCH_SIZE,
+             corenlp_url: str = None, workers: int = 1, cache_path: str = None,
+             cache_size: int = SemgrexCache.DEFAULT_MAX_ENTRIES, graph_cache_path: str = None, pattern: str = None,
+             compact: bool = False, processes: int = 1, breakdowns: List[str] = None, resamples: int = 0,
+             confidence: float = 0.95, seed: int = None, compare_pattern: str = None,
+             gold_cache_path: str = None, cache_namespace: str = None):
     taxonomy_verbs = None
     if taxonomy_json:
         taxonomy_manager = TaxonomyManager()
         taxonomy_verbs = taxonomy_manager.read_json(taxonomy_json)
-        jsonpickle.handlers.registry.register(
-            BloomsTaxonomyDimensionEnum, BloomsTaxonomyLevelEnumHandler)
 
-    test_data: Dict[str, List[Competency]] = {}
+    if isinstance(tsv_files, LazyFile):
+        tsv_files = [tsv_files]
+    sentence_files: Dict[str, str] = {}
+    gold_cache = CompetencyCache(gold_cache_path) if gold_cache_path else None
+    try:
+        test_data: Dict[str, List[Competency]] = convert_tsv_files_to_competencies(
+            [tsv_file.name for tsv_file in tsv_files], processes, sentence_files, gold_cache)
+    finally:
+        if gold_cache is not None:
+            gold_cache.close()
     text: List[str] = []
 
-    reader: TsvReader = TsvReader()
-    for tsv_file in tsv_files:
-        document: TsvDocument = reader.read_tsv(tsv_file)
-        test_data.update(convert_tsv_to_competencies(document))
-
     for sentence in test_data:
         text.append(sentence)
 
-    annotator = SemgrexAnnotator()
-    annotated_data = annotator.annotate(text, taxonomy_verbs)
+    with create_annotator(batch_size, corenlp_url, workers, cache_path, cache_size,
+                          graph_cache_path, pattern, cache_namespace) as annotator, annotator:
+        annotated_data = annotator.annotate(text, taxonomy_verbs)
+        if compare_pattern:
+            annotator.pattern = compare_pattern
+            compare_data = annotator.annotate(text, taxonomy_verbs)
 
     evaluation_set = EvaluationSet(test_data, annotated_data)
 
     evaluator = FMeasureEvaluator()
-    result = evaluator.evaluate_with_annotated_sentences(
+    counts = evaluator.count(
         evaluation_set, consider_objects, consider_contexts)
-    output_json = jsonpickle.encode(result, unpicklable=False)
+    if compare_pattern:
+        compare_counts = evaluator.count(EvaluationSet(test_data, compare_data),
+                                         consider_objects, consider_contexts)
+
+    result = counts.summary()
+    for breakdown in dict.fromkeys(breakdowns or []):
+        if breakdown == "sentence":
+            result["by_sentence"] = counts.by_sentence()
+        elif breakdown == "file":
+            result["by_file"] = counts.by_file(sentence_files)
+        elif breakdown == "taxonomy":
+            result["by_taxonomy_dimension"] = counts.by_taxonomy_dimension()
+    if resamples:
+        result["bootstrap"] = bootstrap(
+            counts, resamples, confidence, seed, processes)
+    if compare_pattern:
+        result["comparison"] = {
+            "pattern": compare_pattern,
+            "evaluation": compare_counts.summary(),
+            "differences": compare(counts, compare_counts, resamples, confidence, seed, processes)
+        }
+    output_json = dumps(result, compact)
     print(output_json)
 
 
-def extract(text_file: TextIO, taxonomy_json: TextIO):
+def extract(text_files: Union[TextIO, LazyFile, List[LazyFile]], taxonomy_json: TextIO, batch_size: int = DEFAULT_BATCH_SIZE,
+            corenlp_url: str = None, workers: int = 1, cache_path: str = None,
+            cache_size: int = SemgrexCache.DEFAULT_MAX_ENTRIES, graph_cache_path: str = None, pattern: str = None,
+            ndjson: bool = False, compact: bool = False, output_dir: str = None, file_workers: int = 1,
+            cache_namespace: str = None):
+    taxonomy_verbs = None
+    if taxonomy_json:
+        taxonomy_manager = TaxonomyManager()
+        taxonomy_verbs = taxonomy_manager.read_json(taxonomy_json)
+    with create_annotator(batch_size, corenlp_url, workers, cache_path, cache_size,
+                          graph_cache_path, pattern, cache_namespace) as annotator:
+        # Only a single explicit file or stdin is printed, the files of a folder or glob are always written
+        # to their own output files, even if only one file matched
+        if isinstance(text_files, LazyFile) and output_dir is None:
+            with text_files as text_file:
+                write_competencies(annotator, text_file, sys.stdout,
+                                   taxonomy_verbs, ndjson, compact)
+        elif isinstance(text_files, LazyFile):
+            extract_files(annotator, [text_files], taxonomy_verbs,
+                          ndjson, compact, output_dir, file_workers)
+        elif not isinstance(text_files, list):
+            write_competencies(annotator, text_files, sys.stdout,
+                               taxonomy_verbs, ndjson, compact)
+        else:
+            extract_files(annotator, text_files, taxonomy_verbs,
+                          ndjson, compact, output_dir, file_workers)
+
+
+def extract_files(annotator: SemgrexAnnotator, text_files: List[LazyFile], taxonomy_verbs: Dict = None,
+                  ndjson: bool = False, compact: bool = False, output_dir: str = None, file_workers: int = 1):
+    """Extracts competencies of multiple files concurrently and writes them to one output file per input file.
+
+    All files share the CoreNLP session of the annotator, that is started once, when the first sentence
+    is missing in the caches. Raises a ValueError before any file is written, if an output file would
+    overwrite an input file or the output file of another input file.
+    """
+
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(text_file.name))
+                               for text_file in text_files]) if text_files else None
+    output_paths = check_output_paths([text_file.name for text_file in text_files],
+                                      [create_output_path(text_file.name, root, output_dir, ndjson)
+                                       for text_file in text_files])
+    owns_session = annotator.session is None
+    if owns_session:
+        annotator.session = annotator.create_session()
+
+    def extract_file(text_file: LazyFile, output_path: Path):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with text_file as input, open(output_path, "w") as output:
+            write_competencies(annotator, input, output,
+                               taxonomy_verbs, ndjson, compact)
+
+    try:
+        with ThreadPoolExecutor(max_workers=file_workers) as executor:
+            for future in [executor.submit(extract_file, text_file, output_path)
+                           for text_file, output_path in zip(text_files, output_paths)]:
+                future.result()
+    finally:
+        if owns_session:
+            annotator.session.stop()
+            annotator.session = None
+
+
+def serve(taxonomy_json: TextIO = None, batch_size: int = DEFAULT_BATCH_SIZE, corenlp_url: str = None, workers: int = 1,
+          cache_path: str = None, cache_size: int = SemgrexCache.DEFAULT_MAX_ENTRIES, graph_cache_path: str = None,
+          pattern: str = None, compact: bool = False, host: str = "127.0.0.1", port: int = 8000, max_wait: float = 5,
+          cache_namespace: str = None):
+    """Serves the extraction over HTTP until interrupted. CoreNLP is started once and kept running."""
+
     taxonomy_verbs = None
     if taxonomy_json:
         taxonomy_manager = TaxonomyManager()
         taxonomy_verbs = taxonomy_manager.read_json(taxonomy_json)
-        jsonpickle.handlers.registry.register(
-            BloomsTaxonomyDimensionEnum, BloomsTaxonomyLevelEnumHandler)
+    with create_annotator(batch_size, corenlp_url, workers, cache_path, cache_size,
+                          graph_cache_path, pattern, cache_namespace) as annotator, annotator:
+        batcher = MicroBatcher(annotator, taxonomy_verbs,
+                               max_wait=max_wait / 1000)
+        server = ExtractionServer(batcher, host, port, compact)
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+
+
+def create_output_path(input_path: str, root: str, output_dir: str = None, ndjson: bool = False) -> Path:
+    """Creates the path of the output file of an input file.
+
+    The output file is placed next to the input file or, if output_dir is set, at the path of
+    the input file relative to root in output_dir. Its suffix is .json or .ndjson.
+    """
+
+    suffix = ".ndjson" if ndjson else ".json"
+    if output_dir is None:
+        return Path(input_path).with_suffix(suffix)
+    relative_path = os.path.relpath(os.path.abspath(input_path), root)
+    return Path(output_dir, relative_path).with_suffix(suffix)
+
+
+def check_output_paths(input_paths: List[str], output_paths: List[Path]) -> List[Path]:
+    """Checks, that no output path is an input path or the output path of another input path.
+
+    Returns the output paths, raises a ValueError naming the conflicting files otherwise.
+    """
+
+    inputs = {os.path.realpath(input_path): input_path for input_path in input_paths}
+    outputs: Dict[str, str] = {}
+    for input_path, output_path in zip(input_paths, output_paths):
+        resolved = os.path.realpath(output_path)
+        if resolved in inputs:
+            raise ValueError(
+                f"The output file of {input_path} would overwrite the input file {inputs[resolved]}.")
+        if resolved in outputs:
+            raise ValueError(
+                f"{outputs[resolved]} and {input_path} would both be written to {output_path}.")
+        outputs[resolved] = input_path
+    return output_paths
+
+
+def write_competencies(annotator: SemgrexAnnotator, text_file: TextIO, output: TextIO, taxonomy_verbs: Dict = None,
+                       ndjson: bool = False, compact: bool = False):
+    """Extracts competencies of a file with one sentence per line and writes them as json or newline delimited json."""
+
+    if ndjson:
+        for sentence, competencies in annotator.annotate_stream(text_file, taxonomy_verbs):
+            print(encode_competencies(
+                {sentence: competencies}, compact), file=output, flush=True)
+        return
     text = text_file.readlines()
-    annotator = SemgrexAnnotator()
     result = annotator.annotate(text, taxonomy_verbs)
-    output_json = jsonpickle.encode(result, unpicklable=False)
-    print(output_json)
+    output_json = encode_competencies(result, compact)
+    print(output_json, file=output)
+
+
+def write_metrics(path: str):
+    """Writes the metrics of the pipeline stages as json to a file or, if path is "-", to stderr."""
+
+    output_json = dumps(metrics.snapshot())
+    if path == "-":
+        print(output_json, file=sys.stderr)
+    else:
+        with open(path, "w") as metrics_file:
+            print(output_json, file=metrics_file)
 
 
 def main():
     args = parse_args()
 
-    if args.mode == "extract":
-        extract(args.sentences, args.taxonomyjson)
-    elif args.mode == "evaluate":
-        evaluate(args.tsvpath, args.objects, args.contexts, args.taxonomyjson)
+    try:
+        if args.mode == "extract":
+            extract(args.sentences, args.taxonomyjson,
+                    args.batchsize, args.corenlpurl, args.workers, args.cache, args.cachesize,
+                    args.graphcache, args.pattern, args.ndjson, args.compact, args.outputdir, args.fileworkers,
+                    args.cachenamespace)
+        elif args.mode == "serve":
+            serve(args.taxonomyjson, args.batchsize, args.corenlpurl, args.workers, args.cache, args.cachesize,
+                  args.graphcache, args.pattern, args.compact, args.host, args.port, args.maxwait,
+                  args.cachenamespace)
+        elif args.mode == "evaluate":
+            evaluate(args.tsvpath, args.objects, args.contexts,
+                     args.taxonomyjson, args.batchsize, args.corenlpurl, args.workers, args.cache, args.cachesize,
+                     args.graphcache, args.pattern, args.compact, args.processes, args.breakdown,
+                     args.bootstrap, args.confidence, args.seed, args.comparepattern,
+                     args.goldcache, args.cachenamespace)
+    finally:
+        if getattr(args, "metrics", None):
+            write_metrics(args.metrics)
 
 
 if __name__ == '__main__':
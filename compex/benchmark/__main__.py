@@ -0,0 +1,145 @@
+import argparse
+import json
+import sys
+from typing import List, TextIO
+
+from compex.benchmark.corenlp_standin import MISSING_POLICIES, CoreNLPRecording, CoreNLPStandIn
+from compex.benchmark.generator import SyntheticCorpus
+from compex.benchmark.suite import BENCHMARKS, BenchmarkSuite, compare
+from compex.io.serialization import dumps
+
+
+def parse_args():
+    parser = argparse.ArgumentParser("compex.benchmark")
+    subparser = parser.add_subparsers(dest="mode")
+
+    # Setup corpus args shared by both modes
+    corpus_parser = argparse.ArgumentParser(add_help=False)
+    corpus_parser.add_argument("--tokens", action="store", type=int, default=20,
+                               help="Mean number of tokens of a sentence.")
+    corpus_parser.add_argument("--density", action="store", type=float, default=1.5,
+                               help="Mean number of competencies of a sentence.")
+    corpus_parser.add_argument("--objectprobability", action="store", type=float, default=0.7,
+                               help="Probability of a competency to have an object.")
+    corpus_parser.add_argument("--contextprobability", action="store", type=float, default=0.4,
+                               help="Probability of an object to have a context.")
+    corpus_parser.add_argument("--seed", action="store", type=int, default=0,
+                               help="Seed of the corpus. The same seed and parameters generate the same corpus.")
+
+    # Setup run args
+    run_parser = subparser.add_parser("run", parents=[corpus_parser],
+                                      help="Run benchmarks on a synthetic corpus and print the results as json.")
+    run_parser.add_argument("--sentences", action="store", type=int, default=2000,
+                            help="Number of sentences of the corpus.")
+    run_parser.add_argument("--repeat", action="store", type=int, default=5,
+                            help="Number of timed runs of each benchmark.")
+    run_parser.add_argument("--errorrate", action="store", type=float, default=0.3,
+                            help="Probability of a part of the annotated data of the evaluate benchmark to differ from the test data.")
+    run_parser.add_argument("--benchmark", action="append", choices=BENCHMARKS,
+                            help="Run only this benchmark. Can be given multiple times.")
+    run_parser.add_argument("--output", action="store", type=argparse.FileType("w"), default=sys.stdout,
+                            help="Write the results to this file instead of stdout.")
+    run_parser.add_argument("--baseline", action="store", type=argparse.FileType("r"),
+                            help="Results of a previous run, e.g. of another commit, to compare with.")
+
+    # Setup generate args
+    generate_parser = subparser.add_parser("generate", parents=[corpus_parser],
+                                           help="Write synthetic tsv documents and sentence files.")
+    generate_parser.add_argument("directory", action="store",
+                                 help="Directory to write the files to.")
+    generate_parser.add_argument("--files", action="store", type=int, default=1,
+                                 help="Number of tsv documents and sentence files.")
+    generate_parser.add_argument("--sentences", action="store", type=int, default=1000,
+                                 help="Number of sentences of each file.")
+
+    # Setup corenlp args
+    corenlp_parser = subparser.add_parser("corenlp",
+                                          help="Start a stand-in for a CoreNLP server, that replays recorded responses.")
+    corenlp_parser.add_argument("recording", action="store",
+                                help="Newline delimited json file with the recorded responses.")
+    corenlp_parser.add_argument("--record", action="store",
+                                help="Url of a CoreNLP server to forward requests to. Its responses are appended to the recording.")
+    corenlp_parser.add_argument("--host", action="store", default="127.0.0.1",
+                                help="Host to listen on.")
+    corenlp_parser.add_argument("--port", action="store", type=int, default=9001,
+                                help="Port to listen on.")
+    corenlp_parser.add_argument("--latency", action="store", type=float, default=0,
+                                help="Latency of each request in milliseconds.")
+    corenlp_parser.add_argument("--sentencelatency", action="store", type=float, default=0,
+                                help="Additional latency of each sentence of a request in milliseconds.")
+    corenlp_parser.add_argument("--jitter", action="store", type=float, default=0,
+                                help="Maximum random latency added to each request in milliseconds.")
+    corenlp_parser.add_argument("--threads", action="store", type=int, default=5,
+                                help="Number of requests answered at the same time.")
+    corenlp_parser.add_argument("--missing", action="store", choices=MISSING_POLICIES, default="error",
+                                help="Answer requests without recorded response with an error or with empty sentences.")
+    corenlp_parser.add_argument("--seed", action="store", type=int,
+                                help="Seed of the jitter.")
+
+    args = parser.parse_args()
+
+    # Error handling
+    if args.mode is None:
+        parser.error("Choose a mode: run, generate or corenlp.")
+    if args.mode in ("run", "generate"):
+        if args.tokens < 2:
+            parser.error("--tokens must be at least 2.")
+        if args.sentences < 1:
+            parser.error("--sentences must be at least 1.")
+    if args.mode == "run" and args.repeat < 1:
+        parser.error("--repeat must be at least 1.")
+    if args.mode == "generate" and args.files < 1:
+        parser.error("--files must be at least 1.")
+    if args.mode == "corenlp":
+        if min(args.latency, args.sentencelatency, args.jitter) < 0:
+            parser.error("--latency, --sentencelatency and --jitter must not be negative.")
+        if args.threads < 1:
+            parser.error("--threads must be at least 1.")
+
+    return args
+
+
+def run(corpus: SyntheticCorpus, sentences: int, repeat: int, error_rate: float, benchmarks: List[str],
+        output: TextIO, baseline: TextIO = None):
+    """Runs benchmarks and writes the results, compared with a baseline if given, as json."""
+
+    suite = BenchmarkSuite(corpus, sentences, repeat, error_rate)
+    results = suite.run(benchmarks)
+    if baseline is not None:
+        results["comparison"] = compare(results, json.load(baseline))
+    print(dumps(results), file=output)
+
+
+def serve_corenlp(standin: CoreNLPStandIn):
+    """Serves a CoreNLP stand-in until interrupted, then prints its request counters."""
+
+    mode = f"Recording {standin.upstream}" if standin.upstream else "Replaying"
+    print(f"{mode} on {standin.url} with {len(standin.recording)} recorded texts",
+          file=sys.stderr, flush=True)
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(dumps(standin.stats()), file=sys.stderr)
+
+
+def main():
+    args = parse_args()
+
+    if args.mode == "corenlp":
+        serve_corenlp(CoreNLPStandIn(CoreNLPRecording(args.recording), args.host, args.port, args.record,
+                                     args.latency / 1000, args.sentencelatency / 1000, args.jitter / 1000,
+                                     args.threads, args.missing, args.seed))
+        return
+
+    corpus = SyntheticCorpus(args.tokens, args.density, args.objectprobability, args.contextprobability,
+                             args.seed)
+    if args.mode == "run":
+        run(corpus, args.sentences, args.repeat, args.errorrate, args.benchmark, args.output, args.baseline)
+    elif args.mode == "generate":
+        for path in corpus.write_corpus(args.directory, args.files, args.sentences):
+            print(path)
+
+
+if __name__ == '__main__':
+    main()
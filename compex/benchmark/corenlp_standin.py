@@ -0,0 +1,357 @@
+from typing import Dict, List, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import json
+import random
+import threading
+import time
+
+import requests
+
+from compex.extractor.corenlp_session import WARM_UP_TEXT
+
+# The CoreNLP resources answered by the stand-in, the annotation resource and the semgrex resource
+RESOURCES = ("/", "/semgrex")
+MISSING_POLICIES = ("error", "empty")
+
+# The recorded CoreNLP sentence responses of a text, addressed by resource, semgrex pattern and text
+RecordingKey = Tuple[str, str, str]
+
+
+class CoreNLPRecording:
+    """Recorded responses of a CoreNLP server, stored as newline delimited json.
+
+    The responses are stored per sentence: If a request with multiple lines was answered with one sentence
+    per line, e.g. a batch sent with ssplit.eolonly, each line is recorded on its own. Otherwise the whole
+    text is recorded. So recordings can be replayed to batches of other sizes than they were recorded with.
+    """
+
+    def __init__(self, path: str = None):
+        """Creates a new instance. Loads the responses recorded in a file.
+
+        Parameters
+        ----------
+        path : str, optional
+            The path of the recording file, by default None. Newly recorded responses are appended to it.
+            If None, the recording is kept in memory only.
+        """
+
+        self.path: str = path
+        self.__responses: Dict[RecordingKey, List[Dict]] = {}
+        self.__lock = threading.Lock()
+        if path is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    for line in file:
+                        if line.strip():
+                            record = json.loads(line)
+                            self.__responses[(record["resource"], record["pattern"], record["text"])] = \
+                                record["sentences"]
+            except FileNotFoundError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self.__responses)
+
+    def record(self, resource: str, pattern: str, text: str, response: Dict):
+        """Records the response of a request.
+
+        Parameters
+        ----------
+        resource : str
+            The resource of the request, see RESOURCES.
+        pattern : str
+            The semgrex pattern of the request, None for the annotation resource.
+        text : str
+            The text of the request.
+        response : Dict
+            The json response of CoreNLP.
+        """
+
+        lines = text.split("\n")
+        sentences = response["sentences"]
+        if len(lines) > 1 and len(lines) == len(sentences):
+            records = [(line, [sentence]) for line, sentence in zip(lines, sentences)]
+        else:
+            records = [(text, sentences)]
+
+        with self.__lock:
+            records = [(text, sentences) for text, sentences in records
+                       if (resource, pattern, text) not in self.__responses]
+            for text, sentences in records:
+                self.__responses[(resource, pattern, text)] = sentences
+            if self.path is not None and records:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    for text, sentences in records:
+                        file.write(json.dumps({"resource": resource, "pattern": pattern, "text": text,
+                                               "sentences": sentences}, ensure_ascii=False) + "\n")
+
+    def replay(self, resource: str, pattern: str, text: str) -> List[Dict]:
+        """Gets the recorded sentence responses of a request.
+
+        Parameters
+        ----------
+        resource : str
+            The resource of the request, see RESOURCES.
+        pattern : str
+            The semgrex pattern of the request, None for the annotation resource.
+        text : str
+            The text of the request.
+
+        Returns
+        -------
+        List[Dict]
+            The sentences of the response, None if the text or one of its lines was not recorded.
+        """
+
+        sentences = self.__responses.get((resource, pattern, text))
+        if sentences is not None:
+            return sentences
+        lines = text.split("\n")
+        if len(lines) == 1:
+            return None
+
+        sentences = []
+        for line in lines:
+            line_sentences = self.__responses.get((resource, pattern, line))
+            if line_sentences is None:
+                return None
+            sentences.extend(line_sentences)
+        return sentences
+
+
+class CoreNLPStandIn:
+    """A local stand-in for a CoreNLP server, that replays recorded responses.
+
+    Speaks the HTTP protocol of the CoreNLP resources used by compex: POST / annotates text, POST /semgrex
+    executes a semgrex pattern and GET /ping is the health-check. Attach a CoreNLPSession to its url to run
+    the extractor without Java, e.g. to measure the overhead of compex itself or to load-test batching.
+
+    Requests wait for a free one of threads workers like on a CoreNLP server, then each request takes
+    latency + per_sentence_latency * lines + a random jitter between 0 and jitter seconds.
+
+    If upstream is set, requests are forwarded to a real CoreNLP server instead and its responses are
+    recorded, no latency is added. The warm-up request of a starting CoreNLPSession is always answered,
+    even if it was not recorded, so sessions can start with any missing policy.
+    """
+
+    # Seconds stop() waits at most for the server thread to notice it
+    poll_interval = 0.05
+
+    def __init__(self, recording: CoreNLPRecording, host: str = "127.0.0.1", port: int = 0, upstream: str = None,
+                 latency: float = 0.0, per_sentence_latency: float = 0.0, jitter: float = 0.0, threads: int = 5,
+                 missing: str = "error", seed: int = None):
+        """Creates a new instance. The server does not listen before start() is called.
+
+        Parameters
+        ----------
+        recording : CoreNLPRecording
+            The recording to replay or to record to.
+        host : str, optional
+            The host to listen on, by default "127.0.0.1"
+        port : int, optional
+            The port to listen on, by default 0 for a free port, see self.url after start().
+        upstream : str, optional
+            The url of a CoreNLP server to forward requests to and record responses of, by default None
+        latency : float, optional
+            The latency of each request in seconds, by default 0.0
+        per_sentence_latency : float, optional
+            The additional latency of each line of a request in seconds, by default 0.0
+        jitter : float, optional
+            The maximum random latency added to each request in seconds, by default 0.0
+        threads : int, optional
+            The number of requests answered at the same time, by default 5 like a CoreNLP server
+        missing : str, optional
+            How requests without recorded response are answered, see MISSING_POLICIES. "error" answers them
+            with an HTTP error, like a failing CoreNLP server, "empty" with sentences without tokens and
+            matches. By default "error"
+        seed : int, optional
+            The seed of the jitter, by default None
+        """
+
+        if min(latency, per_sentence_latency, jitter) < 0:
+            raise ValueError("Latencies must not be negative.")
+        if threads < 1:
+            raise ValueError("threads must be at least 1.")
+        if missing not in MISSING_POLICIES:
+            raise ValueError(f"Unknown missing policy: {missing}")
+
+        self.recording: CoreNLPRecording = recording
+        self.host: str = host
+        self.port: int = port
+        self.upstream: str = upstream.rstrip("/") if upstream else None
+        self.latency: float = latency
+        self.per_sentence_latency: float = per_sentence_latency
+        self.jitter: float = jitter
+        self.threads: int = threads
+        self.missing: str = missing
+        self.requests: int = 0
+        self.sentences: int = 0
+        self.misses: int = 0
+        self.__random = random.Random(seed)
+        self.__workers = threading.BoundedSemaphore(threads)
+        self.__lock = threading.Lock()
+        self.__http: requests.Session = None
+        self.__server: ThreadingHTTPServer = None
+        self.__thread: threading.Thread = None
+
+    @property
+    def url(self) -> str:
+        """The url of the server, pass it as url of a CoreNLPSession."""
+
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Starts listening in a background thread."""
+
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep connections alive, like CoreNLP does for the connection pool of CoreNLPSession
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if urlsplit(self.path).path == "/ping":
+                    self.send(200, b"pong\n", "text/plain; charset=utf-8")
+                else:
+                    self.send(404, b"Unknown resource.", "text/plain; charset=utf-8")
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if url.path not in RESOURCES:
+                    self.send(404, b"Unknown resource.", "text/plain; charset=utf-8")
+                    return
+                status, response = standin.handle(url.path, parse_qs(url.query), body)
+                self.send(status, response, "application/json" if status == 200 else "text/plain; charset=utf-8")
+
+            def send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        if self.upstream is not None:
+            self.__http = requests.Session()
+        self.__server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.__server.daemon_threads = True
+        self.port = self.__server.server_address[1]
+        self.__thread = threading.Thread(target=self.__server.serve_forever, args=(self.poll_interval,),
+                                         daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stops listening."""
+
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__thread.join()
+            self.__server = None
+        if self.__http is not None:
+            self.__http.close()
+            self.__http = None
+
+    def serve_forever(self):
+        """Serves in the current thread until interrupted."""
+
+        self.start()
+        try:
+            self.__thread.join()
+        finally:
+            self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the request counters of the server.
+
+        Returns
+        -------
+        Dict[str, int]
+            A Dict with the number of requests, their lines, requests without recorded response and
+            recorded texts.
+        """
+
+        return {"requests": self.requests, "sentences": self.sentences, "misses": self.misses,
+                "recorded": len(self.recording)}
+
+    def handle(self, resource: str, params: Dict[str, List[str]], body: bytes) -> Tuple[int, bytes]:
+        """Answers a request of a CoreNLP resource.
+
+        Parameters
+        ----------
+        resource : str
+            The resource, see RESOURCES.
+        params : Dict[str, List[str]]
+            The query parameters of the request.
+        body : bytes
+            The body of the request, the text to annotate.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            The status code and body of the response.
+        """
+
+        text = body.decode("utf-8")
+        pattern = params["pattern"][0] if resource == "/semgrex" and "pattern" in params else None
+        lines = text.split("\n")
+        with self.__lock:
+            self.requests += 1
+            self.sentences += len(lines)
+            delay = self.latency + self.per_sentence_latency * len(lines) + self.__random.uniform(0, self.jitter)
+
+        if self.upstream is not None:
+            return self.__forward(resource, params, text, pattern, body)
+
+        with self.__workers:
+            if delay > 0:
+                time.sleep(delay)
+            sentences = self.recording.replay(resource, pattern, text)
+            if sentences is None and resource == "/" and text == WARM_UP_TEXT:
+                sentences = [self.__empty_sentence(resource, 0)]
+            elif sentences is None:
+                with self.__lock:
+                    self.misses += 1
+                if self.missing == "error":
+                    return 500, f"No recorded response for: {text[:200]}".encode("utf-8")
+                sentences = [self.__empty_sentence(resource, index) for index in range(len(lines))]
+            elif resource == "/":
+                # Recorded sentences may come from other requests, so their indexes are set to this one's
+                sentences = [dict(sentence, index=index) for index, sentence in enumerate(sentences)]
+        return 200, json.dumps({"sentences": sentences}).encode("utf-8")
+
+    def __forward(self, resource: str, params: Dict[str, List[str]], text: str, pattern: str,
+                  body: bytes) -> Tuple[int, bytes]:
+        """Forwards a request to the upstream server and records its response."""
+
+        try:
+            response = self.__http.post(self.upstream + resource, params=params, data=body,
+                                        headers={"content-type": "text/plain; charset=utf-8"})
+        except requests.exceptions.ConnectionError as error:
+            return 502, str(error).encode("utf-8")
+        if response.status_code == 200:
+            try:
+                self.recording.record(resource, pattern, text, response.json())
+            except (ValueError, KeyError):
+                # Not a json annotation, e.g. another output format, so it can't be replayed
+                pass
+        return response.status_code, response.content
+
+    def __empty_sentence(self, resource: str, index: int) -> Dict:
+        """Creates the response of a sentence without tokens and semgrex matches."""
+
+        if resource == "/semgrex":
+            return {"length": 0}
+        return {"index": index, "tokens": [], "basicDependencies": [], "enhancedDependencies": [],
+                "enhancedPlusPlusDependencies": []}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
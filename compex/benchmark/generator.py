@@ -0,0 +1,190 @@
+from typing import List, Tuple
+import os
+import random
+
+from compex.io.tsv import SENTENCE_IDENTIFICATOR
+
+TSV_HEADER = ("#FORMAT=WebAnno TSV 3.2\n"
+              "#T_SP=webanno.custom.TestLayer|CompType\n"
+              "#T_RL=webanno.custom.TestLayerRelation|BT_webanno.custom.TestLayer\n"
+              "\n\n")
+VERBS = ["kennen", "verstehen", "anwenden", "analysieren", "bewerten", "entwerfen", "implementieren",
+         "konzipieren", "beherrschen", "erläutern", "modellieren", "beurteilen", "entwickeln", "beschreiben"]
+NOUNS = ["Grundlagen", "Techniken", "Methoden", "Datenbanken", "Anwendungen", "Algorithmen", "Schnittstellen",
+         "Modelle", "Prozesse", "Systeme", "Verfahren", "Konzepte", "Architekturen", "Werkzeuge", "Arbeitens"]
+FILLERS = ["die", "der", "des", "eine", "und", "für", "mit", "in", "moderne", "wissenschaftlichen",
+           "grundlegenden", "komplexe", "sollen", "können", "Studierenden", "Lage", "sein"]
+
+
+class SyntheticCorpus:
+    """Generates synthetic WebAnno TSV 3.2 documents and plain text sentences with competency annotations.
+
+    Sentences consist of random German words. Each sentence gets competencies according to the annotation density,
+    which get an object with object_probability, that gets a context with context_probability. Annotations use
+    the layers of the test data (see tests/resources/test.tsv) and never overlap. The same seed generates the
+    same corpus.
+    """
+
+    def __init__(self, tokens_per_sentence: int = 20, competency_density: float = 1.5,
+                 object_probability: float = 0.7, context_probability: float = 0.4, seed: int = 0):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        tokens_per_sentence : int, optional
+            The mean number of tokens of a sentence, by default 20
+        competency_density : float, optional
+            The mean number of competencies of a sentence, by default 1.5
+        object_probability : float, optional
+            The probability of a competency to have an object, by default 0.7
+        context_probability : float, optional
+            The probability of an object to have a context, by default 0.4
+        seed : int, optional
+            The seed of the random generator, by default 0
+        """
+
+        if tokens_per_sentence < 2:
+            raise ValueError("tokens_per_sentence must be at least 2.")
+        self.tokens_per_sentence: int = tokens_per_sentence
+        self.competency_density: float = competency_density
+        self.object_probability: float = object_probability
+        self.context_probability: float = context_probability
+        self.seed: int = seed
+        self.random = random.Random(seed)
+
+    def generate_tsv(self, sentences: int) -> str:
+        """Generates an annotated WebAnno TSV 3.2 document.
+
+        Parameters
+        ----------
+        sentences : int
+            The number of sentences.
+
+        Returns
+        -------
+        str
+            The content of the tsv file.
+        """
+
+        lines = [TSV_HEADER]
+        offset = 0
+        span_index = 0
+        for sentence_number in range(1, sentences + 1):
+            tokens, spans, relations, span_index = self.__generate_annotations(span_index)
+            text = " ".join(tokens)
+            lines.append(f"#Text={text}\n")
+            for token_number, token in enumerate(tokens, start=1):
+                relation = relations[token_number - 1]
+                if relation is not None:
+                    target, source_span, target_span = relation
+                    relation = f"{sentence_number}-{target}[{source_span}_{target_span}]"
+                lines.append(f"{sentence_number}-{token_number}\t{offset}-{offset + len(token)}\t{token}\t"
+                             f"{spans[token_number - 1] or '_'}\t{relation or '_'}\t\n")
+                offset += len(token) + 1
+            lines.append("\n")
+        return "".join(lines)
+
+    def generate_sentences(self, sentences: int) -> List[str]:
+        """Generates plain text sentences, e.g. to write a sentence file for the extract mode.
+
+        Parameters
+        ----------
+        sentences : int
+            The number of sentences.
+
+        Returns
+        -------
+        List[str]
+            The sentences.
+        """
+
+        return [" ".join(self.__generate_annotations(0)[0]) for _ in range(sentences)]
+
+    def write_corpus(self, directory: str, files: int, sentences_per_file: int) -> List[str]:
+        """Writes tsv documents and sentence files to a directory. Each sentence file contains the sentences
+        of the tsv document with the same name, so extraction results can be evaluated against it.
+
+        Parameters
+        ----------
+        directory : str
+            The directory. Created if it does not exist.
+        files : int
+            The number of tsv documents and sentence files.
+        sentences_per_file : int
+            The number of sentences of each file.
+
+        Returns
+        -------
+        List[str]
+            The paths of the written files.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for index in range(files):
+            tsv = self.generate_tsv(sentences_per_file)
+            tsv_path = os.path.join(directory, f"synthetic-{index:04d}.tsv")
+            with open(tsv_path, "w", encoding="utf-8") as tsv_file:
+                tsv_file.write(tsv)
+            text_path = os.path.join(directory, f"synthetic-{index:04d}.txt")
+            with open(text_path, "w", encoding="utf-8") as text_file:
+                for line in tsv.splitlines():
+                    if line.startswith(SENTENCE_IDENTIFICATOR):
+                        text_file.write(line[len(SENTENCE_IDENTIFICATOR):] + "\n")
+            paths.extend([tsv_path, text_path])
+        return paths
+
+    def __generate_annotations(self, span_index: int) -> Tuple[List[str], List[str], List[Tuple[int, str, str]], int]:
+        """Generates the tokens of a sentence and their span and relation annotations.
+
+        Returns the tokens, the span value and relation (target token number, source and target span index)
+        of each token and the last used span index.
+        """
+
+        length = max(2, round(self.random.gauss(
+            self.tokens_per_sentence, self.tokens_per_sentence / 4)))
+        tokens = [self.random.choice(FILLERS) for _ in range(length - 1)] + ["."]
+        spans: List[str] = [None] * length
+        relations: List[Tuple[int, str, str]] = [None] * length
+
+        def free_span(size: int) -> int:
+            # Start of a random run of unannotated tokens, None if there is none
+            starts = [start for start in range(length - size)
+                      if all(spans[i] is None for i in range(start, start + size))]
+            return self.random.choice(starts) if starts else None
+
+        competencies = int(self.competency_density) + \
+            (self.random.random() < self.competency_density % 1)
+        for _ in range(competencies):
+            competency = free_span(1)
+            if competency is None:
+                break
+            tokens[competency] = self.random.choice(VERBS)
+            spans[competency] = "competency"
+            if self.random.random() >= self.object_probability:
+                continue
+
+            object_size = self.random.randint(1, 3)
+            object_start = free_span(object_size)
+            if object_start is None:
+                continue
+            span_index += 1
+            object_span = span_index
+            for position in range(object_start, object_start + object_size):
+                spans[position] = f"object[{object_span}]"
+            tokens[object_start + object_size - 1] = self.random.choice(NOUNS)
+            relations[object_start] = (competency + 1, "0", str(object_span))
+            if self.random.random() >= self.context_probability:
+                continue
+
+            context_size = self.random.randint(1, 2)
+            context_start = free_span(context_size)
+            if context_start is None:
+                continue
+            span_index += 1
+            for position in range(context_start, context_start + context_size):
+                spans[position] = f"context[{span_index}]"
+            tokens[context_start + context_size - 1] = self.random.choice(NOUNS)
+            relations[context_start] = (
+                object_start + 1, str(object_span), str(span_index))
+        return tokens, spans, relations, span_index
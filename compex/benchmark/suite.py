@@ -0,0 +1,288 @@
+from typing import Callable, Dict, List, Tuple
+import datetime
+import io
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from compex.benchmark.generator import SyntheticCorpus
+from compex.converter.tsv2competency import convert_tsv_to_competencies
+from compex.evaluator.evaluators import EvaluationSet, FMeasureEvaluator
+from compex.io.serialization import encode_competencies
+from compex.io.tsv import TsvReader, TsvSentence
+from compex.model.competency import Competency, CompetencyObject, Word, WordChunk
+
+# Version of the result format, increase it if results of older versions can't be compared anymore
+RESULT_VERSION = 1
+BENCHMARKS = ("read_tsv", "link_relations", "convert", "evaluate", "encode_json", "encode_compact")
+
+
+class BenchmarkSuite:
+    """Benchmarks of the hot paths of compex on a synthetic corpus, see SyntheticCorpus.
+
+    Each benchmark prepares its input, then runs the measured step repeat times. The best and median
+    durations and the throughput of the best run are reported, the peak memory allocated by the step
+    is measured with tracemalloc in an additional run, so tracing doesn't slow down the timed runs.
+    """
+
+    def __init__(self, corpus: SyntheticCorpus, sentences: int = 2000, repeat: int = 5, error_rate: float = 0.3):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        corpus : SyntheticCorpus
+            The generator of the benchmark corpus.
+        sentences : int, optional
+            The number of sentences of the corpus, by default 2000
+        repeat : int, optional
+            The number of timed runs of each benchmark, by default 5
+        error_rate : float, optional
+            The probability of a competency, object or context of the annotated data of the evaluation
+            benchmark to differ from the test data, by default 0.3
+        """
+
+        if sentences < 1:
+            raise ValueError("sentences must be at least 1.")
+        if repeat < 1:
+            raise ValueError("repeat must be at least 1.")
+        self.corpus: SyntheticCorpus = corpus
+        self.sentences: int = sentences
+        self.repeat: int = repeat
+        self.error_rate: float = error_rate
+        self.__tsv: str = None
+        self.__competencies: Dict[str, List[Competency]] = None
+
+    @property
+    def tsv(self) -> str:
+        """The tsv document of the corpus, generated on first use."""
+
+        if self.__tsv is None:
+            self.__tsv = self.corpus.generate_tsv(self.sentences)
+        return self.__tsv
+
+    @property
+    def competencies(self) -> Dict[str, List[Competency]]:
+        """The competencies converted from the corpus, converted on first use."""
+
+        if self.__competencies is None:
+            self.__competencies = convert_tsv_to_competencies(
+                TsvReader().read_tsv(io.StringIO(self.tsv)))
+        return self.__competencies
+
+    def run(self, benchmarks: List[str] = None) -> Dict:
+        """Runs benchmarks.
+
+        Parameters
+        ----------
+        benchmarks : List[str], optional
+            The names of the benchmarks to run, see BENCHMARKS. By default all.
+
+        Returns
+        -------
+        Dict
+            The json serializable results with the metadata of the run as "metadata" and the results
+            of each benchmark in "benchmarks".
+        """
+
+        benchmarks = list(benchmarks or BENCHMARKS)
+        for name in benchmarks:
+            if name not in BENCHMARKS:
+                raise ValueError(f"Unknown benchmark: {name}")
+
+        results = {}
+        for name in benchmarks:
+            step, items, unit = getattr(self, f"prepare_{name}")()
+            results[name] = self.measure(step, items, unit)
+        return {"metadata": self.metadata(), "benchmarks": results}
+
+    def measure(self, step: Callable[[], object], items: int, unit: str) -> Dict:
+        """Measures a benchmark step.
+
+        Parameters
+        ----------
+        step : Callable[[], object]
+            The step, called without arguments.
+        items : int
+            The number of items the step processes.
+        unit : str
+            The name of the items, e.g. "sentences".
+
+        Returns
+        -------
+        Dict
+            The number of items, the best and median duration in seconds, the items per second of
+            the best run and the peak of the memory allocated while running the step in bytes.
+        """
+
+        durations = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            step()
+            durations.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        try:
+            step()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        best = min(durations)
+        return {
+            "items": items,
+            "unit": unit,
+            "repeat": self.repeat,
+            "best_seconds": best,
+            "median_seconds": statistics.median(durations),
+            "throughput": items / best if best > 0 else None,
+            "peak_memory_bytes": peak_memory
+        }
+
+    def metadata(self) -> Dict:
+        """Gets the metadata of a run, to tell which results are comparable.
+
+        Returns
+        -------
+        Dict
+            The result version, time, git commit, python version, platform and corpus parameters.
+        """
+
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                    check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "version": RESULT_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": {
+                "sentences": self.sentences,
+                "seed": self.corpus.seed,
+                "tokens_per_sentence": self.corpus.tokens_per_sentence,
+                "competency_density": self.corpus.competency_density,
+                "object_probability": self.corpus.object_probability,
+                "context_probability": self.corpus.context_probability,
+                "error_rate": self.error_rate
+            }
+        }
+
+    def prepare_read_tsv(self) -> Tuple[Callable[[], object], int, str]:
+        """Parses the tsv document with TsvReader.read_tsv()."""
+
+        tsv = self.tsv
+        return lambda: TsvReader().read_tsv(io.StringIO(tsv)), self.sentences, "sentences"
+
+    def prepare_link_relations(self) -> Tuple[Callable[[], object], int, str]:
+        """Creates TsvSentences of parsed tokens, which groups them to chunks and links their relations."""
+
+        sentences = [(sentence.text, sentence.tokens)
+                     for sentence in TsvReader().read_tsv(io.StringIO(self.tsv)).sentences]
+        return lambda: [TsvSentence(text, tokens) for text, tokens in sentences], len(sentences), "sentences"
+
+    def prepare_convert(self) -> Tuple[Callable[[], object], int, str]:
+        """Converts the parsed tsv document to competencies with convert_tsv_to_competencies()."""
+
+        document = TsvReader().read_tsv(io.StringIO(self.tsv))
+        return lambda: convert_tsv_to_competencies(document), len(document.sentences), "sentences"
+
+    def prepare_evaluate(self) -> Tuple[Callable[[], object], int, str]:
+        """Evaluates perturbed competencies against the corpus with FMeasureEvaluator, considering objects
+        and contexts."""
+
+        test_data = self.competencies
+        annotated_data = self.perturb(test_data)
+        items = sum(len(competencies) for competencies in test_data.values())
+
+        def step():
+            evaluation_set = EvaluationSet(test_data, annotated_data)
+            return FMeasureEvaluator().evaluate_with_annotated_sentences(evaluation_set, True, True)
+        return step, items, "competencies"
+
+    def prepare_encode_json(self) -> Tuple[Callable[[], object], int, str]:
+        """Encodes the competencies of the corpus as indented json."""
+
+        competencies = self.competencies
+        items = sum(len(triples) for triples in competencies.values())
+        return lambda: encode_competencies(competencies), items, "competencies"
+
+    def prepare_encode_compact(self) -> Tuple[Callable[[], object], int, str]:
+        """Encodes the competencies of the corpus as compact json."""
+
+        competencies = self.competencies
+        items = sum(len(triples) for triples in competencies.values())
+        return lambda: encode_competencies(competencies, True), items, "competencies"
+
+    def perturb(self, competencies: Dict[str, List[Competency]]) -> Dict[str, List[Competency]]:
+        """Creates annotated data for the evaluation benchmark, that differs from the given test data.
+
+        With a probability of error_rate each competency is dropped, each object loses its last word
+        and each context is dropped. The perturbation only depends on the seed of the corpus.
+
+        Parameters
+        ----------
+        competencies : Dict[str, List[Competency]]
+            The test data.
+
+        Returns
+        -------
+        Dict[str, List[Competency]]
+            The perturbed copy of the test data.
+        """
+
+        rng = random.Random(self.corpus.seed)
+        perturbed = {}
+        for sentence, triples in competencies.items():
+            perturbed[sentence] = []
+            for competency in triples:
+                if rng.random() < self.error_rate:
+                    continue
+                objects = []
+                for competency_object in competency.objects:
+                    words = competency_object.word_chunk.words
+                    if len(words) > 1 and rng.random() < self.error_rate:
+                        words = words[:-1]
+                    contexts = [context for context in competency_object.contexts
+                                if rng.random() >= self.error_rate]
+                    objects.append(CompetencyObject(WordChunk(words), contexts))
+                perturbed[sentence].append(Competency(
+                    Word(competency.word.index, competency.word.word), objects, competency.taxonomy_dimension))
+        return perturbed
+
+
+def compare(results: Dict, baseline: Dict) -> Dict:
+    """Compares benchmark results with the results of a baseline, e.g. of another commit.
+
+    Parameters
+    ----------
+    results : Dict
+        The results, see BenchmarkSuite.run().
+    baseline : Dict
+        The results of the baseline.
+
+    Returns
+    -------
+    Dict
+        The speedup (baseline best duration / best duration) and memory ratio (peak memory / baseline
+        peak memory) of each benchmark in both results. Speedups above 1 and memory ratios below 1
+        are improvements.
+    """
+
+    if results["metadata"]["corpus"] != baseline["metadata"]["corpus"]:
+        raise ValueError("The results were measured on different corpora.")
+
+    comparison = {}
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            continue
+        comparison[name] = {
+            "speedup": base["best_seconds"] / result["best_seconds"] if result["best_seconds"] > 0 else None,
+            "memory_ratio": result["peak_memory_bytes"] / base["peak_memory_bytes"] if base["peak_memory_bytes"] else None
+        }
+    return {"commit": baseline["metadata"].get("commit"), "benchmarks": comparison}
@@ -0,0 +1,153 @@
+from typing import Dict, List, Tuple
+import hashlib
+import os
+import pickle
+import sqlite3
+
+from compex.model.competency import Competency
+
+# Modification time in nanoseconds, size and sha256 hash of the content of a file
+Fingerprint = Tuple[int, int, str]
+
+
+class CompetencyCache:
+    """A persistent cache of the competency triples converted from tsv files.
+
+    The triples of each file are pickled and stored in a SQLite database, addressed by the absolute path of
+    the file. An entry is used as long as the modification time and size of the file are unchanged or,
+    if they changed, the content hash still matches, and it was created by the same version of the
+    conversion. Otherwise the file is converted again.
+
+    Only use cache files you created yourself, loading them unpickles their content.
+    """
+
+    # Increase if the pickled classes change incompatibly, so old entries are converted again
+    FORMAT_VERSION = 1
+    # Increase if the tsv reader or convert_tsv_sentence_to_competencies convert files to other triples,
+    # so gold data of older versions is converted again instead of changing evaluation results silently
+    CONVERTER_VERSION = 2
+
+    def __init__(self, path: str):
+        """Creates a new instance. Opens or creates the cache database.
+
+        Parameters
+        ----------
+        path : str
+            Path of the cache database file. Use ":memory:" for a cache that is not persisted.
+        """
+
+        self.path: str = path
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, hash TEXT NOT NULL, version TEXT NOT NULL, competencies BLOB NOT NULL)")
+        self.__connection.commit()
+
+    @property
+    def version(self) -> str:
+        """The version of the entries, combines FORMAT_VERSION and CONVERTER_VERSION."""
+
+        return f"{self.FORMAT_VERSION}-{self.CONVERTER_VERSION}"
+
+    @staticmethod
+    def fingerprint(path: str) -> Fingerprint:
+        """Creates the fingerprint of a file. Create it before converting the file, so changes while converting
+        are detected.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        Fingerprint
+            The modification time in nanoseconds, size and sha256 hash of the content of the file.
+        """
+
+        stat = os.stat(path)
+        with open(path, "rb") as file:
+            content_hash = hashlib.sha256(file.read()).hexdigest()
+        return stat.st_mtime_ns, stat.st_size, content_hash
+
+    def get(self, path: str) -> Dict[str, List[Competency]]:
+        """Gets the cached triples of a file, if the file did not change. Counts hits and misses.
+
+        Parameters
+        ----------
+        path : str
+            The path of the tsv file.
+
+        Returns
+        -------
+        Dict[str, List[Competency]]
+            A Dict with sentences as keys and a List of competency triples as values
+            or None, if the file is not cached or changed.
+        """
+
+        path = os.path.abspath(path)
+        row = self.__connection.execute("SELECT mtime_ns, size, hash, competencies FROM files WHERE path = ? AND version = ?",
+                                        (path, self.version)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        mtime_ns, size, content_hash, competencies = row
+        stat = os.stat(path)
+        if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+            # The file was touched or changed, only the content decides
+            fingerprint = self.fingerprint(path)
+            if fingerprint[2] != content_hash:
+                self.misses += 1
+                return None
+            self.__connection.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                                      (fingerprint[0], fingerprint[1], path))
+            self.__connection.commit()
+
+        self.hits += 1
+        return pickle.loads(competencies)
+
+    def put(self, path: str, competencies: Dict[str, List[Competency]], fingerprint: Fingerprint):
+        """Adds the triples of a file to the cache.
+
+        Parameters
+        ----------
+        path : str
+            The path of the tsv file.
+        competencies : Dict[str, List[Competency]]
+            The triples converted from the file.
+        fingerprint : Fingerprint
+            The fingerprint of the file, created before converting it.
+        """
+
+        mtime_ns, size, content_hash = fingerprint
+        self.__connection.execute("INSERT OR REPLACE INTO files (path, mtime_ns, size, hash, version, competencies) VALUES (?, ?, ?, ?, ?, ?)",
+                                  (os.path.abspath(path), mtime_ns, size, content_hash, self.version,
+                                   pickle.dumps(competencies, protocol=pickle.HIGHEST_PROTOCOL)))
+        self.__connection.commit()
+
+    def __len__(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit and miss counters and the size of the cache.
+
+        Returns
+        -------
+        Dict[str, int]
+            A Dict with the number of hits, misses and entries.
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self):
+        """Closes the cache database."""
+
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
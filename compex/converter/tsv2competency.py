@@ -1,6 +1,10 @@
-from typing import List, Dict
+from typing import Iterable, List, Dict, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+import time
 
-from compex.io.tsv import TsvDocument, Feature, TokenChunk
+from compex.converter.competency_cache import CompetencyCache, Fingerprint
+from compex.instrumentation.metrics import metrics
+from compex.io.tsv import TsvDocument, TsvReader, TsvSentence, Feature, TokenChunk
 from compex.model.competency import Competency, CompetencyObject, ObjectContext, Word, WordChunk
 
 TSV_COMPETENCY_TYPE = "CompType"
@@ -10,13 +14,14 @@ TSV_CONTEXT_VALUE = "context"
 
 
 def convert_tsv_to_competencies(
-        tsv: TsvDocument) -> Dict[str, List[Competency]]:
+        tsv: Union[TsvDocument, Iterable[TsvSentence]]) -> Dict[str, List[Competency]]:
     """Coverts an annotated tsv file to competency triples. Correct annotation format is needed! (see README.md)
 
     Parameters
     ----------
-    tsv : TsvDocument
-        The TSVDocument to convert
+    tsv : Union[TsvDocument, Iterable[TsvSentence]]
+        The TSVDocument to convert or its sentences, e.g. streamed by TsvReader.iter_tsv().
+        Sentences are consumed one at a time.
 
     Returns
     -------
@@ -24,74 +29,251 @@ def convert_tsv_to_competencies(
         A Dict with sentences as keys and a List of competency triples as values.
     """
 
+    if isinstance(tsv, TsvDocument):
+        tsv = tsv.sentences
+
+    # Streamed sentences are parsed while iterating, so parsing and converting are timed separately.
+    # Per sentence only the wall clock is read, timers would cost more than converting a sentence.
+    parse_time = 0.0
+    convert_time = 0.0
     sentences = {}
-    for sentence in tsv.sentences:
-        current_comps: List[Competency] = []
-        # 1. Find competencies
-        for feature, token_chunk in sentence.token_chunks.items():
-            if token_chunk.feature.feature_definition.name == TSV_COMPETENCY_TYPE and token_chunk.feature.value == TSV_COMPETENCY_VALUE:
-                current_comps.append(
-                    Competency(
-                        Word(
-                            convert_token_number(
-                                token_chunk.tokens[0].token_number),
-                            token_chunk.tokens[0].token)))
-
-        # 2. Find objects of competencies
-        for feature, token_chunk in sentence.token_chunks.items():
-            if token_chunk.feature.feature_definition.name == TSV_COMPETENCY_TYPE and token_chunk.feature.value == TSV_OBJECT_VALUE:
-                for related_token_chunk in token_chunk.relations:
-                    if related_token_chunk.feature.feature_definition.name == TSV_COMPETENCY_TYPE and related_token_chunk.feature.value == TSV_COMPETENCY_VALUE:
-                        # find the competency
-                        for comp in current_comps:
-                            if comp.word.index == convert_token_number(
-                                    related_token_chunk.tokens[0].token_number):
-                                # Convert tokens from object to wordchunk
-                                words = []
-                                for token in token_chunk.tokens:
-                                    words.append(
-                                        Word(
-                                            convert_token_number(
-                                                token.token_number),
-                                            token.token))
-                                # Leave contexts emtpy, because we don't know
-                                # about them yet
-                                comp.objects.append(
-                                    CompetencyObject(WordChunk(words)))
-
-        # 3. Find the context of objects
-        for feature, token_chunk in sentence.token_chunks.items():
-            if token_chunk.feature.feature_definition.name == TSV_COMPETENCY_TYPE and token_chunk.feature.value == TSV_CONTEXT_VALUE:
-                for related_token_chunk in token_chunk.relations:
-                    if related_token_chunk.feature.feature_definition.name == TSV_COMPETENCY_TYPE and related_token_chunk.feature.value == TSV_OBJECT_VALUE:
-                        # find the object
-                        for comp in current_comps:
-                            for obj in comp.objects:
-                                if obj.word_chunk.words[0].index == convert_token_number(
-                                        related_token_chunk.tokens[0].token_number):
-                                    # Convert tokens from object to wordchunk
-                                    words = []
-                                    for token in token_chunk.tokens:
-                                        words.append(
-                                            Word(
-                                                convert_token_number(
-                                                    token.token_number),
-                                                token.token))
-                                    obj.contexts.append(
-                                        ObjectContext(WordChunk(words)))
-
-        # Competencies, objects and contexts converted, add them to sentence
-        # list
-        sentences[sentence.text] = current_comps
+    started = time.perf_counter()
+    for sentence in tsv:
+        parsed = time.perf_counter()
+        sentences[sentence.text] = convert_tsv_sentence_to_competencies(
+            sentence)
+        converted = time.perf_counter()
+        parse_time += parsed - started
+        convert_time += converted - parsed
+        started = converted
+    parse_time += time.perf_counter() - started
+
+    metrics.add_time("tsv.parse", parse_time)
+    metrics.add_time("tsv.convert", convert_time)
+    metrics.count("tsv.sentences", len(sentences))
+    return sentences
+
+
+# Increase CompetencyCache.CONVERTER_VERSION if the triples converted from a sentence change
+def convert_tsv_sentence_to_competencies(sentence: TsvSentence) -> List[Competency]:
+    """Converts the annotations of a single tsv sentence to competency triples.
+
+    Chunks are classified in a single pass. Objects are linked to the competencies and contexts to the objects
+    starting at the token they are related to, which are looked up by token number.
+
+    Parameters
+    ----------
+    sentence : TsvSentence
+        The sentence to convert.
+
+    Returns
+    -------
+    List[Competency]
+        The competency triples of the sentence.
+    """
+
+    competencies: List[Competency] = []
+    competencies_by_index: Dict[int, List[Competency]] = {}
+    object_chunks: List[TokenChunk] = []
+    context_chunks: List[TokenChunk] = []
+    for token_chunk in sentence.token_chunks.values():
+        value = get_competency_type(token_chunk)
+        if value == TSV_COMPETENCY_VALUE:
+            token = token_chunk.tokens[0]
+            competency = Competency(
+                Word(convert_token_number(token.token_number), token.token))
+            competencies.append(competency)
+            competencies_by_index.setdefault(
+                competency.word.index, []).append(competency)
+        elif value == TSV_OBJECT_VALUE:
+            object_chunks.append(token_chunk)
+        elif value == TSV_CONTEXT_VALUE:
+            context_chunks.append(token_chunk)
+
+    # Objects are linked to all competencies at the token they relate to
+    objects_by_index: Dict[int, List[CompetencyObject]] = {}
+    for token_chunk in object_chunks:
+        word_chunk = None
+        for related_token_chunk in token_chunk.relations:
+            if get_competency_type(related_token_chunk) != TSV_COMPETENCY_VALUE:
+                continue
+            for competency in competencies_by_index.get(
+                    convert_token_number(related_token_chunk.tokens[0].token_number), ()):
+                if word_chunk is None:
+                    word_chunk = convert_token_chunk(token_chunk)
+                # Leave contexts emtpy, because we don't know about them yet
+                competency_object = CompetencyObject(word_chunk)
+                competency.objects.append(competency_object)
+                objects_by_index.setdefault(
+                    word_chunk.words[0].index, []).append(competency_object)
+
+    # Contexts are linked to all objects starting at the token they relate to
+    for token_chunk in context_chunks:
+        word_chunk = None
+        for related_token_chunk in token_chunk.relations:
+            if get_competency_type(related_token_chunk) != TSV_OBJECT_VALUE:
+                continue
+            for competency_object in objects_by_index.get(
+                    convert_token_number(related_token_chunk.tokens[0].token_number), ()):
+                if word_chunk is None:
+                    word_chunk = convert_token_chunk(token_chunk)
+                competency_object.contexts.append(ObjectContext(word_chunk))
+
+    return competencies
+
+
+def get_competency_type(token_chunk: TokenChunk) -> str:
+    """Gets the competency annotation of a token chunk, e.g. "competency", "object" or "context".
+
+    Parameters
+    ----------
+    token_chunk : TokenChunk
+        The token chunk.
+
+    Returns
+    -------
+    str
+        The value of the competency type feature or None, if the chunk is no competency annotation.
+    """
+
+    feature = token_chunk.feature
+    if feature.feature_definition.name != TSV_COMPETENCY_TYPE:
+        return None
+    return feature.value
+
+
+def convert_token_chunk(token_chunk: TokenChunk) -> WordChunk:
+    """Converts the tokens of a token chunk to a chunk of words.
+
+    Parameters
+    ----------
+    token_chunk : TokenChunk
+        The token chunk.
+
+    Returns
+    -------
+    WordChunk
+        The words of the tokens.
+    """
+
+    return WordChunk(Word(convert_token_number(token.token_number), token.token)
+                     for token in token_chunk.tokens)
+
+
+def convert_tsv_file_to_competencies(path: str) -> Dict[str, List[Competency]]:
+    """Reads an annotated tsv file and converts it to competency triples.
+
+    Parameters
+    ----------
+    path : str
+        The path of the tsv file.
+
+    Returns
+    -------
+    Dict[str, List[Competency]]
+        A Dict with sentences as keys and a List of competency triples as values.
+    """
+
+    with open(path, "r") as tsv_file:
+        return convert_tsv_to_competencies(TsvReader().iter_tsv(tsv_file))
+
+
+def convert_tsv_file_with_metrics(path: str) -> Tuple[Dict[str, List[Competency]], Dict]:
+    """Converts an annotated tsv file in a worker process and returns the metrics of the conversion,
+    so they can be merged into the metrics of the main process.
+
+    Parameters
+    ----------
+    path : str
+        The path of the tsv file.
+
+    Returns
+    -------
+    Tuple[Dict[str, List[Competency]], Dict]
+        The competency triples of the file, see convert_tsv_file_to_competencies(), and the metrics
+        of converting it, see Metrics.snapshot().
+    """
+
+    metrics.reset()
+    return convert_tsv_file_to_competencies(path), metrics.snapshot()
+
+
+def convert_tsv_files_to_competencies(paths: List[str], processes: int = 1, sentence_files: Dict[str, str] = None,
+                                      cache: CompetencyCache = None) -> Dict[str, List[Competency]]:
+    """Reads multiple annotated tsv files and converts them to competency triples.
+
+    Files are read and converted in parallel by a pool of processes. Results are merged in the order
+    of paths, so if a sentence appears in multiple files, the triples of the last file win, regardless
+    of the number of processes.
+
+    Parameters
+    ----------
+    paths : List[str]
+        The paths of the tsv files.
+    processes : int, optional
+        The number of processes, by default 1. If 1, files are converted in this process.
+    sentence_files : Dict[str, str], optional
+        If given, filled with the sentences as keys and the path of the file their triples were read from as values,
+        e.g. to break down evaluation results by file. By default None
+    cache : CompetencyCache, optional
+        A cache of converted files, by default None. If given, only files missing in the cache or changed
+        are converted, and their triples are added to the cache.
+
+    Returns
+    -------
+    Dict[str, List[Competency]]
+        A Dict with sentences as keys and a List of competency triples as values.
+    """
+
+    if processes < 1:
+        raise ValueError("processes must be at least 1.")
+
+    file_sentences: Dict[str, Dict[str, List[Competency]]] = {}
+    fingerprints: Dict[str, Fingerprint] = {}
+    missing_paths: List[str] = []
+    for path in paths:
+        if path in file_sentences or path in fingerprints:
+            continue
+        cached = cache.get(path) if cache is not None else None
+        if cached is not None:
+            file_sentences[path] = cached
+        else:
+            missing_paths.append(path)
+            if cache is not None:
+                fingerprints[path] = cache.fingerprint(path)
+    metrics.count("tsv.files", len(missing_paths))
+    if cache is not None:
+        metrics.count("gold_cache.hits", len(file_sentences))
+        metrics.count("gold_cache.misses", len(missing_paths))
+
+    if processes == 1 or len(missing_paths) < 2:
+        converted = list(
+            map(convert_tsv_file_to_competencies, missing_paths))
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(missing_paths))) as executor:
+            converted = []
+            for path_sentences, path_metrics in executor.map(convert_tsv_file_with_metrics, missing_paths):
+                converted.append(path_sentences)
+                metrics.merge(path_metrics)
+    for path, path_sentences in zip(missing_paths, converted):
+        file_sentences[path] = path_sentences
+        if cache is not None:
+            cache.put(path, path_sentences, fingerprints[path])
+
+    sentences: Dict[str, List[Competency]] = {}
+    for path in paths:
+        sentences.update(file_sentences[path])
+        if sentence_files is not None:
+            sentence_files.update(dict.fromkeys(file_sentences[path], path))
     return sentences
 
 
-def convert_token_number(token_number: str) -> int:
-    """Helper function to convert the token index from 1 and string based to 0 and int based index.
+def convert_token_number(token_number: int) -> int:
+    """Helper function to convert the token index from 1 based to 0 based index.
 
     Parameters
     ----------
-    token_number : str
+    token_number : int
         The token number as it appears in the tsv.
 
     Returns
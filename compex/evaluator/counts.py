@@ -0,0 +1,305 @@
+from typing import Dict, List, Tuple
+from array import array
+
+import numpy as np
+
+from compex.model.taxonomy import BloomsTaxonomyDimensionEnum
+
+NO_TAXONOMY_DIMENSION = -1
+
+
+class CompetencyCounts:
+    """The number of correct and incorrect parts of scored competencies, stored in arrays.
+
+    Each competency contributes trues / (trues + falses) to the true and falses / (trues + falses) to the false score.
+    Sums are computed sequentially in the order the competencies were added, so they are exactly equal to adding
+    up the scores one by one.
+    """
+
+    def __init__(self, sentences: np.ndarray, trues: np.ndarray, falses: np.ndarray, dimensions: np.ndarray):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        sentences : np.ndarray
+            The index of the sentence of each competency.
+        trues : np.ndarray
+            The number of correct parts of each competency.
+        falses : np.ndarray
+            The number of incorrect parts of each competency.
+        dimensions : np.ndarray
+            The taxonomy dimension of each competency, NO_TAXONOMY_DIMENSION if it has none.
+        """
+
+        self.sentences: np.ndarray = sentences
+        self.trues: np.ndarray = trues
+        self.falses: np.ndarray = falses
+        self.dimensions: np.ndarray = dimensions
+
+    def __len__(self) -> int:
+        return len(self.trues)
+
+    def scores(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculates the true and false score of each competency.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The true and false scores.
+        """
+
+        parts = self.trues + self.falses
+        return self.trues / parts, self.falses / parts
+
+    def totals(self) -> Tuple[float, float]:
+        """Sums up the true and false scores of all competencies.
+
+        Returns
+        -------
+        Tuple[float, float]
+            The sum of true and false scores. Both are int 0, if there are no competencies.
+        """
+
+        if not len(self):
+            return 0, 0
+        true_scores, false_scores = self.scores()
+        # cumsum adds sequentially, unlike the pairwise summation of sum
+        return float(np.cumsum(true_scores)[-1]), float(np.cumsum(false_scores)[-1])
+
+    def group_totals(self, groups: np.ndarray, group_count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sums up the true and false scores of the competencies of each group.
+
+        Parameters
+        ----------
+        groups : np.ndarray
+            The group index of each competency.
+        group_count : int
+            The number of groups.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray]
+            The sum of true and false scores and the number of competencies of each group.
+        """
+
+        true_scores, false_scores = self.scores()
+        return (np.bincount(groups, weights=true_scores, minlength=group_count),
+                np.bincount(groups, weights=false_scores,
+                            minlength=group_count),
+                np.bincount(groups, minlength=group_count))
+
+
+class CompetencyCountsBuilder:
+    """Collects the counts of scored competencies in compact arrays."""
+
+    def __init__(self):
+        """Creates a new instance."""
+
+        self.__sentences = array("q")
+        self.__trues = array("q")
+        self.__falses = array("q")
+        self.__dimensions = array("b")
+
+    def add(self, sentence: int, trues: int, falses: int, dimension: int = None):
+        """Adds the counts of a competency.
+
+        Parameters
+        ----------
+        sentence : int
+            The index of the sentence of the competency.
+        trues : int
+            The number of correct parts.
+        falses : int
+            The number of incorrect parts.
+        dimension : int, optional
+            The value of the taxonomy dimension of the competency, by default None
+        """
+
+        self.__sentences.append(sentence)
+        self.__trues.append(trues)
+        self.__falses.append(falses)
+        self.__dimensions.append(
+            NO_TAXONOMY_DIMENSION if dimension is None else dimension)
+
+    def build(self) -> CompetencyCounts:
+        """Creates the arrays of the collected counts.
+
+        Returns
+        -------
+        CompetencyCounts
+            The counts.
+        """
+
+        return CompetencyCounts(np.frombuffer(self.__sentences, dtype=np.int64),
+                                np.frombuffer(self.__trues, dtype=np.int64),
+                                np.frombuffer(self.__falses, dtype=np.int64),
+                                np.frombuffer(self.__dimensions, dtype=np.int8))
+
+
+class EvaluationCounts:
+    """The counts of an evaluation. Calculates precision, recall and f1 of all competencies or of slices of them.
+
+    Positives are the counts of the annotated competencies compared to the test data,
+    negatives the counts of the test data compared to the annotated competencies.
+    """
+
+    def __init__(self, sentences: List[str], positives: CompetencyCounts, negatives: CompetencyCounts):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        sentences : List[str]
+            The evaluated sentences. Competencies refer to them by index.
+        positives : CompetencyCounts
+            The counts of the annotated competencies.
+        negatives : CompetencyCounts
+            The counts of the competencies of the test data.
+        """
+
+        self.sentences: List[str] = sentences
+        self.positives: CompetencyCounts = positives
+        self.negatives: CompetencyCounts = negatives
+
+    def summary(self) -> Dict:
+        """Calculates precision, recall and f1 of all competencies.
+
+        Returns
+        -------
+        Dict
+            Dictionary with evaluation results such as precision, recall and f1.
+        """
+
+        true_positives, false_positives = self.positives.totals()
+        true_negatives, false_negatives = self.negatives.totals()
+        return self.__create_result(true_positives, false_positives, true_negatives, false_negatives)
+
+    def by_sentence(self) -> Dict[str, Dict]:
+        """Calculates precision, recall and f1 of each sentence.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the sentences as keys and their evaluation results as values.
+        """
+
+        return self.__by_groups(self.positives.sentences, self.negatives.sentences, self.sentences)
+
+    def by_file(self, sentence_files: Dict[str, str]) -> Dict[str, Dict]:
+        """Calculates precision, recall and f1 of the sentences of each file.
+
+        Parameters
+        ----------
+        sentence_files : Dict[str, str]
+            A dictionary with sentences as keys and the file they were read from as values.
+            Sentences without a file are left out.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the files as keys and their evaluation results as values.
+        """
+
+        files = list(dict.fromkeys(sentence_files.values()))
+        file_indexes = {file: index for index, file in enumerate(files)}
+        # Map sentences without a file to an extra group, that is left out
+        sentence_groups = np.array([file_indexes.get(sentence_files.get(sentence), len(files))
+                                    for sentence in self.sentences], dtype=np.int64)
+        return self.__by_groups(sentence_groups[self.positives.sentences],
+                                sentence_groups[self.negatives.sentences], files)
+
+    def by_taxonomy_dimension(self) -> Dict[str, Dict]:
+        """Calculates precision, recall and f1 of the competencies of each taxonomy dimension.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the names of the taxonomy dimensions as keys and their evaluation results as values.
+            Competencies without taxonomy dimension are grouped as "NONE".
+        """
+
+        names = [dimension.name for dimension in BloomsTaxonomyDimensionEnum] + ["NONE"]
+
+        def groups(dimensions: np.ndarray) -> np.ndarray:
+            # Competencies without taxonomy dimension are mapped to the last group
+            return np.where(dimensions == NO_TAXONOMY_DIMENSION, len(names) - 1, dimensions).astype(np.int64)
+
+        return self.__by_groups(groups(self.positives.dimensions), groups(self.negatives.dimensions), names)
+
+    def __by_groups(self, positive_groups: np.ndarray, negative_groups: np.ndarray, names: List[str]) -> Dict[str, Dict]:
+        """Calculates precision, recall and f1 of groups of competencies.
+
+        Parameters
+        ----------
+        positive_groups : np.ndarray
+            The group index of each positive competency.
+        negative_groups : np.ndarray
+            The group index of each negative competency.
+        names : List[str]
+            The names of the groups. Groups without name or competencies are left out.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the names of the groups as keys and their evaluation results as values.
+        """
+
+        group_count = max(len(names), int(positive_groups.max(initial=-1)) + 1,
+                          int(negative_groups.max(initial=-1)) + 1)
+        true_positives, false_positives, positive_counts = self.positives.group_totals(
+            positive_groups, group_count)
+        true_negatives, false_negatives, negative_counts = self.negatives.group_totals(
+            negative_groups, group_count)
+
+        precision = self.__divide(true_positives, false_positives)
+        recall = self.__divide(true_positives, false_negatives)
+        f1 = np.zeros(group_count)
+        has_f1 = (precision != 0) | (recall != 0)
+        f1[has_f1] = 2 * ((precision[has_f1] * recall[has_f1]) /
+                          (precision[has_f1] + recall[has_f1]))
+
+        results: Dict[str, Dict] = {}
+        for index, name in enumerate(names):
+            if positive_counts[index] or negative_counts[index]:
+                # Like totals(), sums without competencies are int 0
+                results[name] = self.__create_result(
+                    float(true_positives[index]) if positive_counts[index] else 0,
+                    float(false_positives[index]) if positive_counts[index] else 0,
+                    float(true_negatives[index]) if negative_counts[index] else 0,
+                    float(false_negatives[index]) if negative_counts[index] else 0,
+                    float(precision[index]), float(recall[index]), float(f1[index]))
+        return results
+
+    def __divide(self, trues: np.ndarray, falses: np.ndarray) -> np.ndarray:
+        """Calculates trues / (trues + falses) elementwise, 0.0 where both are 0."""
+
+        result = np.zeros(len(trues))
+        nonzero = (trues != 0) | (falses != 0)
+        result[nonzero] = trues[nonzero] / (trues[nonzero] + falses[nonzero])
+        return result
+
+    def __create_result(self, true_positives: float, false_positives: float, true_negatives: float,
+                        false_negatives: float, precision: float = None, recall: float = None, f1: float = None) -> Dict:
+        """Creates the evaluation result of FMeasureEvaluator. Calculates precision, recall and f1, if not given."""
+
+        if precision is None:
+            precision = true_positives / \
+                (true_positives + false_positives) if true_positives or false_positives else 0.0
+        if recall is None:
+            recall = true_positives / \
+                (true_positives + false_negatives) if true_positives or false_negatives else 0.0
+        if f1 is None:
+            f1 = 2 * ((precision * recall) / (precision + recall)
+                      ) if precision or recall else 0.0
+        return {
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+            "positives": {
+                "true": true_positives,
+                "false": false_positives
+            },
+            "negatives": {
+                "true": true_negatives,
+                "false": false_negatives
+            }
+        }
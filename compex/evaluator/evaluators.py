@@ -1,9 +1,14 @@
-from typing import Dict, List
+from typing import Dict, List, Set, Tuple
 from enum import Enum
 
-from compex.model.competency import Competency
+from compex.evaluator.counts import CompetencyCountsBuilder, EvaluationCounts
+from compex.instrumentation.metrics import metrics
+from compex.model.competency import Competency, Word, WordChunk
 from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
 
+# Correct parts, incorrect parts and taxonomy dimension value (or None) of a scored competency
+CompetencyScore = Tuple[int, int, int]
+
 
 class EvaluationSet:
     """Helper class to manage testdata and data annotated by an algorithm."""
@@ -51,6 +56,101 @@ class CalculationType(Enum):
     NEGATIVE = 1
 
 
+class ObjectIndex:
+    """Hash index of the objects and contexts of a competency, used to score another competency against it."""
+
+    def __init__(self, competency: Competency):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        competency : Competency
+            The competency to index.
+        """
+
+        # Objects and contexts are keyed by their word chunks
+        self.objects: Set[WordChunk] = set()
+        self.object_words: Set[Word] = set()
+        # Number of objects with a context, a whole context is counted once per object containing it
+        self.contexts: Dict[WordChunk, int] = {}
+        # Number of times a single context word is counted as correct. It's counted once for the first object
+        # with a context containing it and once for every later object, whose first context contains it.
+        self.context_words: Dict[Word, int] = {}
+        for competency_object in competency.objects:
+            self.objects.add(competency_object.word_chunk)
+            self.object_words.update(competency_object.word_chunk.words)
+            if not competency_object.contexts:
+                continue
+            object_contexts = set()
+            object_context_words = set()
+            for context in competency_object.contexts:
+                object_contexts.add(context.word_chunk)
+                object_context_words.update(context.word_chunk.words)
+            for context in object_contexts:
+                self.contexts[context] = self.contexts.get(context, 0) + 1
+            for word in set(competency_object.contexts[0].word_chunk.words):
+                if word in self.context_words:
+                    self.context_words[word] += 1
+            for word in object_context_words:
+                if word not in self.context_words:
+                    self.context_words[word] = 1
+
+
+class CompetencyIndex:
+    """Hash index of the competencies of a sentence, used to score the competencies of another annotation against."""
+
+    def __init__(self, competencies: List[Competency]):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        competencies : List[Competency]
+            The competencies of a sentence.
+        """
+
+        # If a competency verb appears multiple times, the first competency is used
+        self.competencies: Dict[Word, Competency] = {}
+        for competency in competencies:
+            self.competencies.setdefault(competency.word, competency)
+        self.__object_indexes: Dict[Word, ObjectIndex] = {}
+
+    def find(self, word: Word) -> Competency:
+        """Finds the competency of a competency verb.
+
+        Parameters
+        ----------
+        word : Word
+            The competency verb.
+
+        Returns
+        -------
+        Competency
+            The competency or None, if there is none.
+        """
+
+        return self.competencies.get(word)
+
+    def get_object_index(self, word: Word) -> ObjectIndex:
+        """Gets the index of the objects and contexts of a competency. Indexes are built when they're needed first.
+
+        Parameters
+        ----------
+        word : Word
+            The competency verb of an indexed competency.
+
+        Returns
+        -------
+        ObjectIndex
+            The index of the objects and contexts of the competency.
+        """
+
+        object_index = self.__object_indexes.get(word)
+        if object_index is None:
+            object_index = ObjectIndex(self.competencies[word])
+            self.__object_indexes[word] = object_index
+        return object_index
+
+
 class FMeasureEvaluator:
     """Evaluator precision, recall and f1-score"""
 
@@ -76,48 +176,26 @@ class FMeasureEvaluator:
             Dictionary with evaluation results such as precision, recall and f1.
         """
 
-        # Calculate true positives and false positives
-        true_positives, false_positives = self.__count_positive_negative(
-            evaluation_set, CalculationType.POSITIVE, consider_objects, consider_contexts)
-
-        # Calculate true negatives and false negatives
-        true_negatives, false_negatives = self.__count_positive_negative(
-            evaluation_set, CalculationType.NEGATIVE, consider_objects, consider_contexts)
-
-        precision = self.__calculate_precision(true_positives, false_positives)
-        recall = self.__calculate_recall(true_positives, false_negatives)
-        f1 = self.__calculate_f1_score(precision, recall)
-
-        return {
-            "precision": precision,
-            "recall": recall,
-            "f1": f1,
-            "positives": {
-                "true": true_positives,
-                "false": false_positives
-            },
-            "negatives": {
-                "true": true_negatives,
-                "false": false_negatives
-            }
-        }
-
-    def __count_positive_negative(self, evaluation_set: EvaluationSet, mode: CalculationType = CalculationType.POSITIVE,
-                                  consider_objects: bool = False, consider_contexts: bool = False) -> List[float]:
-        """Counts either positive or negative based objects in evaluationset.
+        return self.count(evaluation_set, consider_objects, consider_contexts).summary()
+
+    def count(self, evaluation_set: EvaluationSet, consider_objects: bool = False,
+              consider_contexts: bool = False) -> EvaluationCounts:
+        """Counts the correct and incorrect parts of each competency in evaluationset.
 
         A completely correct competency gets a score of 1.0. If considered, every object and context
         is treated equally in the calculation, so that a correct competency which has a two worded object,
         but only one of them is found, it's 2/3 correct (competency + one object word) and 1/3 incorrect
         (the other object word). If the competency is not found, it's score is 0.0.
-        Default mode is positive.
+
+        Positives score the annotated competencies against the test data, negatives the test data against
+        the annotated competencies. Both are counted in the same pass, using hash indexes of the competencies
+        of each sentence. Use the returned counts to calculate precision, recall and f1 of all competencies
+        or of each sentence, file or taxonomy dimension.
 
         Parameters
         ----------
         evaluation_set : EvaluationSet
             The EvaluationSet to use for evaluation.
-        mode : CalculationType, optional
-            Positive or negative based calculation, by default CalculationType.POSITIVE
         consider_objects : bool, optional
             Consider competency triple's objects in the calculation, by default False
         consider_contexts : bool, optional
@@ -125,148 +203,139 @@ class FMeasureEvaluator:
 
         Returns
         -------
-        List[float]
-            A list with two values, true and false postives/negatives.
+        EvaluationCounts
+            The counts of all competencies.
         """
 
-        trues = 0
-        falses = 0
+        with metrics.timer("evaluate.count"):
+            sentences: List[str] = []
+            positives = CompetencyCountsBuilder()
+            negatives = CompetencyCountsBuilder()
 
-        for _, data in evaluation_set.merged_data.items():
-            if len(data) == 2:
-                # Switch dicts if needed according to positive or negative mode
-                if mode == CalculationType.POSITIVE:
-                    dict1 = data["annotated_data"]
-                    dict2 = data["test_data"]
-                elif mode == CalculationType.NEGATIVE:
-                    dict1 = data["test_data"]
-                    dict2 = data["annotated_data"]
-
-                for dict1_competency in dict1:
-                    in_comp_trues = 0
-                    in_comp_falses = 0
-                    competency_is_found: bool = False
-                    for dict2_compentency in dict2:
-                        if dict2_compentency.word == dict1_competency.word:
-                            competency_is_found = True
-                            in_comp_trues += 1
-                            if consider_objects:
-                                # Check the competencies objects
-                                for dict1_object in dict1_competency.objects:
-                                    is_whole_object_found: bool = False
-                                    for dict2_object in dict2_compentency.objects:
-                                        if dict2_object == dict1_object:
-                                            is_whole_object_found = True
-                                            # Add the count of the objects
-                                            # words to
-                                            in_comp_trues += len(
-                                                dict1_object.word_chunk.words)
-                                            break
-                                    # Check each word of objects if the whole
-                                    # object is not correct
-                                    if not is_whole_object_found:
-                                        for dict1_object_word in dict1_object.word_chunk.words:
-                                            is_object_word_found: bool = False
-                                            for dict2_object in dict2_compentency.objects:
-                                                for dict2_object_word in dict2_object.word_chunk.words:
-                                                    if dict1_object_word == dict2_object_word:
-                                                        is_object_word_found = True
-                                                        in_comp_trues += 1
-                                                        break
-                                                if is_object_word_found:
-                                                    break
-                                            if not is_object_word_found:
-                                                in_comp_falses += 1
-                                    # Check the objects contexts
-                                    if consider_contexts:
-                                        for dict1_context in dict1_object.contexts:
-                                            is_whole_context_found: bool = False
-                                            for dict2_object in dict2_compentency.objects:
-                                                for dict2_context in dict2_object.contexts:
-                                                    if dict2_context == dict1_context:
-                                                        is_whole_context_found = True
-                                                        in_comp_trues += len(
-                                                            dict1_context.word_chunk.words)
-                                                        break
-                                            # Check each word of context if the
-                                            # whole context is not correct
-                                            if not is_whole_context_found:
-                                                for dict1_context_word in dict1_context.word_chunk.words:
-                                                    is_context_word_found: bool = False
-                                                    for dict2_object in dict2_compentency.objects:
-                                                        for dict2_context in dict2_object.contexts:
-                                                            for dict2_context_word in dict2_context.word_chunk.words:
-                                                                if dict1_context_word == dict2_context_word:
-                                                                    is_context_word_found = True
-                                                                    in_comp_trues += 1
-                                                                    break
-                                                            if is_context_word_found:
-                                                                break
-                                                    if not is_context_word_found:
-                                                        in_comp_falses += 1
-                            break
-                    if not competency_is_found:
-                        in_comp_falses += 1
-                    trues += in_comp_trues / (in_comp_trues + in_comp_falses)
-                    falses += in_comp_falses / (in_comp_trues + in_comp_falses)
-
-        return [trues, falses]
-
-    def __calculate_precision(self, true_positives: float,
-                              false_positives: float) -> float:
-        """Calculates precision.
+            evaluated = [(sentence, data["test_data"], data["annotated_data"])
+                         for sentence, data in evaluation_set.merged_data.items() if len(data) == 2]
+
+            for sentence_index, (sentence, test_data, annotated_data) in enumerate(evaluated):
+                sentences.append(sentence)
+                positive_scores, negative_scores = self.__score_sentence(
+                    test_data, annotated_data, consider_objects, consider_contexts)
+
+                for trues, falses, dimension in positive_scores:
+                    positives.add(sentence_index, trues, falses, dimension)
+                for trues, falses, dimension in negative_scores:
+                    negatives.add(sentence_index, trues, falses, dimension)
+
+            metrics.count("evaluate.sentences", len(evaluated))
+            return EvaluationCounts(sentences, positives.build(), negatives.build())
+
+    def __score_sentence(self, test_data: List[Competency], annotated_data: List[Competency],
+                         consider_objects: bool = False,
+                         consider_contexts: bool = False) -> Tuple[List[CompetencyScore], List[CompetencyScore]]:
+        """Scores the annotated competencies of a sentence against its test data and vice versa.
 
         Parameters
         ----------
-        true_positives : float
-            true_positives
-        false_positives : float
-            true_positives
+        test_data : List[Competency]
+            The competencies of the test data.
+        annotated_data : List[Competency]
+            The annotated competencies.
+        consider_objects : bool, optional
+            Consider competency triple's objects in the calculation, by default False
+        consider_contexts : bool, optional
+            Consider competency triple's contexts in the calculation, by default False
 
         Returns
         -------
-        float
-            precision based from 0.0 to 1.0
+        Tuple[List[CompetencyScore], List[CompetencyScore]]
+            The correct and incorrect parts and the taxonomy dimension value of each annotated
+            and each test data competency.
         """
 
-        return true_positives / \
-            (true_positives + false_positives) if true_positives or false_positives else 0.0
+        annotated_index = CompetencyIndex(annotated_data)
+        test_index = CompetencyIndex(test_data)
 
-    def __calculate_recall(self, true_positives: float,
-                           false_negatives: float) -> float:
-        """Calculates recall.
+        positive_scores: List[CompetencyScore] = []
+        for competency in annotated_data:
+            in_comp_trues, in_comp_falses, match = self.__score_competency(
+                competency, test_index, consider_objects, consider_contexts)
+            positive_scores.append((in_comp_trues, in_comp_falses,
+                                    self.__get_taxonomy_dimension(competency, match)))
 
-        Parameters
-        ----------
-        true_positives : float
-            true_positives
-        false_negatives : float
-            false_negatives
+        negative_scores: List[CompetencyScore] = []
+        for competency in test_data:
+            in_comp_trues, in_comp_falses, match = self.__score_competency(
+                competency, annotated_index, consider_objects, consider_contexts)
+            negative_scores.append((in_comp_trues, in_comp_falses,
+                                    self.__get_taxonomy_dimension(competency, match)))
+        return positive_scores, negative_scores
 
-        Returns
-        -------
-        float
-            recall based from 0.0 to 1.0
+    def __get_taxonomy_dimension(self, competency: Competency, match: Competency = None) -> int:
+        """Gets the taxonomy dimension value of a competency or, if it has none, of its match.
+
+        Test data has no taxonomy dimensions, so they are taken from the matching annotated competency.
         """
 
-        return true_positives / \
-            (true_positives + false_negatives) if true_positives or false_negatives else 0.0
+        taxonomy_dimension = competency.taxonomy_dimension
+        if taxonomy_dimension is None and match is not None:
+            taxonomy_dimension = match.taxonomy_dimension
+        return None if taxonomy_dimension is None else taxonomy_dimension.value
+
+    def __score_competency(self, competency: Competency, index: CompetencyIndex, consider_objects: bool = False,
+                           consider_contexts: bool = False) -> Tuple[int, int, Competency]:
+        """Counts the correct and incorrect parts of a competency compared to the competencies of a CompetencyIndex.
 
-    def __calculate_f1_score(self, precision: float, recall: float) -> float:
-        """Calculates f1 score.
+        Whole objects or contexts count as many correct parts as they have words. Objects or contexts,
+        which are not found as a whole, are compared word by word.
 
         Parameters
         ----------
-        precision : float
-            precision based from 0.0 to 1.0
-        recall : float
-            recall based from 0.0 to 1.0
+        competency : Competency
+            The competency to score.
+        index : CompetencyIndex
+            The index of the competencies to compare with.
+        consider_objects : bool, optional
+            Consider competency triple's objects in the calculation, by default False
+        consider_contexts : bool, optional
+            Consider competency triple's contexts in the calculation, by default False
 
         Returns
         -------
-        float
-            f1 score based from 0.0 to 1.0
+        Tuple[int, int, Competency]
+            The number of correct and incorrect parts and the matching competency of the index, if any.
         """
 
-        return 2 * ((precision * recall) / (precision + recall)
-                    ) if precision or recall else 0.0
+        match = index.find(competency.word)
+        if match is None:
+            return 0, 1, None
+
+        trues = 1
+        falses = 0
+        if consider_objects:
+            object_index = index.get_object_index(competency.word)
+            for competency_object in competency.objects:
+                object_words = competency_object.word_chunk.words
+                if competency_object.word_chunk in object_index.objects:
+                    trues += len(object_words)
+                else:
+                    for word in object_words:
+                        if word in object_index.object_words:
+                            trues += 1
+                        else:
+                            falses += 1
+
+                if consider_contexts:
+                    for context in competency_object.contexts:
+                        context_words = context.word_chunk.words
+                        context_count = object_index.contexts.get(
+                            context.word_chunk, 0)
+                        if context_count:
+                            trues += len(context_words) * context_count
+                        else:
+                            for word in context_words:
+                                word_count = object_index.context_words.get(
+                                    word, 0)
+                                if word_count:
+                                    trues += word_count
+                                else:
+                                    falses += 1
+        return trues, falses, match
@@ -0,0 +1,258 @@
+from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from compex.evaluator.counts import EvaluationCounts
+from compex.instrumentation.metrics import metrics
+
+MEASURES = ("precision", "recall", "f1")
+# Resamples per task of the process pool. Fixed, so results don't depend on the number of processes.
+RESAMPLES_PER_TASK = 500
+# Maximum number of sampled sentences held in memory at once per task
+MAX_SAMPLED_SENTENCES = 2 ** 20
+
+
+def sentence_counts(counts: EvaluationCounts, sentences: List[str] = None) -> np.ndarray:
+    """Sums up the scores of the competencies of each sentence.
+
+    Parameters
+    ----------
+    counts : EvaluationCounts
+        The counts of an evaluation.
+    sentences : List[str], optional
+        The sentences to sum up, by default the sentences of counts. Sentences missing in counts have zero sums.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (sentences, 4) with the true positives, false positives, true negatives and false negatives
+        of each sentence.
+    """
+
+    sentence_count = len(counts.sentences)
+    sums = np.stack(counts.positives.group_totals(counts.positives.sentences, sentence_count)[:2]
+                    + counts.negatives.group_totals(counts.negatives.sentences, sentence_count)[:2], axis=1)
+    if sentences is None:
+        return sums
+
+    indexes = {sentence: index for index,
+               sentence in enumerate(counts.sentences)}
+    aligned = np.zeros((len(sentences), 4))
+    for index, sentence in enumerate(sentences):
+        if sentence in indexes:
+            aligned[index] = sums[indexes[sentence]]
+    return aligned
+
+
+def calculate_measures(totals: np.ndarray) -> np.ndarray:
+    """Calculates precision, recall and f1 like FMeasureEvaluator, vectorized over the leading dimensions.
+
+    Parameters
+    ----------
+    totals : np.ndarray
+        Array of shape (..., 4) with true positives, false positives, true negatives and false negatives.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (..., 3) with precision, recall and f1.
+    """
+
+    true_positives, false_positives, _, false_negatives = np.moveaxis(
+        totals, -1, 0)
+
+    def divide(dividend: np.ndarray, divisor: np.ndarray) -> np.ndarray:
+        result = np.zeros(np.shape(divisor))
+        np.divide(dividend, divisor, out=result, where=divisor != 0)
+        return result
+
+    precision = divide(true_positives, true_positives + false_positives)
+    recall = divide(true_positives, true_positives + false_negatives)
+    f1 = 2 * divide(precision * recall, precision + recall)
+    return np.stack((precision, recall, f1), axis=-1)
+
+
+def resample(sums: np.ndarray, seed: np.random.SeedSequence, resamples: int) -> np.ndarray:
+    """Calculates the measures of sentence bootstrap resamples of one or more systems.
+
+    All systems are resampled with the same sentences, so their measures are paired.
+
+    Parameters
+    ----------
+    sums : np.ndarray
+        Array of shape (systems, sentences, 4) with the sentence sums, see sentence_counts().
+    seed : np.random.SeedSequence
+        The seed of the random generator.
+    resamples : int
+        The number of resamples.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (resamples, systems, 3) with the precision, recall and f1 of each resample and system.
+    """
+
+    system_count, sentence_count, _ = sums.shape
+    # Resample all systems at once
+    flat_sums = sums.transpose(1, 0, 2).reshape(sentence_count, -1)
+    generator = np.random.default_rng(seed)
+    batch_size = max(1, MAX_SAMPLED_SENTENCES // max(1, sentence_count))
+
+    measures = np.empty((resamples, system_count, len(MEASURES)))
+    for start in range(0, resamples, batch_size):
+        size = min(batch_size, resamples - start)
+        samples = generator.integers(
+            0, sentence_count, size=(size, sentence_count))
+        totals = flat_sums[samples].sum(axis=1)
+        measures[start:start + size] = calculate_measures(
+            totals.reshape(size, system_count, 4))
+    return measures
+
+
+def bootstrap_measures(sums: np.ndarray, resamples: int, seed: int = None, processes: int = 1) -> np.ndarray:
+    """Calculates the measures of sentence bootstrap resamples in a pool of processes.
+
+    Resamples are split into tasks of RESAMPLES_PER_TASK with seeds spawned from seed,
+    so the result only depends on the seed, not on the number of processes.
+
+    Parameters
+    ----------
+    sums : np.ndarray
+        Array of shape (systems, sentences, 4) with the sentence sums, see sentence_counts().
+    resamples : int
+        The number of resamples.
+    seed : int, optional
+        The seed of the random generators, by default None for a random seed.
+    processes : int, optional
+        The number of processes, by default 1. If 1, resamples are calculated in this process.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (resamples, systems, 3) with the precision, recall and f1 of each resample and system.
+    """
+
+    if resamples < 1:
+        raise ValueError("resamples must be at least 1.")
+    if processes < 1:
+        raise ValueError("processes must be at least 1.")
+    if not sums.shape[1]:
+        raise ValueError("At least one sentence is needed to resample.")
+
+    sizes = [min(RESAMPLES_PER_TASK, resamples - start)
+             for start in range(0, resamples, RESAMPLES_PER_TASK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with metrics.timer("evaluate.bootstrap"):
+        if processes == 1 or len(sizes) < 2:
+            results = map(resample, [sums] * len(sizes), seeds, sizes)
+            return np.concatenate(list(results))
+
+        with ProcessPoolExecutor(max_workers=min(processes, len(sizes))) as executor:
+            return np.concatenate(list(executor.map(resample, [sums] * len(sizes), seeds, sizes)))
+
+
+def bootstrap(counts: EvaluationCounts, resamples: int = 1000, confidence: float = 0.95, seed: int = None,
+              processes: int = 1) -> Dict:
+    """Calculates bootstrap confidence intervals of precision, recall and f1 by resampling sentences.
+
+    Parameters
+    ----------
+    counts : EvaluationCounts
+        The counts of an evaluation.
+    resamples : int, optional
+        The number of resamples, by default 1000
+    confidence : float, optional
+        The confidence level of the intervals, by default 0.95
+    seed : int, optional
+        The seed of the random generators, by default None for a random seed.
+    processes : int, optional
+        The number of processes, by default 1
+
+    Returns
+    -------
+    Dict
+        Dictionary with the lower and upper bound of precision, recall and f1.
+    """
+
+    measures = bootstrap_measures(
+        sentence_counts(counts)[np.newaxis], resamples, seed, processes)[:, 0]
+    lower, upper = confidence_interval(measures, confidence)
+    result = {"resamples": resamples, "confidence": confidence}
+    for index, measure in enumerate(MEASURES):
+        result[measure] = [float(lower[index]), float(upper[index])]
+    return result
+
+
+def compare(counts: EvaluationCounts, other: EvaluationCounts, resamples: int = 1000, confidence: float = 0.95,
+            seed: int = None, processes: int = 1) -> Dict:
+    """Compares two evaluations of the same sentences with a paired bootstrap test.
+
+    The difference of each measure is other minus counts. Its p-value is two-sided: the share of resampled
+    differences that are at least as far away from the observed difference as the observed difference is from 0.
+
+    Parameters
+    ----------
+    counts : EvaluationCounts
+        The counts of the first evaluation.
+    other : EvaluationCounts
+        The counts of the second evaluation.
+    resamples : int, optional
+        The number of resamples, by default 1000
+    confidence : float, optional
+        The confidence level of the intervals of the differences, by default 0.95
+    seed : int, optional
+        The seed of the random generators, by default None for a random seed.
+    processes : int, optional
+        The number of processes, by default 1
+
+    Returns
+    -------
+    Dict
+        Dictionary with the difference, its confidence interval and p-value of precision, recall and f1.
+    """
+
+    sentences = list(dict.fromkeys(counts.sentences + other.sentences))
+    sums = np.stack((sentence_counts(counts, sentences),
+                     sentence_counts(other, sentences)))
+    summary, other_summary = counts.summary(), other.summary()
+    observed_differences = np.array(
+        [other_summary[measure] - summary[measure] for measure in MEASURES])
+
+    measures = bootstrap_measures(sums, resamples, seed, processes)
+    differences = measures[:, 1] - measures[:, 0]
+    lower, upper = confidence_interval(differences, confidence)
+    extreme = np.abs(differences - observed_differences) >= np.abs(observed_differences)
+    p_values = (extreme.sum(axis=0) + 1) / (resamples + 1)
+
+    result = {"resamples": resamples, "confidence": confidence}
+    for index, measure in enumerate(MEASURES):
+        result[measure] = {
+            "difference": float(observed_differences[index]),
+            "interval": [float(lower[index]), float(upper[index])],
+            "p_value": float(p_values[index])
+        }
+    return result
+
+
+def confidence_interval(measures: np.ndarray, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculates the percentile confidence interval of each measure.
+
+    Parameters
+    ----------
+    measures : np.ndarray
+        Array of shape (resamples, measures) with the measures of each resample.
+    confidence : float
+        The confidence level, between 0 and 1.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The lower and upper bound of each measure.
+    """
+
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1.")
+    alpha = 1 - confidence
+    lower, upper = np.quantile(measures, [alpha / 2, 1 - alpha / 2], axis=0)
+    return lower, upper
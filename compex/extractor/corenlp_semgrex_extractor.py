@@ -1,6 +1,13 @@
-from typing import Dict, List
-from stanfordnlp.server import CoreNLPClient
-
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from collections import deque
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from compex.extractor.corenlp_session import CoreNLPSession
+from compex.extractor.semgrex_cache import SemgrexCache
+from compex.extractor.dependency_graph import DependencyGraph
+from compex.extractor.semgrex_matcher import SemgrexPattern
+from compex.instrumentation.metrics import metrics
 from compex.model.competency import Competency, CompetencyObject, ObjectContext, Word, WordChunk
 from compex.model.taxonomy import TaxonomyManager, BloomsTaxonomyDimensionEnum
 
@@ -29,6 +36,86 @@ class SemgrexAnnotator:
 
     pattern = '{tag:/VVINF|VVFIN|VVIZU/}=competency ?>dobj ({}=object ?>amod {tag:ADJA}=objectadja ?>det ({tag:NN}=objectdet ?>amod {tag:ADJA}=objectdetadja ?>det {tag:ART}=objectdetart)) ?>nmod ({}=context ?>/conj:.*/ {}=context2 ?>amod {tag:ADJA}=contextadja) ?>/conj:.*/ {tag:/VVINF|VVFIN|VVIZU/}=competency2'
     semgrex_properties = {"annotators": "tokenize,ssplit,depparse"}
+    batch_properties = {"ssplit.eolonly": "true"}
+    dependencies = "enhancedDependencies"
+    batch_size = 1
+    workers = 1
+
+    def __init__(self, batch_size: int = None, session: CoreNLPSession = None, workers: int = None,
+                 cache: SemgrexCache = None, graph_cache: SemgrexCache = None):
+        """Creates a new instance.
+
+        Use the annotator as context manager or pass a session to share one CoreNLP server between
+        multiple calls of annotate(). Otherwise each call starts and stops its own server.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            The maximum number of sentences sent to CoreNLP in a single request, by default self.batch_size.
+            Batched sentences are joined by line breaks and split again by CoreNLP with ssplit.eolonly.
+            Every request is sent with ssplit.eolonly, so each input line is parsed as exactly one sentence,
+            whatever the batch size.
+        session : CoreNLPSession, optional
+            A CoreNLP session to use for all calls of annotate(), by default None
+        workers : int, optional
+            The number of requests sent to CoreNLP concurrently, by default self.workers
+        cache : SemgrexCache, optional
+            A cache of semgrex responses. Only sentences missing in the cache are sent to CoreNLP. By default None
+        graph_cache : SemgrexCache, optional
+            A cache of dependency graphs. If set, CoreNLP only parses sentences missing in the cache once and
+            self.pattern is matched against the cached graphs in Python, so changing the pattern does not need
+            CoreNLP. Only a subset of the semgrex language is supported in this mode, see SemgrexPattern.
+            By default None
+        """
+
+        self.session: CoreNLPSession = session
+        self.cache: SemgrexCache = cache
+        self.graph_cache: SemgrexCache = graph_cache
+        self.__compiled_pattern: SemgrexPattern = None
+        self.__owns_session: bool = False
+
+        if batch_size is not None:
+            if batch_size < 1:
+                raise ValueError("batch_size must be at least 1.")
+            self.batch_size = batch_size
+        if workers is not None:
+            if workers < 1:
+                raise ValueError("workers must be at least 1.")
+            self.workers = workers
+
+    def create_session(self, url: str = None, version: str = None) -> CoreNLPSession:
+        """Creates a CoreNLP session configured for this annotator.
+
+        Parameters
+        ----------
+        url : str, optional
+            The url of an already running CoreNLP server to attach to. If None, the session starts its own server.
+        version : str, optional
+            The version of CoreNLP the cache keys are created with, see CoreNLPSession. Required to cache the
+            responses of an attached server. By default None
+
+        Returns
+        -------
+        CoreNLPSession
+            The new, not yet started session.
+        """
+
+        return CoreNLPSession(url, annotators=self.annotators, properties=self.properties,
+                              timeout=self.timeout, memory=self.memory,
+                              pool_size=max(self.workers, CoreNLPSession.DEFAULT_POOL_SIZE), version=version)
+
+    def __enter__(self):
+        if self.session is None:
+            self.session = self.create_session()
+            self.__owns_session = True
+        self.session.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.__owns_session:
+            self.session.stop()
+            self.session = None
+            self.__owns_session = False
 
     def annotate(self, sentences: List[str], taxonomy_verbs: Dict[str,
                                                                   BloomsTaxonomyDimensionEnum] = None) -> Dict[str, List[Competency]]:
@@ -50,28 +137,355 @@ class SemgrexAnnotator:
             A dictionary with the sentences as keys and a list of extracted competency triples as values.
         """
 
-        sentences = [sentence.strip() for sentence in sentences]
-        matches = {}
-        # Temporarely fix: Send each sentence seperately to CoreNLP, as CoreNLPs sentence splitter splits sentences differently than input testdata.
-        # This generates a higher performance penalty to CoreNLP, as it loads
-        # the needed annotators for each sentence.
-        with CoreNLPClient(annotators=self.annotators, properties=self.properties, timeout=self.timeout, memory=self.memory) as client:
-            for sentence in sentences:
-                match = self.__run_corenlp_server_semgrex(client, sentence)
-                matches[sentence] = match
-
-        competencies = self.__convert_to_competencies(matches, taxonomy_verbs)
+        sentences = list(dict.fromkeys(
+            sentence.strip() for sentence in sentences))
+        metrics.count("extract.sentences", len(sentences))
+        session = self.session if self.session is not None else self.create_session()
+        if self.graph_cache is not None:
+            graphs = self.__request_uncached(
+                session, sentences, self.__run_corenlp_server_depparse, self.graph_cache)
+            with metrics.timer("extract.match"):
+                pattern = self.__compile_pattern()
+                matches = {}
+                for sentence, response in graphs.items():
+                    matches[sentence] = pattern.match_to_response(
+                        [DependencyGraph.from_compact(graph) for graph in response["sentences"]])
+        else:
+            matches = self.__request_uncached(
+                session, sentences, self.__run_corenlp_server_semgrex, self.cache, self.pattern)
+        metrics.count("extract.matches", sum(sentence.get("length", 0)
+                                             for response in matches.values() for sentence in response["sentences"]))
+
+        with metrics.timer("extract.convert"):
+            competencies = self.__convert_to_competencies(matches, taxonomy_verbs)
+        metrics.count("extract.competencies", sum(len(triples) for triples in competencies.values()))
         return competencies
 
-    def __run_corenlp_server_semgrex(self, client, text: str) -> Dict:
+    def annotate_stream(self, sentences: Iterable[str], taxonomy_verbs: Dict[str, BloomsTaxonomyDimensionEnum] = None,
+                        chunk_size: int = None) -> Iterator[Tuple[str, List[Competency]]]:
+        """Annotates a stream of sentences chunk by chunk and yields the results as soon as they are ready.
+
+        Only one chunk of sentences is held in memory at once. All chunks share one CoreNLP session,
+        which is stopped when the stream is exhausted, unless it's self.session.
+
+        Parameters
+        ----------
+        sentences : Iterable[str]
+            The sentences to extract competency triples from, e.g. the lines of a file. Read lazily.
+        taxonomy_verbs : Dict[str, BloomsTaxonomyDimensionEnum], optional
+            An optional taxonomy dict. If set, only accept comptency verbs that are defined in this dict.
+            Adds taxonomy dimenson to the Competency object. By default None.
+        chunk_size : int, optional
+            The number of sentences annotated at once, by default self.batch_size * self.workers,
+            so every worker gets one batch per chunk.
+
+        Yields
+        -------
+        Iterator[Tuple[str, List[Competency]]]
+            The stripped sentences and their extracted competency triples in input order.
+            Empty sentences are skipped, repeated sentences are yielded again.
+        """
+
+        if chunk_size is None:
+            chunk_size = self.batch_size * self.workers
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        owns_session = self.session is None
+        if owns_session:
+            self.session = self.create_session()
+        try:
+            iterator = iter(sentences)
+            while True:
+                chunk = [sentence.strip()
+                         for sentence in itertools.islice(iterator, chunk_size)]
+                if not chunk:
+                    break
+                competencies = self.annotate(chunk, taxonomy_verbs)
+                for sentence in chunk:
+                    if sentence in competencies:
+                        yield sentence, competencies[sentence]
+        finally:
+            if owns_session:
+                self.session.stop()
+                self.session = None
+
+    def __compile_pattern(self) -> SemgrexPattern:
+        """Compiles self.pattern for local matching. Reuses the compiled pattern as long as self.pattern is unchanged.
+
+        Returns
+        -------
+        SemgrexPattern
+            The compiled pattern.
+        """
+
+        if self.__compiled_pattern is None or self.__compiled_pattern.pattern != self.pattern:
+            self.__compiled_pattern = SemgrexPattern(self.pattern)
+        return self.__compiled_pattern
+
+    def __request_uncached(self, session: CoreNLPSession, sentences: List[str], request: Callable,
+                           cache: SemgrexCache = None, pattern: str = None) -> Dict[str, Dict]:
+        """Gets the responses of all sentences from the cache and requests the missing ones from CoreNLP.
+
+        Parameters
+        ----------
+        session : CoreNLPSession
+            The CoreNLP session to use. Is only started, if there are sentences missing in the cache.
+        sentences : List[str]
+            The sentences to get the responses of.
+        request : Callable
+            The function requesting the response of a text from CoreNLP.
+        cache : SemgrexCache, optional
+            The cache of the responses, by default None
+        pattern : str, optional
+            The semgrex pattern of the request, if any. Part of the cache key. By default None
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the sentences as keys and CoreNLP responses as values.
+        """
+
+        responses = self.__lookup_cache(cache, session, sentences, pattern)
+        missing = [sentence for sentence in sentences if sentence not in responses]
+
+        # CoreNLPs sentence splitter splits sentences differently than input testdata, so either send each
+        # sentence seperately or join them by line breaks and let CoreNLP split at line breaks only.
+        # Only start CoreNLP if there are sentences left to parse.
+        if missing:
+            if session is self.session:
+                session.ensure_alive()
+                responses.update(self.__run_batches(
+                    session, missing, request, cache, pattern))
+            else:
+                with session:
+                    responses.update(self.__run_batches(
+                        session, missing, request, cache, pattern))
+        return {sentence: responses[sentence] for sentence in sentences}
+
+    def __run_batches(self, session: CoreNLPSession, sentences: List[str], request: Callable,
+                      cache: SemgrexCache = None, pattern: str = None) -> Dict[str, Dict]:
+        """Requests the responses of all sentences from CoreNLP in batches and adds them to the cache.
+
+        Up to self.workers batches are sent concurrently, results are collected in input order.
+
+        Parameters
+        ----------
+        session : CoreNLPSession
+            The CoreNLP session to use.
+        sentences : List[str]
+            The sentences to request the responses of.
+        request : Callable
+            The function requesting the response of a text from CoreNLP.
+        cache : SemgrexCache, optional
+            The cache to add the responses to, by default None
+        pattern : str, optional
+            The semgrex pattern of the request, if any. Part of the cache key. By default None
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the sentences as keys and CoreNLP responses as values.
+        """
+
+        batches = self.__create_batches(list(dict.fromkeys(sentences)))
+
+        def run_batch(batch: List[str]) -> Dict[str, Dict]:
+            return self.__run_batch(session, batch, request)
+
+        responses: Dict[str, Dict] = {}
+        for batch_responses in self.__map_concurrently(run_batch, batches):
+            responses.update(batch_responses)
+            if cache is not None:
+                cache.put_many({self.__create_cache_key(session, sentence, pattern): response
+                                for sentence, response in batch_responses.items()})
+        return responses
+
+    def __lookup_cache(self, cache: SemgrexCache, session: CoreNLPSession, sentences: List[str],
+                       pattern: str = None) -> Dict[str, Dict]:
+        """Looks up the responses of sentences in a cache.
+
+        Parameters
+        ----------
+        cache : SemgrexCache
+            The cache to look up. If None, no sentence is found.
+        session : CoreNLPSession
+            The CoreNLP session the responses would be requested from.
+        sentences : List[str]
+            The sentences to look up.
+        pattern : str, optional
+            The semgrex pattern of the request, if any. Part of the cache key. By default None
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the cached sentences as keys and their CoreNLP responses as values.
+        """
+
+        if cache is None:
+            return {}
+        keys = {sentence: self.__create_cache_key(
+            session, sentence, pattern) for sentence in sentences}
+        responses = cache.get_many(keys.values())
+        cached = {sentence: responses[key] for sentence, key in keys.items() if key in responses}
+        name = "graph_cache" if cache is self.graph_cache else "cache"
+        metrics.count(f"{name}.hits", len(cached))
+        metrics.count(f"{name}.misses", len(sentences) - len(cached))
+        return cached
+
+    def __create_cache_key(self, session: CoreNLPSession, sentence: str, pattern: str = None) -> str:
+        """Creates the cache key of a sentence for a pattern, the annotator properties and the CoreNLP version.
+
+        Parameters
+        ----------
+        session : CoreNLPSession
+            The CoreNLP session the response is requested from.
+        sentence : str
+            The sentence.
+        pattern : str, optional
+            The semgrex pattern of the request. If None, the key is created for the dependency graph. By default None
+
+        Returns
+        -------
+        str
+            The cache key.
+
+        Raises
+        ------
+        ValueError
+            If the version of the session is unknown, so responses of different CoreNLP versions can't be told apart.
+        """
+
+        if session.version is None:
+            raise ValueError(
+                "The CoreNLP version of an attached server is unknown. Set a version to cache its responses.")
+        properties = {
+            "annotators": self.annotators,
+            "properties": self.properties,
+            "semgrex_properties": self.semgrex_properties,
+            "batch_properties": self.batch_properties
+        }
+        if pattern is None:
+            properties["dependencies"] = self.dependencies
+        return SemgrexCache.create_key(sentence, pattern, properties, session.version)
+
+    def __map_concurrently(self, function: Callable, items: List) -> Iterator:
+        """Applies function to all items with self.workers threads.
+
+        At most twice as many items as workers are in flight at once. Results are yielded in input order.
+
+        Parameters
+        ----------
+        function : Callable
+            The function to apply.
+        items : List
+            The items to apply the function to.
+
+        Yields
+        -------
+        Iterator
+            The results of the function in input order.
+        """
+
+        if self.workers == 1 or len(items) < 2:
+            for item in items:
+                yield function(item)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = deque()
+            for item in items:
+                if len(in_flight) >= 2 * self.workers:
+                    yield in_flight.popleft().result()
+                in_flight.append(executor.submit(function, item))
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def __create_batches(self, sentences: List[str]) -> List[List[str]]:
+        """Splits sentences into batches of at most self.batch_size sentences.
+
+        Sentences containing line breaks can't be joined with others and get a batch of their own.
+
+        Parameters
+        ----------
+        sentences : List[str]
+            The sentences to split into batches.
+
+        Returns
+        -------
+        List[List[str]]
+            A list of batches.
+        """
+
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        for sentence in sentences:
+            if "\n" in sentence:
+                batches.append([sentence])
+                continue
+            batch.append(sentence)
+            if len(batch) >= self.batch_size:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def __run_batch(self, session: CoreNLPSession, batch: List[str], request: Callable) -> Dict[str, Dict]:
+        """Requests the responses of a batch of sentences with a single request.
+
+        The sentences of CoreNLPs response are mapped back to the input sentences by their position.
+        If CoreNLP returns a different number of sentences than requested, each sentence of the batch
+        is sent seperately instead.
+
+        Parameters
+        ----------
+        session : CoreNLPSession
+            The CoreNLP session to use.
+        batch : List[str]
+            The sentences to request the responses of.
+        request : Callable
+            The function requesting the response of a text from CoreNLP.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the sentences as keys and CoreNLP responses as values.
+        """
+
+        matches: Dict[str, Dict] = {}
+        # Empty lines are dropped by the sentence splitter and can't contain any matches
+        texts = [sentence for sentence in batch if sentence]
+        # Split at line breaks only, even if a batch has a single sentence, so the result of a sentence
+        # never depends on the batch it is sent in
+        properties = dict(self.semgrex_properties, **self.batch_properties)
+
+        metrics.count("extract.batches")
+        if len(texts) == 1:
+            matches[texts[0]] = request(session, texts[0], properties)
+        elif texts:
+            response = request(session, "\n".join(texts), properties)
+            if len(response["sentences"]) == len(texts):
+                for sentence, sentence_response in zip(texts, response["sentences"]):
+                    matches[sentence] = {"sentences": [sentence_response]}
+            else:
+                metrics.count("extract.split_batches")
+                for sentence in texts:
+                    matches[sentence] = request(session, sentence, properties)
+
+        return {sentence: matches.get(sentence, {"sentences": []}) for sentence in batch}
+
+    def __run_corenlp_server_semgrex(self, session: CoreNLPSession, text: str, properties: Dict = None) -> Dict:
         """Runs executes the Semgrex query on text.
 
         Parameters
         ----------
-        client : [type]
-            The CoreNLP client to use.
+        session : CoreNLPSession
+            The CoreNLP session to use.
         text : str
             The text to execute the semgrex query on.
+        properties : Dict, optional
+            The properties of the request, by default self.semgrex_properties
 
         Returns
         -------
@@ -79,10 +493,36 @@ class SemgrexAnnotator:
             The response of the CoreNLP semgrex resource.
         """
 
-        matches = client.semgrex(
-            text, self.pattern, properties=self.semgrex_properties)
+        if properties is None:
+            properties = self.semgrex_properties
+        matches = session.semgrex(
+            text, self.pattern, properties=properties)
         return matches
 
+    def __run_corenlp_server_depparse(self, session: CoreNLPSession, text: str, properties: Dict = None) -> Dict:
+        """Parses text with CoreNLPs dependency parser.
+
+        Parameters
+        ----------
+        session : CoreNLPSession
+            The CoreNLP session to use.
+        text : str
+            The text to parse.
+        properties : Dict, optional
+            The properties of the request, by default self.semgrex_properties
+
+        Returns
+        -------
+        Dict
+            A dictionary with the compact dependency graphs of all sentences of the text, see DependencyGraph.to_compact().
+        """
+
+        if properties is None:
+            properties = self.semgrex_properties
+        response = session.annotate(text, properties=properties)
+        return {"sentences": [DependencyGraph.from_corenlp(sentence, self.dependencies).to_compact()
+                              for sentence in response["sentences"]]}
+
     def __convert_to_competencies(
             self, input: Dict[str, Dict], taxonomy_verbs: Dict[str, BloomsTaxonomyDimensionEnum] = None) -> Dict[str, List[Competency]]:
         """Converts the response from CoreNLPs semgrex resource to competency triples.
@@ -127,52 +567,52 @@ class SemgrexAnnotator:
 
                         if not taxonomy_verbs or taxonomy_verb_found:
                             if "$object" in temp:
-                                object_chunk = WordChunk()
+                                object_words: List[Word] = []
 
                                 if "$objectadja" in temp:
-                                    object_chunk.words.append(
+                                    object_words.append(
                                         Word(
                                             temp["$objectadja"]["begin"],
                                             temp["$objectadja"]["text"]))
 
-                                object_chunk.words.append(
+                                object_words.append(
                                     Word(temp["$object"]["begin"], temp["$object"]["text"]))
 
                                 if "$objectdet" in temp:
                                     if "$objectdetadja" in temp:
-                                        object_chunk.words.append(
+                                        object_words.append(
                                             Word(
                                                 temp["$objectdetadja"]["begin"],
                                                 temp["$objectdetadja"]["text"]))
                                     if "$objectdetart" in temp:
-                                        object_chunk.words.append(
+                                        object_words.append(
                                             Word(
                                                 temp["$objectdetart"]["begin"],
                                                 temp["$objectdetart"]["text"]))
 
-                                    object_chunk.words.append(
+                                    object_words.append(
                                         Word(
                                             temp["$objectdet"]["begin"],
                                             temp["$objectdet"]["text"]))
 
                                 # Sort the words by index to remain context
-                                object_chunk.words.sort(
-                                    key=lambda word: word.index)
+                                object_chunk = WordChunk(
+                                    sorted(object_words, key=lambda word: word.index))
 
                                 contexts = []
 
                                 if "$context" in temp:
-                                    context_chunk = WordChunk()
+                                    context_words: List[Word] = []
                                     if "$contextadja" in temp:
-                                        context_chunk.words.append(
+                                        context_words.append(
                                             Word(temp["$contextadja"]["begin"], temp["$contextadja"]["text"]))
 
-                                    context_chunk.words.append(
+                                    context_words.append(
                                         Word(temp["$context"]["begin"], temp["$context"]["text"]))
 
                                     # Sort the words by index to remain context
-                                    context_chunk.words.sort(
-                                        key=lambda word: word.index)
+                                    context_chunk = WordChunk(
+                                        sorted(context_words, key=lambda word: word.index))
 
                                     contexts.append(
                                         ObjectContext(context_chunk))
@@ -0,0 +1,350 @@
+from typing import Dict, List, Union
+import glob
+import json
+import os
+import re
+import threading
+import requests
+from stanfordnlp.server import CoreNLPClient
+from stanfordnlp.server.client import AnnotationException, TimeoutException, ShouldRetryException, PermanentlyFailedException
+
+from compex.instrumentation.metrics import metrics
+
+# Request properties of the pipelines of languages, as in the StanfordCoreNLP-<language>.properties of CoreNLP 3.9.1.
+# A started server is configured by them, an attached server may run with other defaults, so they are sent with
+# every request to it.
+LANGUAGE_PROPERTIES = {
+    "german": {
+        "pipelineLanguage": "german",
+        "tokenize.language": "de",
+        "pos.model": "edu/stanford/nlp/models/pos-tagger/german/german-hgc.tagger",
+        "parse.model": "edu/stanford/nlp/models/lexparser/germanFactored.ser.gz",
+        "depparse.model": "edu/stanford/nlp/models/parser/nndep/UD_German.gz",
+        "depparse.language": "german"
+    }
+}
+LANGUAGE_SHORTHANDS = {"de": "german"}
+# The text annotated to load the annotators when a session starts
+WARM_UP_TEXT = "Warmup."
+
+
+class CoreNLPSession:
+    """A long-lived session with a CoreNLP server.
+
+    Either starts a local CoreNLP server once and keeps it running until stop() is called,
+    or attaches to an already running server by its url. A started server is health-checked
+    and restarted automatically if it died, so many requests can share one warm backend.
+
+    Requests are sent over a pool of persistent HTTP connections and may be sent from multiple threads.
+    """
+
+    DEFAULT_ENDPOINT = CoreNLPClient.DEFAULT_ENDPOINT
+    DEFAULT_POOL_SIZE = CoreNLPClient.DEFAULT_THREADS
+    retries = 1
+
+    def __init__(self, url: str = None, annotators: List[str] = None, properties: Union[str, Dict] = None,
+                 timeout: int = CoreNLPClient.DEFAULT_TIMEOUT, memory: str = CoreNLPClient.DEFAULT_MEMORY,
+                 pool_size: int = DEFAULT_POOL_SIZE, version: str = None):
+        """Creates a new instance. The session is not started until start() or ensure_alive() is called.
+
+        Parameters
+        ----------
+        url : str, optional
+            The url of an already running CoreNLP server to attach to.
+            If None, a local server is started on DEFAULT_ENDPOINT. By default None.
+        annotators : List[str], optional
+            The annotators a started server preloads, by default None
+        properties : Union[str, Dict], optional
+            The properties a started server uses, e.g. a language like "german", by default None.
+            Requests to an attached server carry the properties of the language, see LANGUAGE_PROPERTIES.
+        timeout : int, optional
+            The request timeout in milliseconds, by default CoreNLPClient.DEFAULT_TIMEOUT
+        memory : str, optional
+            The java heap size of a started server, by default CoreNLPClient.DEFAULT_MEMORY
+        pool_size : int, optional
+            The maximum number of concurrent requests. A started server uses as many threads.
+            By default DEFAULT_POOL_SIZE
+        version : str, optional
+            The version of CoreNLP, part of the keys of cached responses. If None, a started server's version is
+            detected from the CoreNLP jar in $CORENLP_HOME. The version of an attached server is unknown then,
+            as the jar in $CORENLP_HOME may differ from the one the server runs. By default None.
+        """
+
+        self.url: str = url
+        self.annotators: List[str] = annotators
+        self.properties: Union[str, Dict] = properties
+        self.timeout: int = timeout
+        self.memory: str = memory
+        self.pool_size: int = pool_size
+        if version is None and self.url is None:
+            version = detect_corenlp_version()
+        self.version: str = version
+        self.client: CoreNLPClient = None
+        self.__http: requests.Session = None
+        self.__lock = threading.RLock()
+
+    @property
+    def starts_server(self) -> bool:
+        """True if the session starts its own CoreNLP server, False if it attaches to a running one."""
+
+        return self.url is None
+
+    @property
+    def request_properties(self) -> Dict:
+        """The properties sent with every request. Empty for a started server, which was started with
+        self.properties. For an attached server, the properties of the language of self.properties."""
+
+        if self.starts_server or not self.properties:
+            return {}
+        if isinstance(self.properties, dict):
+            return dict(self.properties)
+        language = self.properties.lower()
+        return dict(LANGUAGE_PROPERTIES.get(LANGUAGE_SHORTHANDS.get(language, language), {}))
+
+    def start(self):
+        """Starts the session. Starts a local CoreNLP server if no url is set and waits until it is available."""
+
+        with self.__lock:
+            if self.client is not None:
+                return
+            with metrics.timer("corenlp.start"):
+                if self.starts_server:
+                    self.client = CoreNLPClient(annotators=self.annotators, properties=self.properties,
+                                                timeout=self.timeout, memory=self.memory, threads=self.pool_size,
+                                                endpoint=self.DEFAULT_ENDPOINT)
+                else:
+                    self.client = CoreNLPClient(
+                        start_server=False, endpoint=self.url, timeout=self.timeout)
+                self.client.ensure_alive()
+                self.__http = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size)
+                self.__http.mount("http://", adapter)
+                self.__http.mount("https://", adapter)
+                self.__warm_up()
+
+    def stop(self):
+        """Stops the session. Stops the CoreNLP server, if it was started by this session."""
+
+        with self.__lock:
+            if self.client is not None:
+                self.client.stop()
+                self.client = None
+            if self.__http is not None:
+                self.__http.close()
+                self.__http = None
+
+    def restart(self):
+        """Restarts the session and its CoreNLP server."""
+
+        with self.__lock:
+            self.stop()
+            self.start()
+
+    def __warm_up(self):
+        """Loads the annotators of the session on the server.
+
+        CoreNLPs semgrex resource times out if it has to load the annotators first,
+        so let them be loaded by a single annotation request once.
+        """
+
+        if self.annotators:
+            self.client.annotate(WARM_UP_TEXT, annotators=self.annotators, output_format="json",
+                                 properties=self.request_properties)
+
+    def is_alive(self) -> bool:
+        """Checks if the CoreNLP server of the session is running and answers requests.
+
+        Returns
+        -------
+        bool
+            True if the server is alive.
+        """
+
+        if self.client is None:
+            return False
+        if self.starts_server and (
+                self.client.server is None or self.client.server.poll() is not None):
+            return False
+        try:
+            return self.client.is_alive()
+        except ShouldRetryException:
+            return False
+
+    def ensure_alive(self):
+        """Makes sure the session is started and its server is alive.
+
+        A server started by this session is restarted if it died. For attached servers,
+        waits until the server is available again.
+
+        Raises
+        ------
+        PermanentlyFailedException
+            If an attached server does not become available in time.
+        """
+
+        with self.__lock:
+            if self.client is None:
+                self.start()
+            elif not self.is_alive():
+                metrics.count("corenlp.restarts")
+                if self.starts_server:
+                    self.restart()
+                else:
+                    self.client.is_active = False
+                    self.client.ensure_alive()
+
+    def semgrex(self, text: str, pattern: str, properties: Dict = None) -> Dict:
+        """Executes a semgrex query on text. Retries the request after a health-check if the server is not reachable.
+
+        Safe to call from multiple threads.
+
+        Parameters
+        ----------
+        text : str
+            The text to execute the semgrex query on.
+        pattern : str
+            The semgrex query.
+        properties : Dict, optional
+            The properties of the request, by default None
+
+        Returns
+        -------
+        Dict
+            The response of the CoreNLP semgrex resource.
+        """
+
+        return self.__request_with_retry("/semgrex", text, properties, {"pattern": pattern, "filter": False})
+
+    def annotate(self, text: str, properties: Dict = None) -> Dict:
+        """Annotates text and returns CoreNLPs json output. Retries the request after a health-check if the server is not reachable.
+
+        Safe to call from multiple threads.
+
+        Parameters
+        ----------
+        text : str
+            The text to annotate.
+        properties : Dict, optional
+            The properties of the request, e.g. the annotators to use, by default None
+
+        Returns
+        -------
+        Dict
+            CoreNLPs json output.
+        """
+
+        return self.__request_with_retry("", text, properties)
+
+    def __request_with_retry(self, path: str, text: str, properties: Dict = None, params: Dict = None) -> Dict:
+        """Sends a request to CoreNLP. Retries the request after a health-check if the server is not reachable.
+
+        Parameters
+        ----------
+        path : str
+            The path of the CoreNLP resource.
+        text : str
+            The text to send.
+        properties : Dict, optional
+            The properties of the request, by default None
+        params : Dict, optional
+            Additional query parameters, by default None
+
+        Returns
+        -------
+        Dict
+            The json response of CoreNLP.
+        """
+
+        if self.client is None:
+            self.start()
+        attempt = 0
+        while True:
+            try:
+                return self.__request(path, text, properties, params)
+            except (requests.exceptions.ConnectionError, ShouldRetryException, PermanentlyFailedException):
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+                metrics.count("corenlp.retries")
+                self.ensure_alive()
+
+    def __request(self, path: str, text: str, properties: Dict = None, params: Dict = None) -> Dict:
+        """Sends a request to CoreNLP.
+
+        Parameters
+        ----------
+        path : str
+            The path of the CoreNLP resource.
+        text : str
+            The text to send.
+        properties : Dict, optional
+            The properties of the request, by default None
+        params : Dict, optional
+            Additional query parameters, by default None
+
+        Returns
+        -------
+        Dict
+            The json response of CoreNLP.
+
+        Raises
+        ------
+        TimeoutException
+            If CoreNLP timed out.
+        AnnotationException
+            If CoreNLP could not execute the request.
+        """
+
+        properties = dict(self.request_properties, **(properties or {}))
+        properties["outputFormat"] = "json"
+        params = dict(params or {})
+        params["properties"] = str(properties)
+        with metrics.timer("corenlp.semgrex" if path == "/semgrex" else "corenlp.annotate"):
+            response = self.__http.post(
+                self.client.endpoint + path,
+                params=params,
+                data=text.encode("utf-8"),
+                headers={"content-type": "text/plain; charset=utf-8"},
+                timeout=(self.timeout * 2) / 1000)
+        try:
+            response.raise_for_status()
+            return json.loads(response.text)
+        except requests.HTTPError:
+            if response.text.startswith(("Timeout", "CoreNLP request timed out")):
+                raise TimeoutException(response.text)
+            raise AnnotationException(response.text)
+        except json.JSONDecodeError:
+            raise AnnotationException(response.text)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def detect_corenlp_version(corenlp_home: str = None) -> str:
+    """Detects the version of CoreNLP from the name of its jar file.
+
+    Parameters
+    ----------
+    corenlp_home : str, optional
+        The CoreNLP directory, by default $CORENLP_HOME
+
+    Returns
+    -------
+    str
+        The CoreNLP version, e.g. "3.9.1", or "unknown" if it can't be detected.
+    """
+
+    if corenlp_home is None:
+        corenlp_home = os.getenv("CORENLP_HOME")
+    if corenlp_home:
+        for jar in sorted(glob.glob(os.path.join(corenlp_home, "stanford-corenlp-*.jar"))):
+            match = re.fullmatch(
+                r"stanford-corenlp-(\d+(\.\d+)*)\.jar", os.path.basename(jar))
+            if match:
+                return match.group(1)
+    return "unknown"
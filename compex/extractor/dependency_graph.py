@@ -0,0 +1,94 @@
+from typing import Dict, List, Tuple
+
+
+class DependencyGraph:
+    """A compact dependency graph of a sentence.
+
+    Tokens are stored as (word, tag) pairs, edges as (governor, relation, dependent) triples.
+    Governors and dependents are 0 based token indexes. The edge from the artificial ROOT node is omitted.
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]], edges: List[Tuple[int, str, int]]):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        tokens : List[Tuple[str, str]]
+            The tokens of the sentence as (word, tag) pairs.
+        edges : List[Tuple[int, str, int]]
+            The edges of the graph as (governor, relation, dependent) triples.
+        """
+
+        self.tokens: List[Tuple[str, str]] = tokens
+        self.edges: List[Tuple[int, str, int]] = edges
+        self.__children: List[List[Tuple[str, int]]] = None
+
+    def children(self, index: int) -> List[Tuple[str, int]]:
+        """Get the outgoing edges of a token.
+
+        Parameters
+        ----------
+        index : int
+            The 0 based index of the token.
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            The outgoing edges as (relation, dependent) pairs, in the order of the graph.
+        """
+
+        if self.__children is None:
+            self.__children = [[] for _ in self.tokens]
+            for governor, relation, dependent in self.edges:
+                self.__children[governor].append((relation, dependent))
+        return self.__children[index]
+
+    def to_compact(self) -> Dict:
+        """Converts the graph to a json serializable, compact representation.
+
+        Returns
+        -------
+        Dict
+            The compact representation.
+        """
+
+        return {"tokens": [list(token) for token in self.tokens], "edges": [list(edge) for edge in self.edges]}
+
+    @classmethod
+    def from_compact(cls, compact: Dict) -> "DependencyGraph":
+        """Creates a graph from its compact representation.
+
+        Parameters
+        ----------
+        compact : Dict
+            The compact representation created by to_compact().
+
+        Returns
+        -------
+        DependencyGraph
+            The graph.
+        """
+
+        return cls([tuple(token) for token in compact["tokens"]], [tuple(edge) for edge in compact["edges"]])
+
+    @classmethod
+    def from_corenlp(cls, sentence: Dict, dependencies: str = "enhancedDependencies") -> "DependencyGraph":
+        """Creates a graph from a sentence of CoreNLPs json output.
+
+        Parameters
+        ----------
+        sentence : Dict
+            A sentence of CoreNLPs json output with tokens and dependencies.
+        dependencies : str, optional
+            The key of the dependencies to use, by default "enhancedDependencies"
+
+        Returns
+        -------
+        DependencyGraph
+            The graph.
+        """
+
+        tokens = [(token["word"], token.get("pos")) for token in sentence["tokens"]]
+        edges = [(dependency["governor"] - 1, dependency["dep"], dependency["dependent"] - 1)
+                 for dependency in sentence[dependencies] if dependency["governor"] > 0]
+        return cls(tokens, edges)
@@ -0,0 +1,187 @@
+from typing import Dict, Iterable
+import hashlib
+import json
+import sqlite3
+import threading
+
+
+class SemgrexCache:
+    """A persistent, size-bounded cache of CoreNLP responses, e.g. semgrex matches or dependency graphs.
+
+    Responses are stored in a SQLite database and addressed by a hash of the normalized sentence,
+    the semgrex pattern, the annotator properties and the CoreNLP version. If the cache holds more
+    than max_entries responses, the least recently used ones are evicted.
+    """
+
+    DEFAULT_MAX_ENTRIES = 1000000
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Creates a new instance. Opens or creates the cache database.
+
+        Parameters
+        ----------
+        path : str
+            Path of the cache database file. Use ":memory:" for a cache that is not persisted.
+        max_entries : int, optional
+            The maximum number of cached responses, by default DEFAULT_MAX_ENTRIES
+        """
+
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.path: str = path
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, last_used INTEGER NOT NULL)")
+        self.__connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.__connection.commit()
+        self.__size: int = self.__connection.execute(
+            "SELECT COUNT(*) FROM responses").fetchone()[0]
+        self.__clock: int = self.__connection.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def create_key(sentence: str, pattern: str, properties: Dict, version: str) -> str:
+        """Creates the cache key of a semgrex request.
+
+        Parameters
+        ----------
+        sentence : str
+            The sentence. Whitespace is normalized, as it does not change CoreNLPs tokenization.
+        pattern : str
+            The semgrex pattern or None, if the response does not depend on a pattern.
+        properties : Dict
+            The annotator properties of the request. Must be json serializable.
+        version : str
+            The version of CoreNLP.
+
+        Returns
+        -------
+        str
+            The cache key.
+        """
+
+        normalized_sentence = " ".join(sentence.split())
+        content = json.dumps([normalized_sentence, pattern, properties, version],
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """Gets cached responses and marks them as recently used. Counts hits and misses.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            The cache keys to look up.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            A dictionary with the keys found in the cache and their responses.
+        """
+
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Dict] = {}
+        with self.__lock:
+            # Stay below SQLites limit of host parameters per statement
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.__connection.execute(
+                    f"SELECT key, response FROM responses WHERE key IN ({placeholders})", chunk).fetchall()
+                for key, response in rows:
+                    found[key] = json.loads(response)
+            self.__clock += 1
+            self.__connection.executemany("UPDATE responses SET last_used = ? WHERE key = ?",
+                                          [(self.__clock, key) for key in found])
+            self.__connection.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Dict:
+        """Gets a cached response.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+
+        Returns
+        -------
+        Dict
+            The cached response or None if the key is not cached.
+        """
+
+        return self.get_many([key]).get(key)
+
+    def put_many(self, responses: Dict[str, Dict]):
+        """Adds responses to the cache. Evicts the least recently used responses if the cache is full.
+
+        Parameters
+        ----------
+        responses : Dict[str, Dict]
+            A dictionary with cache keys and their responses.
+        """
+
+        if not responses:
+            return
+        with self.__lock:
+            self.__clock += 1
+            for key, response in responses.items():
+                inserted = self.__connection.execute(
+                    "INSERT OR IGNORE INTO responses (key, response, last_used) VALUES (?, ?, ?)",
+                    (key, json.dumps(response), self.__clock)).rowcount
+                if not inserted:
+                    self.__connection.execute("UPDATE responses SET response = ?, last_used = ? WHERE key = ?",
+                                              (json.dumps(response), self.__clock, key))
+                self.__size += inserted
+            if self.__size > self.max_entries:
+                self.__connection.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (self.__size - self.max_entries,))
+                self.__size = self.max_entries
+            self.__connection.commit()
+
+    def put(self, key: str, response: Dict):
+        """Adds a response to the cache.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+        response : Dict
+            The response to cache.
+        """
+
+        self.put_many({key: response})
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit and miss counters and the size of the cache.
+
+        Returns
+        -------
+        Dict[str, int]
+            A Dict with the number of hits, misses and entries.
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "entries": self.__size}
+
+    def close(self):
+        """Closes the cache database."""
+
+        with self.__lock:
+            self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,340 @@
+from typing import Dict, List, Pattern, Tuple, Union
+import re
+
+from compex.extractor.dependency_graph import DependencyGraph
+
+# Node attributes supported by the local matcher and their position in a token of a DependencyGraph
+NODE_ATTRIBUTES = {"word": 0, "tag": 1}
+RELATION_NAME_CHARACTERS = re.compile(r"[A-Za-z0-9_:\-]+")
+NODE_NAME_CHARACTERS = re.compile(r"[A-Za-z0-9_]+")
+
+
+class SemgrexSyntaxError(ValueError):
+    """Exception raised if a semgrex pattern can't be parsed or uses features the local matcher does not support."""
+    pass
+
+
+class NodePattern:
+    """A node description of a semgrex pattern, e.g. {tag:/VVINF|VVFIN/}=competency, and its relations."""
+
+    def __init__(self, attributes: Dict[str, Union[str, Pattern]], name: str = None):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        attributes : Dict[str, Union[str, Pattern]]
+            The attribute constraints of the node. Values are either exact strings or regular expressions.
+        name : str, optional
+            The name the node is bound to, by default None
+        """
+
+        self.attributes: Dict[str, Union[str, Pattern]] = attributes
+        self.name: str = name
+        self.relations: List[RelationPattern] = []
+
+    def matches(self, token: Tuple[str, str]) -> bool:
+        """Checks if a token satisfies the attribute constraints of the node.
+
+        Parameters
+        ----------
+        token : Tuple[str, str]
+            A (word, tag) token.
+
+        Returns
+        -------
+        bool
+            True if the token satisfies all constraints.
+        """
+
+        for attribute, value in self.attributes.items():
+            token_value = token[NODE_ATTRIBUTES[attribute]]
+            if token_value is None:
+                return False
+            if isinstance(value, str):
+                if token_value != value:
+                    return False
+            elif not value.fullmatch(token_value):
+                return False
+        return True
+
+
+class RelationPattern:
+    """A relation of a semgrex pattern, e.g. ?>dobj {}=object."""
+
+    def __init__(self, relation: Union[str, Pattern], node: NodePattern, optional: bool = False):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        relation : Union[str, Pattern]
+            The name of the relation or a regular expression matching relation names.
+        node : NodePattern
+            The node pattern the dependent has to match.
+        optional : bool, optional
+            True if the relation is optional, by default False
+        """
+
+        self.relation: Union[str, Pattern] = relation
+        self.node: NodePattern = node
+        self.optional: bool = optional
+
+    def matches(self, relation: str) -> bool:
+        """Checks if a relation name satisfies the relation of the pattern.
+
+        Parameters
+        ----------
+        relation : str
+            The name of a relation in a dependency graph.
+
+        Returns
+        -------
+        bool
+            True if the relation name matches.
+        """
+
+        if isinstance(self.relation, str):
+            return relation == self.relation
+        return bool(self.relation.fullmatch(relation))
+
+
+class SemgrexPattern:
+    """A pure Python matcher for a subset of CoreNLPs semgrex language.
+
+    Supports node descriptions with exact or regular expression constraints on word and tag, named nodes,
+    the dominance relation > with exact or regular expression relation names, optional relations ?> and
+    grouping with parentheses. This covers the competency patterns of SemgrexAnnotator.
+    """
+
+    def __init__(self, pattern: str):
+        """Creates a new instance and parses the pattern.
+
+        Parameters
+        ----------
+        pattern : str
+            The semgrex pattern.
+
+        Raises
+        ------
+        SemgrexSyntaxError
+            If the pattern can't be parsed or uses unsupported features.
+        """
+
+        self.pattern: str = pattern
+        self.__position: int = 0
+        self.root: NodePattern = self.__parse_expression()
+        self.__skip_whitespace()
+        if self.__position < len(self.pattern):
+            self.__fail("Unsupported or unexpected input")
+
+    def match(self, graph: DependencyGraph) -> List[Tuple[int, Dict[str, int]]]:
+        """Finds all matches of the pattern in a dependency graph.
+
+        Parameters
+        ----------
+        graph : DependencyGraph
+            The dependency graph.
+
+        Returns
+        -------
+        List[Tuple[int, Dict[str, int]]]
+            A list of matches ordered by token. Each match is the index of the matched token and a dict
+            with the names of the named nodes and the indexes of their tokens.
+        """
+
+        matches: List[Tuple[int, Dict[str, int]]] = []
+        for index in range(len(graph.tokens)):
+            for binding in self.__match_node(self.root, index, graph, {}):
+                matches.append((index, binding))
+        return matches
+
+    def match_to_response(self, graphs: List[DependencyGraph]) -> Dict:
+        """Matches the pattern against the graphs of a text and creates a response like CoreNLPs semgrex resource.
+
+        Parameters
+        ----------
+        graphs : List[DependencyGraph]
+            The dependency graphs of all sentences of the text.
+
+        Returns
+        -------
+        Dict
+            The matches in the format of CoreNLPs semgrex resource.
+        """
+
+        sentences = []
+        for graph in graphs:
+            sentence = {"length": 0}
+            for index, binding in self.match(graph):
+                match = self.__create_match_entry(graph, index)
+                for name, named_index in binding.items():
+                    match["$" + name] = self.__create_match_entry(
+                        graph, named_index)
+                sentence[str(sentence["length"])] = match
+                sentence["length"] += 1
+            sentences.append(sentence)
+        return {"sentences": sentences}
+
+    def __create_match_entry(self, graph: DependencyGraph, index: int) -> Dict:
+        return {"text": graph.tokens[index][0], "begin": index, "end": index + 1}
+
+    def __match_node(self, node: NodePattern, index: int, graph: DependencyGraph,
+                     binding: Dict[str, int]) -> List[Dict[str, int]]:
+        """Matches a node pattern and its relations against a token.
+
+        Parameters
+        ----------
+        node : NodePattern
+            The node pattern.
+        index : int
+            The index of the token.
+        graph : DependencyGraph
+            The dependency graph.
+        binding : Dict[str, int]
+            The named nodes bound so far.
+
+        Returns
+        -------
+        List[Dict[str, int]]
+            All bindings of named nodes, that satisfy the pattern. Empty if the pattern does not match.
+        """
+
+        if not node.matches(graph.tokens[index]):
+            return []
+        if node.name is not None:
+            if binding.get(node.name, index) != index:
+                return []
+            binding = dict(binding)
+            binding[node.name] = index
+
+        bindings = [binding]
+        for relation in node.relations:
+            relation_bindings = []
+            for current_binding in bindings:
+                matched_bindings = []
+                for relation_name, dependent in graph.children(index):
+                    if relation.matches(relation_name):
+                        matched_bindings.extend(self.__match_node(
+                            relation.node, dependent, graph, current_binding))
+                if matched_bindings:
+                    relation_bindings.extend(matched_bindings)
+                elif relation.optional:
+                    relation_bindings.append(current_binding)
+            bindings = relation_bindings
+        return bindings
+
+    def __parse_expression(self) -> NodePattern:
+        """Parses a node with its relations, optionally in parentheses."""
+
+        self.__skip_whitespace()
+        if self.__peek() == "(":
+            self.__position += 1
+            node = self.__parse_expression()
+            self.__expect(")")
+        else:
+            node = self.__parse_node()
+
+        while True:
+            self.__skip_whitespace()
+            character = self.__peek()
+            if character not in ("?", ">"):
+                break
+            optional = character == "?"
+            if optional:
+                self.__position += 1
+            self.__expect(">")
+            if self.__peek() in (">", "<", "+", "-"):
+                self.__fail("Only the relation > is supported")
+            relation = self.__parse_relation_name()
+            self.__skip_whitespace()
+            if self.__peek() == "(":
+                self.__position += 1
+                target = self.__parse_expression()
+                self.__expect(")")
+            else:
+                target = self.__parse_node()
+            node.relations.append(RelationPattern(relation, target, optional))
+        return node
+
+    def __parse_node(self) -> NodePattern:
+        """Parses a node description like {tag:/VVINF|VVFIN/}=competency."""
+
+        self.__skip_whitespace()
+        self.__expect("{")
+        attributes: Dict[str, Union[str, Pattern]] = {}
+        while True:
+            self.__skip_whitespace()
+            if self.__peek() == "}":
+                self.__position += 1
+                break
+            key_end = self.pattern.find(":", self.__position)
+            if key_end < 0:
+                self.__fail("Expected attribute")
+            key = self.pattern[self.__position:key_end].strip()
+            if key not in NODE_ATTRIBUTES:
+                self.__fail(f"Unsupported node attribute '{key}'")
+            self.__position = key_end + 1
+            if self.__peek() == "/":
+                attributes[key] = re.compile(self.__parse_regex())
+            else:
+                value_end = self.__position
+                while value_end < len(self.pattern) and self.pattern[value_end] not in ";}":
+                    value_end += 1
+                attributes[key] = self.pattern[self.__position:value_end].strip()
+                self.__position = value_end
+            self.__skip_whitespace()
+            if self.__peek() == ";":
+                self.__position += 1
+
+        name = None
+        if self.__peek() == "=":
+            self.__position += 1
+            match = NODE_NAME_CHARACTERS.match(self.pattern, self.__position)
+            if not match:
+                self.__fail("Expected node name")
+            name = match.group(0)
+            self.__position = match.end()
+        return NodePattern(attributes, name)
+
+    def __parse_relation_name(self) -> Union[str, Pattern]:
+        if self.__peek() == "/":
+            return re.compile(self.__parse_regex())
+        match = RELATION_NAME_CHARACTERS.match(self.pattern, self.__position)
+        if not match:
+            self.__fail("Expected relation name")
+        self.__position = match.end()
+        return match.group(0)
+
+    def __parse_regex(self) -> str:
+        """Parses a regular expression delimited by slashes."""
+
+        self.__expect("/")
+        start = self.__position
+        while self.__position < len(self.pattern):
+            character = self.pattern[self.__position]
+            if character == "\\":
+                self.__position += 2
+                continue
+            if character == "/":
+                regex = self.pattern[start:self.__position].replace(
+                    "\\/", "/")
+                self.__position += 1
+                return regex
+            self.__position += 1
+        self.__fail("Unterminated regular expression")
+
+    def __skip_whitespace(self):
+        while self.__position < len(self.pattern) and self.pattern[self.__position].isspace():
+            self.__position += 1
+
+    def __peek(self) -> str:
+        return self.pattern[self.__position] if self.__position < len(self.pattern) else ""
+
+    def __expect(self, character: str):
+        self.__skip_whitespace()
+        if self.__peek() != character:
+            self.__fail(f"Expected '{character}'")
+        self.__position += 1
+
+    def __fail(self, message: str):
+        raise SemgrexSyntaxError(
+            f"{message} at position {self.__position} of semgrex pattern: {self.pattern}")
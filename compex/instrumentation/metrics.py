@@ -0,0 +1,265 @@
+from typing import Dict, Iterator, List
+from contextlib import contextmanager
+import bisect
+import threading
+import time
+
+# Upper bounds of the histogram buckets in seconds, the last bucket takes all larger values
+HISTOGRAM_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """A histogram of durations in seconds with fixed, logarithmically growing buckets."""
+
+    __slots__ = ("count", "total", "minimum", "maximum", "buckets")
+
+    def __init__(self):
+        """Creates a new, empty instance."""
+
+        self.count: int = 0
+        self.total: float = 0.0
+        self.minimum: float = None
+        self.maximum: float = None
+        self.buckets: List[int] = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def observe(self, value: float):
+        """Adds a value to the histogram.
+
+        Parameters
+        ----------
+        value : float
+            The duration in seconds.
+        """
+
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS, value)] += 1
+
+    def percentile(self, percentile: float) -> float:
+        """Estimates a percentile by the upper bound of the bucket it falls into.
+
+        Parameters
+        ----------
+        percentile : float
+            The percentile between 0 and 1, e.g. 0.99
+
+        Returns
+        -------
+        float
+            The estimated percentile, at most the maximum value. None if the histogram is empty.
+        """
+
+        if self.count == 0:
+            return None
+        rank = percentile * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                break
+        if index == len(HISTOGRAM_BOUNDS):
+            return self.maximum
+        return min(HISTOGRAM_BOUNDS[index], self.maximum)
+
+    def merge(self, data: Dict):
+        """Adds the values of a histogram exported by to_dict(), e.g. by another process.
+
+        Parameters
+        ----------
+        data : Dict
+            The exported histogram.
+        """
+
+        if data["count"] == 0:
+            return
+        self.count += data["count"]
+        self.total += data["sum"]
+        self.minimum = data["min"] if self.minimum is None else min(self.minimum, data["min"])
+        self.maximum = data["max"] if self.maximum is None else max(self.maximum, data["max"])
+        for index, (_, count) in enumerate(data["buckets"]):
+            self.buckets[index] += count
+
+    def to_dict(self) -> Dict:
+        """Exports the histogram as json serializable dict.
+
+        Returns
+        -------
+        Dict
+            The number, sum, minimum and maximum of the values, estimated percentiles and the buckets
+            as [upper bound, count] pairs. The upper bound of the last bucket is None.
+        """
+
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": [[bound, count] for bound, count in zip(HISTOGRAM_BOUNDS + (None,), self.buckets)]
+        }
+
+
+class Metrics:
+    """Timers, counters and histograms of the stages of a run.
+
+    Timers measure the wall time and the CPU time of the calling thread of a stage and add the wall time
+    to the histogram of the stage. Counters count events like sentences, matches, cache hits or retries.
+    All methods may be called from multiple threads.
+
+    The pipeline reports to the shared instance `metrics` of this module. Query it with snapshot(),
+    e.g. after a run, or export it with the --metrics option of the cli.
+    """
+
+    def __init__(self):
+        """Creates a new, empty instance."""
+
+        self.__lock = threading.Lock()
+        self.__timers: Dict[str, List] = {}
+        self.__counters: Dict[str, int] = {}
+        self.__histograms: Dict[str, Histogram] = {}
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Times a stage. Use as context manager, the stage is timed even if it raises.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage, e.g. "corenlp.semgrex".
+        """
+
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_started
+            cpu = time.thread_time() - cpu_started
+            with self.__lock:
+                self.__add_time(stage, wall, cpu, 1)
+                histogram = self.__histograms.get(stage)
+                if histogram is None:
+                    histogram = self.__histograms[stage] = Histogram()
+                histogram.observe(wall)
+
+    def add_time(self, stage: str, wall: float, cpu: float = None, count: int = 1):
+        """Adds time measured outside of timer() to a stage, e.g. the sum of many short steps.
+        It's not added to the histogram of the stage.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        wall : float
+            The wall time in seconds.
+        cpu : float, optional
+            The CPU time in seconds, by default None if it was not measured.
+        count : int, optional
+            The number of times the stage was run, by default 1
+        """
+
+        with self.__lock:
+            self.__add_time(stage, wall, cpu, count)
+
+    def __add_time(self, stage: str, wall: float, cpu: float, count: int):
+        """Adds time to a stage, the lock must be held."""
+
+        timer = self.__timers.get(stage)
+        if timer is None:
+            timer = self.__timers[stage] = [0, 0.0, None]
+        timer[0] += count
+        timer[1] += wall
+        if cpu is not None:
+            timer[2] = cpu if timer[2] is None else timer[2] + cpu
+
+    def count(self, name: str, value: int = 1):
+        """Increases a counter.
+
+        Parameters
+        ----------
+        name : str
+            The name of the counter, e.g. "corenlp.retries".
+        value : int, optional
+            The increment, by default 1
+        """
+
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """Adds a duration to a histogram.
+
+        Parameters
+        ----------
+        name : str
+            The name of the histogram.
+        value : float
+            The duration in seconds.
+        """
+
+        with self.__lock:
+            histogram = self.__histograms.get(name)
+            if histogram is None:
+                histogram = self.__histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def counter(self, name: str) -> int:
+        """Gets the value of a counter, 0 if it was never increased."""
+
+        with self.__lock:
+            return self.__counters.get(name, 0)
+
+    def snapshot(self) -> Dict:
+        """Exports all timers, counters and histograms.
+
+        Returns
+        -------
+        Dict
+            A json serializable dict with the "timers" (number of runs, wall and CPU seconds of each stage),
+            "counters" and "histograms" (see Histogram.to_dict()), each sorted by name.
+        """
+
+        with self.__lock:
+            return {
+                "timers": {stage: {"count": count, "wall_seconds": wall, "cpu_seconds": cpu}
+                           for stage, (count, wall, cpu) in sorted(self.__timers.items())},
+                "counters": dict(sorted(self.__counters.items())),
+                "histograms": {name: histogram.to_dict()
+                               for name, histogram in sorted(self.__histograms.items())}
+            }
+
+    def merge(self, snapshot: Dict):
+        """Adds the values of a snapshot, e.g. of another process.
+
+        Parameters
+        ----------
+        snapshot : Dict
+            The snapshot, see snapshot().
+        """
+
+        with self.__lock:
+            for stage, timer in snapshot["timers"].items():
+                self.__add_time(stage, timer["wall_seconds"], timer["cpu_seconds"], timer["count"])
+            for name, value in snapshot["counters"].items():
+                self.__counters[name] = self.__counters.get(name, 0) + value
+            for name, data in snapshot["histograms"].items():
+                histogram = self.__histograms.get(name)
+                if histogram is None:
+                    histogram = self.__histograms[name] = Histogram()
+                histogram.merge(data)
+
+    def reset(self):
+        """Removes all timers, counters and histograms."""
+
+        with self.__lock:
+            self.__timers.clear()
+            self.__counters.clear()
+            self.__histograms.clear()
+
+
+metrics = Metrics()
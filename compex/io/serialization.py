@@ -0,0 +1,92 @@
+from typing import Any, Dict, List
+import json
+
+from compex.instrumentation.metrics import metrics
+from compex.model.competency import Competency
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def competencies_to_dict(competencies: Dict[str, List[Competency]]) -> Dict[str, List[Dict]]:
+    """Converts extracted competency triples to json serializable dicts.
+
+    Parameters
+    ----------
+    competencies : Dict[str, List[Competency]]
+        A dictionary with sentences as keys and a list of competency triples as values.
+
+    Returns
+    -------
+    Dict[str, List[Dict]]
+        A dictionary with sentences as keys and a list of competency triples as dicts as values.
+    """
+
+    return {sentence: [competency.to_dict() for competency in sentence_competencies]
+            for sentence, sentence_competencies in competencies.items()}
+
+
+def competencies_from_dict(data: Dict[str, List[Dict]]) -> Dict[str, List[Competency]]:
+    """Creates competency triples from dicts created by competencies_to_dict().
+
+    Parameters
+    ----------
+    data : Dict[str, List[Dict]]
+        A dictionary with sentences as keys and a list of competency triples as dicts as values.
+
+    Returns
+    -------
+    Dict[str, List[Competency]]
+        A dictionary with sentences as keys and a list of competency triples as values.
+    """
+
+    return {sentence: [Competency.from_dict(competency) for competency in sentence_competencies]
+            for sentence, sentence_competencies in data.items()}
+
+
+def dumps(data: Any, compact: bool = False) -> str:
+    """Serializes json serializable data.
+
+    By default the output is formatted like jsonpickle's, i.e. ", " and ": " separators and escaped non-ASCII characters.
+    Compact output has no whitespace and keeps non-ASCII characters. It's written by orjson, if installed.
+
+    Parameters
+    ----------
+    data : Any
+        The data to serialize, e.g. dicts created by competencies_to_dict().
+    compact : bool, optional
+        Create compact output, by default False
+
+    Returns
+    -------
+    str
+        The json document.
+    """
+
+    if compact:
+        if orjson is not None:
+            return orjson.dumps(data).decode("utf-8")
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(data)
+
+
+def encode_competencies(competencies: Dict[str, List[Competency]], compact: bool = False) -> str:
+    """Serializes extracted competency triples to json.
+
+    Parameters
+    ----------
+    competencies : Dict[str, List[Competency]]
+        A dictionary with sentences as keys and a list of competency triples as values.
+    compact : bool, optional
+        Create compact output, see dumps(). By default False
+
+    Returns
+    -------
+    str
+        The json document.
+    """
+
+    with metrics.timer("json.encode"):
+        return dumps(competencies_to_dict(competencies), compact)
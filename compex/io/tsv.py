@@ -1,7 +1,9 @@
-from typing import List, Iterator, Dict, TextIO
+from typing import List, Iterator, Dict, TextIO, Tuple, Union
 from enum import Enum
+import functools
+import itertools
 import re
-import uuid
+import sys
 
 # See
 # https://webanno.github.io/webanno/releases/3.4.5/docs/user-guide.html#sect_webannotsv
@@ -15,8 +17,14 @@ HEADER_PREFIX_SPAN_LAYER = "#T_SP" + HEADER_LAYER_PREFIX_SEPARATOR
 SENTENCE_IDENTIFICATOR = "#Text="
 FIELD_SEPARATOR = "\t"
 RANGE_SEPERATOR = "-"
+SUB_TOKEN_SEPERATOR = "."
 LINE_BREAK = '\n'
 NULL_COLUMN = "_"
+FEATURE_PATTERN = re.compile(r"^([A-Za-z0-9\-.]+)(\[(\d+(_\d+)?)\])?$")
+
+# Source of span indexes for features without one. Integers never equal the string span indexes of the file,
+# so each of these features gets a span of its own.
+synthetic_span_indexes = itertools.count()
 
 
 class LayerType(Enum):
@@ -139,6 +147,8 @@ class TsvSchema:
 class Feature:
     """Represents a feature of a TSV document."""
 
+    __slots__ = ("feature_definition", "span_index", "value")
+
     def __init__(self, feature_definition: FeatureDefinition,
                  span_index: str, value: str):
         """Creates a new instance.
@@ -172,37 +182,51 @@ class Feature:
 class TsvToken:
     """Represents a token of a TSV document."""
 
+    __slots__ = ("sentence_number", "token_number", "offset_begin", "offset_end", "token", "features",
+                 "sub_token_number")
+
     def __init__(self, sentence_number: int, token_number: int,
-                 offset_begin: int, offset_end: int, token: str, features: Dict):
-        """Create a new instance.
+                 offset_begin: int, offset_end: int, token: str, features: Dict, sub_token_number: int = 0):
+        """Create a new instance. Numbers and offsets are converted to int, e.g. if given as read from the file.
 
         Parameters
         ----------
         sentence_number : int
             The number of the sentence in the TSV file
         token_number : int
-            The number of the token in the sentence
+            The number of the token in the sentence. For a sub-token, the number of the token it is part of.
         offset_begin : int
             The offset begin in the sentence of the token
         offset_end : int
             The offset end in the sentence of the token
         token : str
-            The token string itself
+            The token string itself. It's interned, as tokens repeat a lot in large corpora.
         features : Dict
             A Dict of features belonging to the token
+        sub_token_number : int, optional
+            The number of the sub-token in its token, e.g. 1 for the id "1-3.1". By default 0 for a token.
         """
 
-        self.sentence_number: int = sentence_number
-        self.token_number: int = token_number
-        self.offset_begin: int = offset_begin
-        self.offset_end: int = offset_end
-        self.token: str = token
+        self.sentence_number: int = int(sentence_number)
+        self.token_number: int = int(token_number)
+        self.offset_begin: int = int(offset_begin)
+        self.offset_end: int = int(offset_end)
+        self.token: str = sys.intern(token)
         self.features: Dict = features
+        self.sub_token_number: int = int(sub_token_number)
+
+    @property
+    def position(self) -> Tuple[int, int, int]:
+        """The sentence, token and sub-token number of the token."""
+
+        return self.sentence_number, self.token_number, self.sub_token_number
 
 
 class TokenChunk:
     """Represents a chunk of tokens."""
 
+    __slots__ = ("feature", "tokens", "relations")
+
     def __init__(self, feature: Feature, tokens: List[TsvToken]):
         """Creates a new instance.
 
@@ -254,27 +278,37 @@ class TsvSentence:
                 self.features[feature].append(token)
         for feature, tokens in self.features.items():
             self.token_chunks[feature] = TokenChunk(feature, tokens)
-        for feature, token_chunk in self.token_chunks.items():
-            if token_chunk.feature.feature_definition.layer_definition.layer_type == LayerType.RELATION_LAYER:
-                partos = token_chunk.feature.value.split("-")
-                sentence_no = partos[0]
-                token_no = partos[1]
-                child: TokenChunk = None
-                parent: TokenChunk = None
-                for f, tc in self.token_chunks.items():
-                    if tc.tokens[0].sentence_number == sentence_no and tc.tokens[
-                            0].token_number == token_no and tc.feature.feature_definition.layer_definition.layer_type != LayerType.RELATION_LAYER:
-                        child = tc
-                    elif tc.tokens[0].sentence_number == token_chunk.tokens[0].sentence_number and tc.tokens[0].token_number == token_chunk.tokens[0].token_number and tc.feature.feature_definition.layer_definition.layer_type != LayerType.RELATION_LAYER:
-                        parent = tc
-                if parent is not None and child is not None:
-                    parent.add_relation(child)
-        features_to_del = []
+        self.__link_relations()
+
+    def __link_relations(self):
+        """Resolves the chunks of relation layers to relations between the chunks they connect and removes them.
+
+        Non-relation chunks are indexed by the (sentence, token, sub-token) position of their first token, if multiple
+        chunks start at the same token, the last one is used. A relation links the chunk at the position of
+        its own first token (parent) to the chunk at the position in its value (child). Relations with
+        the same position for parent and child are ignored.
+        """
+
+        chunks_by_position: Dict[Tuple[int, int, int], TokenChunk] = {}
+        relation_chunks: List[TokenChunk] = []
         for feature, token_chunk in self.token_chunks.items():
             if feature.feature_definition.layer_definition.layer_type == LayerType.RELATION_LAYER:
-                features_to_del.append(feature)
-        for feature_to_del in features_to_del:
-            del self.token_chunks[feature_to_del]
+                relation_chunks.append(token_chunk)
+            else:
+                chunks_by_position[token_chunk.tokens[0].position] = token_chunk
+
+        for token_chunk in relation_chunks:
+            child_position = parse_token_id(token_chunk.feature.value)
+            parent_position = token_chunk.tokens[0].position
+            if child_position == parent_position:
+                continue
+            child = chunks_by_position.get(child_position)
+            parent = chunks_by_position.get(parent_position)
+            if parent is not None and child is not None:
+                parent.add_relation(child)
+
+        for token_chunk in relation_chunks:
+            del self.token_chunks[token_chunk.feature]
 
 
 class TsvDocument:
@@ -295,6 +329,41 @@ class TsvDocument:
         self.sentences: List[TsvSentence] = sentences
 
 
+class TsvLineIterator:
+    """Iterates lazily over the lines of a TSV file without line breaks.
+
+    Keeps the file name and number of the last read line, to locate errors. Each iteration over a file
+    has its own instance, so concurrent readers never report the position of each other.
+    """
+
+    def __init__(self, tsvFile: TextIO):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        tsvFile : TextIO
+            The TSV file
+        """
+
+        self.source: str = getattr(tsvFile, "name", None)
+        self.line_number: int = None
+        self.__lines: Iterator[Tuple[int, str]] = enumerate(tsvFile, start=1)
+
+    def __iter__(self) -> "TsvLineIterator":
+        return self
+
+    def __next__(self) -> str:
+        self.line_number, line = next(self.__lines)
+        return line.rstrip('\n')
+
+    def locate(self) -> str:
+        """Describes the position of the last read line for error messages, e.g. "12 of file.tsv"."""
+
+        if self.line_number is None:
+            return "of the tsv document"
+        return f"{self.line_number} of {self.source or 'the tsv document'}"
+
+
 class TsvReader:
     """A class to read/parse TSV documents."""
 
@@ -312,9 +381,7 @@ class TsvReader:
             The parsed tsv document
         """
 
-        lines = tsvFile.readlines()
-        lines = [x.rstrip('\n') for x in lines]
-        iterator = iter(lines)
+        iterator = TsvLineIterator(tsvFile)
 
         schema: TsvSchema = self.read_schema(iterator)
         sentences: List[TsvSentence] = self.read_sentences(iterator, schema)
@@ -322,6 +389,26 @@ class TsvReader:
 
         return document
 
+    def iter_tsv(self, tsvFile: TextIO) -> Iterator[TsvSentence]:
+        """Reads a TSV document sentence by sentence.
+
+        The file is read lazily, so only one sentence is held in memory at once.
+
+        Parameters
+        ----------
+        tsvFile : TextIO
+            The TSV file
+
+        Yields
+        -------
+        Iterator[TsvSentence]
+            The parsed sentences of the TSV document
+        """
+
+        iterator = TsvLineIterator(tsvFile)
+        schema: TsvSchema = self.read_schema(iterator)
+        yield from self.iter_sentences(iterator, schema)
+
     def read_schema(self, iterator: Iterator[str]) -> TsvSchema:
         """Reads the schema of a TSV document.
 
@@ -386,10 +473,30 @@ class TsvReader:
             A list of parsed sentences
         """
 
-        sentences: List[TsvSentence] = []
+        return list(self.iter_sentences(iterator, schema))
+
+    def iter_sentences(
+            self, iterator: Iterator[str], schema: TsvSchema) -> Iterator[TsvSentence]:
+        """Reads/parses the sentences of a TSV document one at a time.
+
+        Parameters
+        ----------
+        iterator : Iterator[str]
+            The line by line iterator of the tsv file.
+            The iterator should be at the position of the first line of the first sentence.
+        schema : TsvSchema
+            The schema of the TSV document
+
+        Yields
+        -------
+        Iterator[TsvSentence]
+            The parsed sentences, each as soon as its last line is read
+        """
+
         tokens: List[TsvToken] = []
         current_text = None
         sentence_started = False
+        feature_definitions: List[FeatureDefinition] = schema.get_feature_definitions()
         for line in iterator:
             if line.startswith(SENTENCE_IDENTIFICATOR):
                 # Sentence starts
@@ -400,36 +507,46 @@ class TsvReader:
                     # Sentence ends
                     # TODO link the relations
                     # TODO Create token chunks if span relation
-                    sentences.append(TsvSentence(current_text, tokens))
+                    yield TsvSentence(current_text, tokens)
                     current_text = None
                     tokens = []
                     sentence_started = False
             else:
                 # parse token
                 parts = line.split(FIELD_SEPARATOR)
-                sentence_number, token_number = parts[0].split(RANGE_SEPERATOR)
-                offset_begin, offset_end = parts[1].split(RANGE_SEPERATOR)
-                token = parts[2]
-                features = self.parse_features(
-                    parts[3:], schema.get_feature_definitions())
-                tokens.append(
-                    TsvToken(
-                        sentence_number,
-                        token_number,
-                        offset_begin,
-                        offset_end,
-                        token,
-                        features))
+                try:
+                    sentence_number, token_number = parts[0].split(RANGE_SEPERATOR)
+                    sub_token_number = 0
+                    if SUB_TOKEN_SEPERATOR in token_number:
+                        sentence_number, token_number, sub_token_number = parse_token_id(parts[0])
+                    offset_begin, offset_end = parts[1].split(RANGE_SEPERATOR)
+                    token = parts[2]
+                    features = self.parse_features(
+                        parts[3:], feature_definitions)
+                    tokens.append(
+                        TsvToken(
+                            sentence_number,
+                            token_number,
+                            offset_begin,
+                            offset_end,
+                            token,
+                            features,
+                            sub_token_number))
+                except (ValueError, IndexError) as error:
+                    raise ValueError(
+                        f"Invalid token line {self.__locate(iterator)}: {line!r}") from error
 
         # FIXME Dirty hack to complete the last sentence in tsv
         if sentence_started:
             # Sentence ends
-            sentences.append(TsvSentence(current_text, tokens))
-            current_text = None
-            tokens = []
-            sentence_started = False
+            yield TsvSentence(current_text, tokens)
 
-        return sentences
+    def __locate(self, iterator: Iterator[str]) -> str:
+        """Describes the position of the last line read by iterator for error messages, e.g. "12 of file.tsv"."""
+
+        if isinstance(iterator, TsvLineIterator):
+            return iterator.locate()
+        return "of the tsv document"
 
     def parse_features(
             self, features: List[str], feature_definitions: List[FeatureDefinition]) -> List[Feature]:
@@ -462,22 +579,74 @@ class TsvReader:
 
         for i, layer in enumerate(features, start=0):
             if layer != NULL_COLUMN:
-                parts = layer.split("|")
-                for part in parts:
-                    searcho = re.search(
-                        r"^([A-Za-z0-9\-]+)(\[(\d+(_\d+)?)\])?$", part)
-                    name = searcho.group(1)
-                    if searcho.group(3) is None:
+                feature_definition = feature_definitions[i]
+                for part in layer.split("|"):
+                    name, span_index = parse_feature_part(part)
+                    if span_index is None:
                         # FIXME Dirty hack to distinguish features without span-index
-                        # Assign each of them a random id, so they are not part
+                        # Assign each of them a unique id, so they are not part
                         # of the same span
-                        span_index = uuid.uuid1()
-                    else:
-                        span_index = searcho.group(3)
+                        span_index = next(synthetic_span_indexes)
                     parsed_features.append(
                         Feature(
-                            feature_definitions[i],
+                            feature_definition,
                             span_index,
                             name))
 
         return parsed_features
+
+
+def parse_token_id(token_id: str) -> Tuple[int, int, int]:
+    """Parses the id of a token, e.g. "1-3", or of a sub-token, e.g. "1-3.1".
+
+    Parameters
+    ----------
+    token_id : str
+        The id of the token.
+
+    Returns
+    -------
+    Tuple[int, int, int]
+        The sentence, token and sub-token number. The sub-token number of a token is 0.
+
+    Raises
+    ------
+    ValueError
+        If the id can't be parsed
+    """
+
+    sentence_number, _, token_number = token_id.partition(RANGE_SEPERATOR)
+    token_number, _, sub_token_number = token_number.partition(SUB_TOKEN_SEPERATOR)
+    try:
+        return int(sentence_number), int(token_number), int(sub_token_number or 0)
+    except ValueError:
+        raise ValueError(f"Invalid token id '{token_id}'.") from None
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_feature_part(part: str) -> Tuple[str, Union[str, None]]:
+    """Parses a single feature value of a token, e.g. "object[1]". Results are cached, as values repeat a lot.
+
+    Parameters
+    ----------
+    part : str
+        The feature value with an optional span index in brackets.
+
+    Returns
+    -------
+    Tuple[str, Union[str, None]]
+        The interned value and span index. The span index is None if the value has none.
+
+    Raises
+    ------
+    ValueError
+        If the feature value can't be parsed
+    """
+
+    match = FEATURE_PATTERN.search(part)
+    if match is None:
+        raise ValueError(f"Invalid feature value '{part}'.")
+    span_index = match.group(3)
+    if span_index is not None:
+        span_index = sys.intern(span_index)
+    return sys.intern(match.group(1)), span_index
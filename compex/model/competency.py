@@ -1,5 +1,6 @@
-from typing import List
+from typing import Dict, Iterable, List, Tuple
 from enum import Enum
+import sys
 
 from compex.model.taxonomy import BloomsTaxonomyDimensionEnum
 
@@ -7,6 +8,8 @@ from compex.model.taxonomy import BloomsTaxonomyDimensionEnum
 class Word:
     """Represents a word of a competency triple."""
 
+    __slots__ = ("index", "word")
+
     def __init__(self, index: int, word: str):
         """Creates a new instance.
 
@@ -15,11 +18,11 @@ class Word:
         index : int
             The 0 based index of the word in it's sentence
         word : str
-            The word itself
+            The word itself. It's interned, as words repeat a lot in large corpora.
         """
 
         self.index: int = index
-        self.word: str = word
+        self.word: str = sys.intern(word)
 
     def __hash__(self):
         return hash((self.index, self.word))
@@ -36,36 +39,110 @@ class Word:
     def __repr__(self):
         return self.__str__()
 
+    def to_dict(self) -> Dict:
+        """Converts the word to a json serializable dict.
+
+        Returns
+        -------
+        Dict
+            The word as dict.
+        """
+
+        return {"index": self.index, "word": self.word}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Word":
+        """Creates a word from a dict created by to_dict().
+
+        Parameters
+        ----------
+        data : Dict
+            The word as dict.
+
+        Returns
+        -------
+        Word
+            The word.
+        """
+
+        return cls(data["index"], data["word"])
+
 
 class WordChunk:
-    """Represents a chunk of words."""
+    """Represents an immutable chunk of words.
+
+    The words are stored as a tuple and the hash is computed once, so chunks, objects and contexts
+    are cheap to use in sets and as dict keys.
+    """
 
-    def __init__(self, words: List[Word] = None):
+    __slots__ = ("__words", "__hash")
+
+    def __init__(self, words: Iterable[Word] = None):
         """Creates a new instance.
 
         Parameters
         ----------
-        words : List[Word], optional
-            A list of words, by default None
+        words : Iterable[Word], optional
+            The words of the chunk, by default None
         """
-        if words is None:
-            self.words: List[Word] = []
-        else:
-            self.words: List[Word] = words
+
+        self.__words: Tuple[Word, ...] = tuple(words) if words is not None else ()
+        self.__hash: int = hash(self.__words)
+
+    @property
+    def words(self) -> Tuple[Word, ...]:
+        """The words of the chunk."""
+
+        return self.__words
 
     def __hash__(self):
-        return hash(self.words)
+        return self.__hash
 
     def __eq__(self, other):
         return (
             self.__class__ == other.__class__ and
-            self.words == other.words
+            self.__hash == other.__hash and
+            self.__words == other.__words
         )
 
+    def __reduce__(self):
+        # The hash of strings differs between processes, so it's computed again when unpickling
+        return (self.__class__, (self.__words,))
+
+    def to_dict(self) -> Dict:
+        """Converts the chunk to a json serializable dict.
+
+        Returns
+        -------
+        Dict
+            The chunk as dict.
+        """
+
+        return {"words": [word.to_dict() for word in self.words]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WordChunk":
+        """Creates a chunk from a dict created by to_dict().
+
+        Parameters
+        ----------
+        data : Dict
+            The chunk as dict.
+
+        Returns
+        -------
+        WordChunk
+            The chunk.
+        """
+
+        return cls([Word.from_dict(word) for word in data["words"]])
+
 
 class ObjectContext:
     """Represents a context of an object of a competency triple."""
 
+    __slots__ = ("word_chunk",)
+
     def __init__(self, word_chunk: WordChunk):
         """Creates a new instance.
 
@@ -90,10 +167,40 @@ class ObjectContext:
     def __repr__(self):
         return self.__str__()
 
+    def to_dict(self) -> Dict:
+        """Converts the context to a json serializable dict.
+
+        Returns
+        -------
+        Dict
+            The context as dict.
+        """
+
+        return {"word_chunk": self.word_chunk.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ObjectContext":
+        """Creates a context from a dict created by to_dict().
+
+        Parameters
+        ----------
+        data : Dict
+            The context as dict.
+
+        Returns
+        -------
+        ObjectContext
+            The context.
+        """
+
+        return cls(WordChunk.from_dict(data["word_chunk"]))
+
 
 class CompetencyObject:
     """Represents an object of a competency triple."""
 
+    __slots__ = ("word_chunk", "contexts")
+
     def __init__(self, word_chunk: WordChunk,
                  contexts: List[ObjectContext] = None):
         """Creates a new instance.
@@ -126,10 +233,42 @@ class CompetencyObject:
     def __repr__(self):
         return self.__str__()
 
+    def to_dict(self) -> Dict:
+        """Converts the object and its contexts to a json serializable dict.
+
+        Returns
+        -------
+        Dict
+            The object as dict.
+        """
+
+        return {"word_chunk": self.word_chunk.to_dict(),
+                "contexts": [context.to_dict() for context in self.contexts]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CompetencyObject":
+        """Creates an object from a dict created by to_dict().
+
+        Parameters
+        ----------
+        data : Dict
+            The object as dict.
+
+        Returns
+        -------
+        CompetencyObject
+            The object.
+        """
+
+        return cls(WordChunk.from_dict(data["word_chunk"]),
+                   [ObjectContext.from_dict(context) for context in data["contexts"]])
+
 
 class Competency:
     """Represents a competency triple."""
 
+    __slots__ = ("word", "objects", "taxonomy_dimension")
+
     def __init__(self, word: Word, objects: List[CompetencyObject]
                  = None, taxonomy_dimension: BloomsTaxonomyDimensionEnum = None):
         """Creates a new instance.
@@ -167,6 +306,46 @@ class Competency:
     def __repr__(self):
         return self.__str__()
 
+    def to_dict(self) -> Dict:
+        """Converts the competency triple to a json serializable dict. The taxonomy dimension is stored by its value.
+
+        Returns
+        -------
+        Dict
+            The competency triple as dict.
+        """
+
+        taxonomy_dimension = None
+        if self.taxonomy_dimension is not None:
+            taxonomy_dimension = self.taxonomy_dimension.value
+        return {"word": self.word.to_dict(),
+                "objects": [competency_object.to_dict() for competency_object in self.objects],
+                "taxonomy_dimension": taxonomy_dimension}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Competency":
+        """Creates a competency triple from a dict created by to_dict().
+
+        Parameters
+        ----------
+        data : Dict
+            The competency triple as dict.
+
+        Returns
+        -------
+        Competency
+            The competency triple.
+        """
+
+        taxonomy_dimension = None
+        if data["taxonomy_dimension"] is not None:
+            taxonomy_dimension = BloomsTaxonomyDimensionEnum(
+                data["taxonomy_dimension"])
+        return cls(Word.from_dict(data["word"]),
+                   [CompetencyObject.from_dict(competency_object)
+                    for competency_object in data["objects"]],
+                   taxonomy_dimension)
+
 
 class Sentence:
     """Represents a sentence with competency triples."""
@@ -0,0 +1,141 @@
+from typing import Dict, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
+from compex.model.competency import Competency
+from compex.model.taxonomy import BloomsTaxonomyDimensionEnum
+
+
+class MicroBatcher:
+    """Collects the sentences of concurrent requests into batches, that are annotated by a shared SemgrexAnnotator.
+
+    A batch is started as soon as it has max_batch_size sentences or max_wait seconds passed since its first
+    sentence arrived. Up to max_concurrent_batches batches are annotated at the same time in a thread pool,
+    further sentences wait in the queue.
+    """
+
+    def __init__(self, annotator: SemgrexAnnotator, taxonomy_verbs: Dict[str, BloomsTaxonomyDimensionEnum] = None,
+                 max_batch_size: int = None, max_wait: float = 0.005, max_concurrent_batches: int = None):
+        """Creates a new instance. Call run() in the event loop to start batching.
+
+        Parameters
+        ----------
+        annotator : SemgrexAnnotator
+            The annotator. Use it with a started session, so CoreNLP is not started for each batch.
+        taxonomy_verbs : Dict[str, BloomsTaxonomyDimensionEnum], optional
+            An optional taxonomy dict, see SemgrexAnnotator.annotate(). By default None
+        max_batch_size : int, optional
+            The maximum number of sentences of a batch, by default the batch size of the annotator,
+            so each batch is sent to CoreNLP in a single request.
+        max_wait : float, optional
+            The maximum time in seconds a sentence waits for further sentences of its batch, by default 0.005
+        max_concurrent_batches : int, optional
+            The maximum number of batches annotated at the same time, by default the workers of the annotator.
+        """
+
+        self.annotator: SemgrexAnnotator = annotator
+        self.taxonomy_verbs: Dict[str, BloomsTaxonomyDimensionEnum] = taxonomy_verbs
+        self.max_batch_size: int = max_batch_size or annotator.batch_size
+        self.max_wait: float = max_wait
+        self.max_concurrent_batches: int = max_concurrent_batches or annotator.workers
+        if self.max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if self.max_wait < 0:
+            raise ValueError("max_wait must not be negative.")
+        if self.max_concurrent_batches < 1:
+            raise ValueError("max_concurrent_batches must be at least 1.")
+
+        self.batches: int = 0
+        self.batched_sentences: int = 0
+        self.active_batches: int = 0
+        self.__queue: asyncio.Queue = None
+        self.__tasks: Set[asyncio.Task] = set()
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of sentences waiting for a batch."""
+
+        return self.__queue.qsize() if self.__queue is not None else 0
+
+    async def annotate(self, sentences: List[str]) -> Dict[str, List[Competency]]:
+        """Annotates sentences in the batches of the batcher.
+
+        Parameters
+        ----------
+        sentences : List[str]
+            A list of sentences to extract competency triples from.
+
+        Returns
+        -------
+        Dict[str, List[Competency]]
+            A dictionary with the sentences as keys and a list of extracted competency triples as values,
+            like SemgrexAnnotator.annotate().
+        """
+
+        if self.__queue is None:
+            raise RuntimeError("The batcher is not running.")
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        for sentence in sentences:
+            sentence = sentence.strip()
+            if sentence and sentence not in futures:
+                futures[sentence] = loop.create_future()
+                self.__queue.put_nowait((sentence, futures[sentence]))
+        results = await asyncio.gather(*futures.values())
+        return dict(zip(futures.keys(), results))
+
+    async def run(self):
+        """Collects and starts batches until cancelled."""
+
+        loop = asyncio.get_running_loop()
+        self.__queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_batches) as executor:
+            try:
+                while True:
+                    batch = [await self.__queue.get()]
+                    deadline = loop.time() + self.max_wait
+                    while len(batch) < self.max_batch_size:
+                        if not self.__queue.empty():
+                            batch.append(self.__queue.get_nowait())
+                            continue
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+
+                    await semaphore.acquire()
+                    task = asyncio.create_task(
+                        self.__run_batch(batch, executor, semaphore))
+                    self.__tasks.add(task)
+                    task.add_done_callback(self.__tasks.discard)
+            finally:
+                for task in list(self.__tasks):
+                    task.cancel()
+                self.__queue = None
+
+    async def __run_batch(self, batch: List[Tuple[str, asyncio.Future]], executor: ThreadPoolExecutor,
+                          semaphore: asyncio.Semaphore):
+        """Annotates a batch in the thread pool and resolves the futures of its sentences."""
+
+        self.batches += 1
+        self.batched_sentences += len(batch)
+        self.active_batches += 1
+        try:
+            sentences = list(dict.fromkeys(sentence for sentence, _ in batch))
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor, self.annotator.annotate, sentences, self.taxonomy_verbs)
+            for sentence, future in batch:
+                if not future.done():
+                    future.set_result(result.get(sentence, []))
+        except Exception as exception:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exception)
+        finally:
+            self.active_batches -= 1
+            semaphore.release()
@@ -0,0 +1,257 @@
+from typing import Dict, List, Tuple
+from collections import deque
+import asyncio
+import json
+import sys
+import time
+
+from compex.instrumentation.metrics import metrics as stage_metrics
+from compex.io.serialization import dumps, encode_competencies
+from compex.service.batcher import MicroBatcher
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error",
+                501: "Not Implemented"}
+
+
+class HttpError(Exception):
+    """An error answered with an HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status: int = status
+
+
+class ExtractionServer:
+    """A long-running HTTP server extracting competencies with a warm SemgrexAnnotator.
+
+    Endpoints:
+
+    - POST /extract: Sentences as json list, as json object with a "sentences" list or as plain text
+      with one sentence per line. Answers the same json as the extract mode.
+    - GET /health: Answers {"status": "ok"}.
+    - GET /metrics: Request, latency, batch and queue depth metrics and the timers, counters and histograms
+      of the pipeline stages as json.
+
+    Sentences of concurrent requests are annotated together in micro-batches of a MicroBatcher.
+    """
+
+    max_body_size = 10 * 1024 * 1024
+    # Number of recent requests the latency percentiles are calculated of
+    latency_window = 10000
+
+    def __init__(self, batcher: MicroBatcher, host: str = "127.0.0.1", port: int = 8000, compact: bool = False):
+        """Creates a new instance.
+
+        Parameters
+        ----------
+        batcher : MicroBatcher
+            The batcher annotating the sentences.
+        host : str, optional
+            The host to listen on, by default "127.0.0.1"
+        port : int, optional
+            The port to listen on, by default 8000. Use 0 for a free port, see self.port after start().
+        compact : bool, optional
+            Answer compact json, see dumps(). By default False
+        """
+
+        self.batcher: MicroBatcher = batcher
+        self.host: str = host
+        self.port: int = port
+        self.compact: bool = compact
+        self.requests: int = 0
+        self.sentences: int = 0
+        self.errors: int = 0
+        self.__latencies: deque = deque(maxlen=self.latency_window)
+        self.__server: asyncio.AbstractServer = None
+        self.__batcher_task: asyncio.Task = None
+        self.__started: float = None
+
+    async def start(self):
+        """Starts the batcher and listens for connections."""
+
+        self.__batcher_task = asyncio.create_task(self.batcher.run())
+        self.__server = await asyncio.start_server(self.__handle_connection, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+        self.__started = time.monotonic()
+
+    async def stop(self):
+        """Stops listening and cancels the batcher."""
+
+        self.__server.close()
+        await self.__server.wait_closed()
+        self.__batcher_task.cancel()
+        try:
+            await self.__batcher_task
+        except asyncio.CancelledError:
+            pass
+
+    async def serve_forever(self):
+        """Starts the server and serves until cancelled."""
+
+        await self.start()
+        print(f"Serving on http://{self.host}:{self.port}", file=sys.stderr, flush=True)
+        try:
+            await self.__server.serve_forever()
+        finally:
+            await self.stop()
+
+    def metrics(self) -> Dict:
+        """Gets the metrics of the server.
+
+        Returns
+        -------
+        Dict
+            Request counters, extraction latency percentiles in milliseconds, batch counters, the queue depth
+            and the metrics of the pipeline stages as "stages", see Metrics.snapshot().
+        """
+
+        latencies = sorted(self.__latencies)
+        batches = self.batcher.batches
+        return {
+            "uptime": time.monotonic() - self.__started if self.__started is not None else 0.0,
+            "requests": self.requests,
+            "sentences": self.sentences,
+            "errors": self.errors,
+            "latency_ms": {
+                "p50": self.__percentile(latencies, 0.5),
+                "p90": self.__percentile(latencies, 0.9),
+                "p99": self.__percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0
+            },
+            "batches": batches,
+            "mean_batch_size": self.batcher.batched_sentences / batches if batches else 0.0,
+            "active_batches": self.batcher.active_batches,
+            "queue_depth": self.batcher.queue_depth,
+            "stages": stage_metrics.snapshot()
+        }
+
+    def __percentile(self, values: List[float], percentile: float) -> float:
+        """Gets the nearest-rank percentile of sorted values, 0.0 if there are none."""
+
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(percentile * len(values)))]
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers the requests of a connection until the client closes it or asks to."""
+
+        try:
+            while True:
+                try:
+                    request = await self.__read_request(reader)
+                except HttpError as error:
+                    await self.__write_response(writer, error.status, {"error": str(error)}, False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body, keep_alive = request
+                status, response = await self.__handle_request(method, path, headers, body)
+                await self.__write_response(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            # Closed connections and header lines exceeding the stream limit
+            pass
+        finally:
+            writer.close()
+
+    async def __read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes, bool]:
+        """Reads an HTTP/1.x request. Returns None, if the connection was closed before a new request."""
+
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise HttpError(400, "Invalid request line.")
+        method, path, version = parts
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(501, "Chunked requests are not supported.")
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length.")
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length.")
+        if length > self.max_body_size:
+            raise HttpError(413, "The request body is too large.")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, path.split("?")[0], headers, body, keep_alive
+
+    async def __handle_request(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, object]:
+        """Routes a request to its endpoint. Returns the status code and the response, json or bytes."""
+
+        if path == "/health":
+            if method != "GET":
+                return 405, {"error": "Use GET."}
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "Use GET."}
+            return 200, self.metrics()
+        if path != "/extract":
+            return 404, {"error": "Unknown path."}
+        if method != "POST":
+            return 405, {"error": "Use POST."}
+
+        try:
+            sentences = self.__parse_sentences(headers, body)
+        except HttpError as error:
+            return error.status, {"error": str(error)}
+
+        started = time.perf_counter()
+        self.requests += 1
+        self.sentences += len(sentences)
+        try:
+            competencies = await self.batcher.annotate(sentences)
+        except Exception as exception:
+            self.errors += 1
+            return 500, {"error": str(exception)}
+        self.__latencies.append((time.perf_counter() - started) * 1000)
+        return 200, encode_competencies(competencies, self.compact).encode("utf-8")
+
+    def __parse_sentences(self, headers: Dict[str, str], body: bytes) -> List[str]:
+        """Gets the sentences of an extract request, sent as json or as plain text with one sentence per line."""
+
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HttpError(400, "The request body is not UTF-8.")
+        if "json" not in headers.get("content-type", ""):
+            return text.splitlines()
+
+        try:
+            data = json.loads(text)
+        except ValueError:
+            raise HttpError(400, "The request body is no valid json.")
+        if isinstance(data, dict):
+            data = data.get("sentences")
+        if not isinstance(data, list) or not all(isinstance(sentence, str) for sentence in data):
+            raise HttpError(
+                400, "Send a list of sentences or an object with a list of sentences as \"sentences\".")
+        return data
+
+    async def __write_response(self, writer: asyncio.StreamWriter, status: int, response: object, keep_alive: bool):
+        """Writes a json response."""
+
+        body = response if isinstance(response, bytes) else dumps(
+            response, self.compact).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
@@ -0,0 +1,74 @@
+import pytest
+import io
+import os
+
+from compex.benchmark.generator import SyntheticCorpus
+from compex.benchmark.suite import BENCHMARKS, BenchmarkSuite, compare
+from compex.converter.tsv2competency import convert_tsv_to_competencies
+from compex.io.tsv import TsvReader
+
+
+class TestSyntheticCorpus:
+    def test_tsv_converts_to_generated_annotations(self):
+        tsv = SyntheticCorpus(seed=3).generate_tsv(200)
+        competencies = convert_tsv_to_competencies(
+            TsvReader().read_tsv(io.StringIO(tsv)))
+
+        triples = [c for cs in competencies.values() for c in cs]
+        objects = [o for c in triples for o in c.objects]
+        contexts = [x for o in objects for x in o.contexts]
+        assert len(competencies) == tsv.count("#Text=")
+        assert len(triples) == tsv.count("\tcompetency\t")
+        assert len(objects) == tsv.count("[0_")
+        assert len(contexts) > 0
+        for sentence, cs in competencies.items():
+            words = sentence.split(" ")
+            for competency in cs:
+                assert words[competency.word.index] == competency.word.word
+
+    def test_same_seed_generates_same_corpus(self):
+        assert SyntheticCorpus(seed=1).generate_tsv(
+            20) == SyntheticCorpus(seed=1).generate_tsv(20)
+        assert SyntheticCorpus(seed=1).generate_tsv(
+            20) != SyntheticCorpus(seed=2).generate_tsv(20)
+
+    def test_write_corpus_writes_sentences_of_tsv(self, tmp_path):
+        paths = SyntheticCorpus().write_corpus(str(tmp_path), 2, 10)
+        assert [os.path.basename(p) for p in paths] == [
+            "synthetic-0000.tsv", "synthetic-0000.txt", "synthetic-0001.tsv", "synthetic-0001.txt"]
+
+        with open(paths[0], encoding="utf-8") as tsv_file:
+            document = TsvReader().read_tsv(tsv_file)
+        with open(paths[1], encoding="utf-8") as text_file:
+            sentences = text_file.read().splitlines()
+        assert sentences == [sentence.text for sentence in document.sentences]
+
+
+class TestBenchmarkSuite:
+    def test_run_reports_all_benchmarks(self):
+        results = BenchmarkSuite(SyntheticCorpus(), 20, 1).run()
+
+        assert results["metadata"]["corpus"]["sentences"] == 20
+        assert list(results["benchmarks"]) == list(BENCHMARKS)
+        for result in results["benchmarks"].values():
+            assert result["items"] > 0
+            assert result["best_seconds"] <= result["median_seconds"]
+            assert result["peak_memory_bytes"] > 0
+
+    def test_unknown_benchmark_raises(self):
+        with pytest.raises(ValueError):
+            BenchmarkSuite(SyntheticCorpus(), 20, 1).run(["unknown"])
+
+    def test_compare_with_baseline(self):
+        suite = BenchmarkSuite(SyntheticCorpus(), 20, 1)
+        results = suite.run(["convert"])
+        baseline = suite.run(["convert", "read_tsv"])
+        baseline["benchmarks"]["convert"]["best_seconds"] = results["benchmarks"]["convert"]["best_seconds"] * 2
+
+        comparison = compare(results, baseline)
+        assert list(comparison["benchmarks"]) == ["convert"]
+        assert comparison["benchmarks"]["convert"]["speedup"] == pytest.approx(2)
+
+        other = BenchmarkSuite(SyntheticCorpus(seed=1), 20, 1).run(["convert"])
+        with pytest.raises(ValueError):
+            compare(results, other)
@@ -0,0 +1,95 @@
+import pytest
+import time
+
+import requests
+
+from compex.benchmark.corenlp_standin import CoreNLPRecording, CoreNLPStandIn
+from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
+from compex.extractor.corenlp_session import CoreNLPSession
+
+SENTENCES = ["Die Studierenden beherrschen grundlegende Techniken.",
+             "Die Studierenden kennen die Grundlagen.",
+             "Die Studierenden analysieren Datenbanken."]
+
+
+def semgrex_sentence(sentence: str) -> dict:
+    """A semgrex response matching the third token as competency and the last word as object."""
+
+    tokens = sentence.rstrip(".").split()
+    competency = {"text": tokens[2], "begin": 2, "end": 3}
+    competency_object = {"text": tokens[-1], "begin": len(tokens) - 1, "end": len(tokens)}
+    return {"0": dict(competency, **{"$competency": competency, "$object": competency_object}), "length": 1}
+
+
+def create_recording(path: str = None) -> CoreNLPRecording:
+    recording = CoreNLPRecording(path)
+    recording.record("/semgrex", SemgrexAnnotator.pattern, "\n".join(SENTENCES),
+                     {"sentences": [semgrex_sentence(sentence) for sentence in SENTENCES]})
+    return recording
+
+
+def extract(url: str, batch_size: int = 2, workers: int = 2) -> dict:
+    annotator = SemgrexAnnotator(batch_size=batch_size, workers=workers)
+    session = CoreNLPSession(url, annotators=annotator.annotators, properties=annotator.properties,
+                             version="test")
+    with session:
+        annotator.session = session
+        return annotator.annotate(SENTENCES)
+
+
+class TestCoreNLPStandIn:
+    def test_replays_recorded_sentences_in_other_batches(self):
+        with CoreNLPStandIn(create_recording()) as standin:
+            result = extract(standin.url)
+            assert standin.stats() == {"requests": 3, "sentences": 4, "misses": 0, "recorded": 3}
+
+        assert [str(c) for c in result[SENTENCES[0]]] == ["beherrschen: [Techniken]"]
+        assert [str(c) for c in result[SENTENCES[1]]] == ["kennen: [Grundlagen]"]
+        assert [str(c) for c in result[SENTENCES[2]]] == ["analysieren: [Datenbanken]"]
+
+    def test_records_responses_of_upstream(self, tmp_path):
+        path = str(tmp_path / "recording.ndjson")
+        with CoreNLPStandIn(create_recording()) as upstream:
+            with CoreNLPStandIn(CoreNLPRecording(path), upstream=upstream.url) as recorder:
+                expected = extract(recorder.url, batch_size=3, workers=1)
+
+        recording = CoreNLPRecording(path)
+        assert len(recording) == 4
+        with CoreNLPStandIn(recording) as standin:
+            result = extract(standin.url, batch_size=1)
+            assert standin.stats()["misses"] == 0
+        assert {s: [c.to_dict() for c in cs] for s, cs in result.items()} == \
+            {s: [c.to_dict() for c in cs] for s, cs in expected.items()}
+
+    def test_missing_responses(self):
+        with CoreNLPStandIn(CoreNLPRecording()) as standin:
+            response = requests.post(standin.url + "/semgrex", params={"pattern": "{}"}, data=b"Unknown.")
+            assert response.status_code == 500
+            assert requests.get(standin.url + "/ping").text == "pong\n"
+            assert requests.post(standin.url + "/unknown", data=b"").status_code == 404
+
+        with CoreNLPStandIn(CoreNLPRecording(), missing="empty") as standin:
+            response = requests.post(standin.url + "/semgrex", params={"pattern": "{}"}, data=b"a\nb")
+            assert response.json() == {"sentences": [{"length": 0}, {"length": 0}]}
+            assert standin.stats()["misses"] == 1
+
+    def test_session_starts_without_recorded_warm_up(self):
+        with CoreNLPStandIn(CoreNLPRecording(), missing="error") as standin:
+            with CoreNLPSession(standin.url, annotators=SemgrexAnnotator.annotators,
+                                properties=SemgrexAnnotator.properties, version="test") as session:
+                assert session.is_alive()
+                with pytest.raises(Exception):
+                    session.semgrex("Unknown.", SemgrexAnnotator.pattern)
+            assert standin.stats()["misses"] == 1
+
+    def test_latency(self):
+        with CoreNLPStandIn(CoreNLPRecording(), missing="empty", latency=0.05, jitter=0.01, seed=1) as standin:
+            started = time.perf_counter()
+            requests.post(standin.url + "/semgrex", params={"pattern": "{}"}, data=b"a")
+            assert time.perf_counter() - started >= 0.05
+
+    def test_invalid_options_raise(self):
+        with pytest.raises(ValueError):
+            CoreNLPStandIn(CoreNLPRecording(), latency=-1)
+        with pytest.raises(ValueError):
+            CoreNLPStandIn(CoreNLPRecording(), missing="unknown")
@@ -0,0 +1,71 @@
+import pytest
+import os
+import shutil
+
+from compex.converter.competency_cache import CompetencyCache
+from compex.converter.tsv2competency import convert_tsv_files_to_competencies
+
+
+class TestCompetencyCache:
+    def setup_method(self, method):
+        self.test_dir = os.path.dirname(__file__)
+
+    def copy_tsv(self, tmp_path) -> str:
+        path = str(tmp_path / "test.tsv")
+        shutil.copyfile(os.path.join(
+            self.test_dir, "../resources/test.tsv"), path)
+        return path
+
+    def test_unchanged_files_are_loaded_from_cache(self, tmp_path):
+        path = self.copy_tsv(tmp_path)
+        cache_path = str(tmp_path / "gold.db")
+        expected = convert_tsv_files_to_competencies([path])
+
+        with CompetencyCache(cache_path) as cache:
+            convert_tsv_files_to_competencies([path], cache=cache)
+            assert cache.stats() == {"hits": 0, "misses": 1, "entries": 1}
+        with CompetencyCache(cache_path) as cache:
+            sentence_files = {}
+            result = convert_tsv_files_to_competencies(
+                [path], sentence_files=sentence_files, cache=cache)
+            assert cache.stats() == {"hits": 1, "misses": 0, "entries": 1}
+
+        assert list(result) == list(expected)
+        assert list(sentence_files) == list(expected)
+        for sentence, competencies in expected.items():
+            assert [c.to_dict() for c in result[sentence]] == [
+                c.to_dict() for c in competencies]
+
+    def test_changed_files_are_converted_again(self, tmp_path):
+        path = self.copy_tsv(tmp_path)
+        with CompetencyCache(":memory:") as cache:
+            convert_tsv_files_to_competencies([path], cache=cache)
+
+            # Touching without changing the content keeps the entry
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            convert_tsv_files_to_competencies([path], cache=cache)
+            assert cache.hits == 1
+
+            with open(path, "r") as tsv_file:
+                content = tsv_file.read()
+            with open(path, "w") as tsv_file:
+                tsv_file.write(content.replace(
+                    "Studierenden", "Studentinnen"))
+            result = convert_tsv_files_to_competencies([path], cache=cache)
+            assert cache.misses == 2
+            assert any("Studentinnen" in sentence for sentence in result)
+            assert cache.get(path) is not None
+
+    def test_entries_of_other_converter_versions_are_converted_again(self, tmp_path, monkeypatch):
+        path = self.copy_tsv(tmp_path)
+        cache_path = str(tmp_path / "gold.db")
+        with CompetencyCache(cache_path) as cache:
+            convert_tsv_files_to_competencies([path], cache=cache)
+
+        monkeypatch.setattr(CompetencyCache, "CONVERTER_VERSION", CompetencyCache.CONVERTER_VERSION + 1)
+        with CompetencyCache(cache_path) as cache:
+            assert cache.get(path) is None
+            convert_tsv_files_to_competencies([path], cache=cache)
+            assert cache.get(path) is not None
+            assert cache.stats() == {"hits": 1, "misses": 2, "entries": 1}
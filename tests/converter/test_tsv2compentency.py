@@ -1,7 +1,9 @@
 import pytest
+import glob
 import os
-from compex.io.tsv import TsvReader, TsvDocument
-from compex.converter.tsv2competency import convert_tsv_to_competencies
+from compex.io.tsv import TsvReader, TsvDocument, TsvSentence, TsvToken, Feature, FeatureDefinition, LayerDefinition, LayerType
+from compex.model.competency import CompetencyObject, ObjectContext, Word, WordChunk
+from compex.converter.tsv2competency import convert_tsv_to_competencies, convert_tsv_files_to_competencies, convert_tsv_sentence_to_competencies
 
 
 class TestTsvToCompetenciesConverter:
@@ -13,3 +15,66 @@ class TestTsvToCompetenciesConverter:
             document: TsvDocument = reader.read_tsv(tsv_file)
             sentences = convert_tsv_to_competencies(document)
             assert len(sentences) == 7
+
+    def test_sentence_stream(self):
+        test_dir = os.path.dirname(__file__)
+        reader = TsvReader()
+        with open(os.path.join(test_dir, "../resources/test.tsv"), 'r') as tsv_file:
+            expected = convert_tsv_to_competencies(reader.read_tsv(tsv_file))
+        with open(os.path.join(test_dir, "../resources/test.tsv"), 'r') as tsv_file:
+            sentences = convert_tsv_to_competencies(reader.iter_tsv(tsv_file))
+        assert sentences == expected
+        for sentence, competencies in sentences.items():
+            assert [c.objects for c in competencies] == [
+                c.objects for c in expected[sentence]]
+
+    def test_sentence_links_objects_and_contexts(self):
+        span_layer = LayerDefinition(LayerType.SPAN_LAYER, "webanno.custom.TestLayer")
+        relation_layer = LayerDefinition(LayerType.RELATION_LAYER, "webanno.custom.TestLayerRelation")
+        comp_type = FeatureDefinition("CompType", span_layer)
+        relation_type = FeatureDefinition("BT_webanno.custom.TestLayer", relation_layer)
+
+        competency1 = Feature(comp_type, "1", "competency")
+        object1 = Feature(comp_type, "2", "object")
+        context = Feature(comp_type, "3", "context")
+        competency2 = Feature(comp_type, "4", "competency")
+        object2 = Feature(comp_type, "5", "object")
+        sentence = TsvSentence("a b c d e f", [
+            TsvToken(1, 1, 0, 1, "a", [competency1]),
+            TsvToken(1, 2, 2, 3, "b", [object1, Feature(relation_type, "6", "1-1")]),
+            TsvToken(1, 3, 4, 5, "c", [object1]),
+            TsvToken(1, 4, 6, 7, "d", [context, Feature(relation_type, "7", "1-2")]),
+            TsvToken(1, 5, 8, 9, "e", [competency2]),
+            TsvToken(1, 6, 10, 11, "f", [object2, Feature(relation_type, "8", "1-5")])
+        ])
+
+        competencies = convert_tsv_sentence_to_competencies(sentence)
+
+        assert [c.word for c in competencies] == [Word(0, "a"), Word(4, "e")]
+        assert competencies[0].objects == [
+            CompetencyObject(WordChunk([Word(1, "b"), Word(2, "c")]))]
+        assert competencies[0].objects[0].contexts == [
+            ObjectContext(WordChunk([Word(3, "d")]))]
+        assert competencies[1].objects == [
+            CompetencyObject(WordChunk([Word(5, "f")]))]
+        assert competencies[1].objects[0].contexts == []
+
+    def test_parallel_files_merge_in_order(self):
+        test_dir = os.path.dirname(__file__)
+        paths = sorted(glob.glob(os.path.join(
+            test_dir, "../resources/bht-annotated/**/*.tsv"), recursive=True))[:8]
+        paths.append(os.path.join(test_dir, "../resources/test.tsv"))
+
+        sentence_files = {}
+        sequential = convert_tsv_files_to_competencies(paths)
+        parallel = convert_tsv_files_to_competencies(
+            paths, processes=2, sentence_files=sentence_files)
+
+        assert list(parallel.keys()) == list(sequential.keys())
+        for sentence, competencies in sequential.items():
+            assert parallel[sentence] == competencies
+            assert [c.objects for c in parallel[sentence]] == [
+                c.objects for c in competencies]
+        assert list(sentence_files) == list(sequential)
+        assert set(sentence_files.values()) <= set(paths)
+        assert sentence_files[next(reversed(sequential))] == paths[-1]
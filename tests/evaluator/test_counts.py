@@ -0,0 +1,72 @@
+import pytest
+
+from compex.model.competency import Competency, CompetencyObject, Word, WordChunk
+from compex.model.taxonomy import BloomsTaxonomyDimensionEnum
+from compex.evaluator.evaluators import EvaluationSet, FMeasureEvaluator
+
+
+class TestEvaluationCounts:
+    test_data = {
+        "Studierende kennen Grundlagen.": [
+            Competency(Word(1, "kennen"), [CompetencyObject(WordChunk([Word(2, "Grundlagen")]))])],
+        "Studierende entwerfen und implementieren Anwendungen.": [
+            Competency(Word(1, "entwerfen")),
+            Competency(Word(3, "implementieren"))],
+        "Studierende lernen.": []
+    }
+    annotated_data = {
+        "Studierende kennen Grundlagen.": [
+            Competency(Word(1, "kennen"), [CompetencyObject(WordChunk([Word(0, "Studierende")]))],
+                       BloomsTaxonomyDimensionEnum.REMEMBER)],
+        "Studierende entwerfen und implementieren Anwendungen.": [
+            Competency(Word(1, "entwerfen"), taxonomy_dimension=BloomsTaxonomyDimensionEnum.CREATE),
+            Competency(Word(4, "Anwendungen"))],
+        "Studierende lernen.": [Competency(Word(1, "lernen"))]
+    }
+
+    def evaluate(self, sentences):
+        evaluation_set = EvaluationSet({sentence: self.test_data[sentence] for sentence in sentences},
+                                       {sentence: self.annotated_data[sentence] for sentence in sentences})
+        return FMeasureEvaluator().evaluate_with_annotated_sentences(evaluation_set, True, False)
+
+    def test_summary_equals_evaluation(self):
+        counts = FMeasureEvaluator().count(
+            EvaluationSet(self.test_data, self.annotated_data), True, False)
+
+        assert counts.summary() == self.evaluate(self.test_data)
+        assert counts.summary()["positives"] == {"true": 1.5, "false": 2.5}
+
+    def test_breakdowns_equal_evaluation_of_slices(self):
+        counts = FMeasureEvaluator().count(
+            EvaluationSet(self.test_data, self.annotated_data), True, False)
+        sentences = list(self.test_data)
+        sentence_files = {sentences[0]: "a.tsv",
+                          sentences[1]: "b.tsv", sentences[2]: "a.tsv"}
+
+        by_sentence = counts.by_sentence()
+        by_file = counts.by_file(sentence_files)
+
+        assert list(by_sentence) == sentences
+        for sentence in sentences:
+            assert by_sentence[sentence] == self.evaluate([sentence])
+        assert by_sentence["Studierende lernen."]["negatives"] == {
+            "true": 0, "false": 0}
+        assert by_file == {
+            "a.tsv": self.evaluate([sentences[0], sentences[2]]),
+            "b.tsv": self.evaluate([sentences[1]])
+        }
+
+    def test_by_taxonomy_dimension(self):
+        counts = FMeasureEvaluator().count(
+            EvaluationSet(self.test_data, self.annotated_data), True, False)
+
+        result = counts.by_taxonomy_dimension()
+
+        assert list(result) == ["REMEMBER", "CREATE", "NONE"]
+        assert result["REMEMBER"]["positives"] == {"true": 0.5, "false": 0.5}
+        assert result["CREATE"]["positives"] == {"true": 1.0, "false": 0.0}
+        assert result["NONE"]["positives"] == {"true": 0.0, "false": 2.0}
+        # Gold competencies get the dimension of their annotated match
+        assert result["REMEMBER"]["negatives"] == {"true": 0.5, "false": 0.5}
+        assert result["CREATE"]["negatives"] == {"true": 1.0, "false": 0.0}
+        assert result["NONE"]["negatives"] == {"true": 0.0, "false": 1.0}
@@ -392,3 +392,32 @@ class TestFMeasureEvaluator:
         # 6.4 / (6.4 + 0.7142857142857143)
         assert result["recall"] == 1
         assert result["f1"] == 1
+
+    def test_FMeasureEvaluator_context_words_of_multiple_objects(self):
+        sentence = "Studierende kennen a b c."
+        self.test_data = {sentence: [
+            Competency(Word(1, "kennen"), [
+                CompetencyObject(WordChunk([]), [ObjectContext(WordChunk([Word(4, "c"), Word(2, "a")]))]),
+                CompetencyObject(WordChunk([]), [ObjectContext(WordChunk([Word(3, "b"), Word(2, "a")]))])
+            ])
+        ]}
+        self.annotated_data = {sentence: [
+            Competency(Word(1, "kennen"), [
+                CompetencyObject(WordChunk([]), [
+                    ObjectContext(WordChunk([Word(2, "a")])),
+                    ObjectContext(WordChunk([Word(4, "c")]))
+                ]),
+                CompetencyObject(WordChunk([Word(2, "a"), Word(2, "a")]))
+            ])
+        ]}
+
+        evaluation_set = EvaluationSet(self.test_data, self.annotated_data)
+        result = self.evaluator.evaluate_with_annotated_sentences(
+            evaluation_set, True, True)
+
+        # A context word found in the first context of multiple objects counts once per object:
+        # competency + 2 * "a" + "c" are correct, both object words are incorrect
+        assert result["positives"]["true"] == 4 / 6
+        assert result["positives"]["false"] == 2 / 6
+        assert result["negatives"]["true"] == 0.8
+        assert result["negatives"]["false"] == 0.2
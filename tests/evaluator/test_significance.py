@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+
+from compex.model.competency import Competency, Word
+from compex.evaluator.evaluators import EvaluationSet, FMeasureEvaluator
+from compex.evaluator.significance import bootstrap, calculate_measures, compare, sentence_counts
+
+
+class TestSignificance:
+    test_data = {"Sentence {}".format(i): [Competency(Word(1, "verb")), Competency(Word(i % 3, "noun"))]
+                 for i in range(40)}
+    worse_data = {"Sentence {}".format(i): [Competency(Word(1, "verb")), Competency(Word(5, "other"))]
+                  for i in range(40)}
+    better_data = {"Sentence {}".format(i): [Competency(Word(1, "verb")), Competency(Word(i % 3, "noun"))]
+                   if i % 4 else [Competency(Word(1, "verb"))] for i in range(40)}
+
+    def count(self, annotated_data):
+        return FMeasureEvaluator().count(EvaluationSet(self.test_data, annotated_data))
+
+    def test_measures_of_sentence_counts_equal_summary(self):
+        counts = self.count(self.worse_data)
+
+        measures = calculate_measures(sentence_counts(counts).sum(axis=0))
+
+        summary = counts.summary()
+        assert measures == pytest.approx(
+            [summary["precision"], summary["recall"], summary["f1"]])
+
+    def test_bootstrap_is_reproducible(self):
+        counts = self.count(self.worse_data)
+
+        result = bootstrap(counts, 1200, seed=7)
+
+        assert bootstrap(counts, 1200, seed=7, processes=2) == result
+        for measure in ("precision", "recall", "f1"):
+            lower, upper = result[measure]
+            assert lower <= counts.summary()[measure] <= upper
+
+    def test_compare(self):
+        worse, better = self.count(self.worse_data), self.count(self.better_data)
+
+        result = compare(worse, better, 1000, seed=7)
+
+        assert result["f1"]["difference"] == pytest.approx(
+            better.summary()["f1"] - worse.summary()["f1"])
+        assert result["f1"]["interval"][0] > 0
+        assert result["f1"]["p_value"] < 0.01
+        assert compare(worse, worse, 100, seed=7)["f1"] == {
+            "difference": 0.0, "interval": [0.0, 0.0], "p_value": 1.0}
+
+    def test_invalid_arguments(self):
+        counts = self.count(self.worse_data)
+
+        with pytest.raises(ValueError):
+            bootstrap(counts, 0)
+        with pytest.raises(ValueError):
+            bootstrap(counts, 10, confidence=1)
+        with pytest.raises(ValueError):
+            bootstrap(FMeasureEvaluator().count(EvaluationSet({}, {})), 10)
@@ -0,0 +1,118 @@
+import ast
+import json
+import re
+import threading
+import requests
+
+
+class FakeProcess:
+    def __init__(self):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+
+class FakeCoreNLPClient:
+    """Fake CoreNLP client, that manages a fake server process."""
+
+    instances = []
+
+    def __init__(self, start_server=True, endpoint="http://localhost:9000", **kwargs):
+        self.start_server = start_server
+        self.endpoint = endpoint
+        self.server = None
+        self.is_active = False
+        self.stopped = False
+        FakeCoreNLPClient.instances.append(self)
+
+    def ensure_alive(self):
+        if self.start_server and self.server is None:
+            self.server = FakeProcess()
+        self.is_active = True
+
+    def is_alive(self):
+        return True
+
+    def annotate(self, text, annotators=None, output_format=None, properties=None):
+        FakeHttpSession.properties.append(dict(properties or {}))
+        return {"sentences": []}
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeHttpSession:
+    """Fake HTTP session answering semgrex requests. Treats the second token of each sentence as competency."""
+
+    requests = []
+    properties = []
+    fail_next_request = False
+    lock = threading.Lock()
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def close(self):
+        pass
+
+    def post(self, url, params=None, data=None, headers=None, timeout=None):
+        with FakeHttpSession.lock:
+            if FakeHttpSession.fail_next_request:
+                FakeHttpSession.fail_next_request = False
+                FakeCoreNLPClient.instances[-1].server.returncode = 1
+                raise requests.exceptions.ConnectionError()
+            text = data.decode("utf-8")
+            FakeHttpSession.requests.append(text)
+            properties = ast.literal_eval(params["properties"])
+            FakeHttpSession.properties.append(properties)
+        if properties.get("ssplit.eolonly") == "true":
+            lines = text.split("\n")
+        else:
+            # Like CoreNLPs sentence splitter, split after each full stop
+            lines = re.split(r"(?<=\.)\s+", text.strip())
+        if not url.endswith("/semgrex"):
+            return FakeResponse(json.dumps({"sentences": [self.parse(line) for line in lines]}))
+        sentences = []
+        for line in lines:
+            tokens = line.split()
+            sentence = {"length": 1}
+            match = {"text": tokens[1], "begin": 1, "end": 2}
+            sentence["0"] = dict(match, **{"$competency": match})
+            sentences.append(sentence)
+        return FakeResponse(json.dumps({"sentences": sentences}))
+
+    def parse(self, line):
+        """Parses the second token as verb with the first token as subject and the third as object."""
+
+        tokens = []
+        for i, word in enumerate(line.split()):
+            tokens.append({"index": i + 1, "word": word,
+                           "pos": "VVFIN" if i == 1 else "NN"})
+        dependencies = [{"dep": "ROOT", "governor": 0, "dependent": 2},
+                        {"dep": "nsubj", "governor": 2, "dependent": 1}]
+        if len(tokens) > 2:
+            dependencies.append(
+                {"dep": "dobj", "governor": 2, "dependent": 3})
+        return {"tokens": tokens, "enhancedDependencies": dependencies}
+
+
+def install_fakes(monkeypatch):
+    """Replaces CoreNLP client and HTTP session of CoreNLPSession with fakes."""
+
+    FakeCoreNLPClient.instances = []
+    FakeHttpSession.requests = []
+    FakeHttpSession.properties = []
+    FakeHttpSession.fail_next_request = False
+    monkeypatch.setattr(
+        "compex.extractor.corenlp_session.CoreNLPClient", FakeCoreNLPClient)
+    monkeypatch.setattr(
+        "compex.extractor.corenlp_session.requests.Session", FakeHttpSession)
@@ -2,8 +2,10 @@ import pytest
 import os
 
 from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
+from compex.extractor.semgrex_cache import SemgrexCache
 from compex.model.competency import Competency, CompetencyObject, ObjectContext, Word, WordChunk
 from compex.model.taxonomy import TaxonomyManager, BloomsTaxonomyDimensionEnum
+from tests.extractor.fakes import FakeCoreNLPClient, FakeHttpSession, install_fakes
 
 
 class TestSemgrexAnnotator:
@@ -101,3 +103,156 @@ class TestSemgrexAnnotator:
 
             assert not result[sample[0]]
             assert result[sample[1]][0] == c2
+
+
+
+class TestSemgrexAnnotatorBatching:
+    def test_batches_are_realigned(self, monkeypatch):
+        install_fakes(monkeypatch)
+        sample = [
+            "Studierende implementieren.\n",
+            "Die Studierenden kennen die Grundlagen.",
+            "",
+            "Studierende implementieren.",
+            "Studierende entwerfen Anwendungen."
+        ]
+
+        annotator = SemgrexAnnotator(batch_size=2)
+        result = annotator.annotate(sample)
+
+        assert FakeHttpSession.requests == [
+            "Studierende implementieren.\nDie Studierenden kennen die Grundlagen.",
+            "Studierende entwerfen Anwendungen."
+        ]
+        assert list(result.keys()) == [
+            "Studierende implementieren.",
+            "Die Studierenden kennen die Grundlagen.",
+            "Studierende entwerfen Anwendungen."
+        ]
+        assert result["Studierende implementieren."] == [
+            Competency(Word(1, "implementieren."))]
+        assert result["Die Studierenden kennen die Grundlagen."] == [
+            Competency(Word(1, "Studierenden"))]
+        assert result["Studierende entwerfen Anwendungen."] == [
+            Competency(Word(1, "entwerfen"))]
+
+    def test_results_do_not_depend_on_batch_size(self, monkeypatch):
+        install_fakes(monkeypatch)
+        sample = ["Studierende implementieren. Sie entwerfen.",
+                  "Studierende entwerfen."]
+
+        results = [SemgrexAnnotator(batch_size=batch_size).annotate(sample)
+                   for batch_size in (1, 2)]
+
+        assert results[0] == results[1]
+        assert results[0][sample[0]] == [
+            Competency(Word(1, "implementieren."))]
+
+    def test_batch_properties_are_part_of_cache_key(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with SemgrexCache(":memory:") as cache:
+            SemgrexAnnotator(cache=cache).annotate(["Studierende implementieren."])
+            annotator = SemgrexAnnotator(cache=cache)
+            annotator.batch_properties = {"ssplit.eolonly": "false"}
+            annotator.annotate(["Studierende implementieren."])
+
+            assert cache.stats()["hits"] == 0
+            assert len(FakeHttpSession.requests) == 2
+
+    def test_caching_attached_server_requires_version(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with SemgrexCache(":memory:") as cache:
+            annotator = SemgrexAnnotator(cache=cache)
+            annotator.session = annotator.create_session("http://corenlp:9000")
+            with pytest.raises(ValueError):
+                annotator.annotate(["Studierende implementieren."])
+
+            annotator.session = annotator.create_session("http://corenlp:9000", "corenlp-3.9.1")
+            annotator.annotate(["Studierende implementieren."])
+            assert cache.stats()["entries"] == 1
+
+    def test_session_is_reused(self, monkeypatch):
+        install_fakes(monkeypatch)
+
+        with SemgrexAnnotator() as annotator:
+            annotator.annotate(["Studierende implementieren."])
+            annotator.annotate(["Studierende entwerfen."])
+        assert len(FakeCoreNLPClient.instances) == 1
+        assert annotator.session is None
+
+    def test_concurrent_batches_keep_input_order(self, monkeypatch):
+        install_fakes(monkeypatch)
+        sample = ["Studierende verb{}.".format(i) for i in range(50)]
+
+        annotator = SemgrexAnnotator(batch_size=3, workers=4)
+        result = annotator.annotate(sample)
+
+        assert len(FakeHttpSession.requests) == 17
+        assert list(result.keys()) == sample
+        for i, sentence in enumerate(sample):
+            assert result[sentence] == [
+                Competency(Word(1, "verb{}.".format(i)))]
+
+    def test_cached_sentences_skip_corenlp(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with SemgrexCache(":memory:") as cache:
+            annotator = SemgrexAnnotator(cache=cache)
+            first = annotator.annotate(
+                ["Studierende implementieren.", "Studierende entwerfen."])
+            second = annotator.annotate(
+                ["Studierende  entwerfen.", "Studierende implementieren."])
+
+            assert len(FakeCoreNLPClient.instances) == 1
+            assert len(FakeHttpSession.requests) == 2
+            assert cache.stats() == {"hits": 2, "misses": 2, "entries": 2}
+            assert second["Studierende implementieren."] == first["Studierende implementieren."]
+            assert second["Studierende  entwerfen."] == first["Studierende entwerfen."]
+
+    def test_graph_cache_matches_locally(self, monkeypatch):
+        install_fakes(monkeypatch)
+        sample = ["Studierende implementieren.",
+                  "Studierende entwerfen Anwendungen"]
+        with SemgrexCache(":memory:") as graph_cache:
+            annotator = SemgrexAnnotator(batch_size=2, graph_cache=graph_cache)
+            result = annotator.annotate(sample)
+            assert result[sample[0]] == [
+                Competency(Word(1, "implementieren."))]
+            assert result[sample[1]][0].objects == [
+                CompetencyObject(WordChunk([Word(2, "Anwendungen")]))]
+
+            # Changing the pattern does not parse the sentences again
+            annotator.pattern = "{tag:NN}=competency"
+            result = annotator.annotate(sample)
+            assert result[sample[1]] == [
+                Competency(Word(0, "Studierende")), Competency(Word(2, "Anwendungen"))]
+            assert len(FakeHttpSession.requests) == 1
+
+    def test_stream_yields_results_per_chunk(self, monkeypatch):
+        install_fakes(monkeypatch)
+        read = []
+
+        def lines():
+            for i in range(5):
+                read.append(i)
+                yield "Studierende verb{}.\n".format(i)
+            yield "\n"
+            yield "Studierende verb0.\n"
+
+        annotator = SemgrexAnnotator(batch_size=2)
+        stream = annotator.annotate_stream(lines())
+
+        assert next(stream) == (
+            "Studierende verb0.", [Competency(Word(1, "verb0."))])
+        assert read == [0, 1]
+        results = list(stream)
+        assert [sentence for sentence, _ in results] == [
+            "Studierende verb1.", "Studierende verb2.", "Studierende verb3.",
+            "Studierende verb4.", "Studierende verb0."]
+        assert len(FakeCoreNLPClient.instances) == 1
+        assert annotator.session is None
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            SemgrexAnnotator(batch_size=0)
+        with pytest.raises(ValueError):
+            SemgrexAnnotator(workers=0)
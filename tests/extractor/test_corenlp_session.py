@@ -0,0 +1,60 @@
+import pytest
+
+from compex.extractor.corenlp_session import CoreNLPSession
+from tests.extractor.fakes import FakeCoreNLPClient, FakeHttpSession, install_fakes
+
+
+class TestCoreNLPSession:
+    def test_starts_server_once(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with CoreNLPSession() as session:
+            session.semgrex("Studierende implementieren.", "{}=competency")
+            session.semgrex("Studierende entwerfen.", "{}=competency")
+            assert session.is_alive()
+        assert len(FakeCoreNLPClient.instances) == 1
+        assert FakeCoreNLPClient.instances[0].start_server
+        assert FakeCoreNLPClient.instances[0].stopped
+
+    def test_attaches_to_url(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with CoreNLPSession("http://corenlp:9000") as session:
+            assert not session.starts_server
+            session.semgrex("Studierende implementieren.", "{}=competency")
+        assert len(FakeCoreNLPClient.instances) == 1
+        assert not FakeCoreNLPClient.instances[0].start_server
+        assert FakeCoreNLPClient.instances[0].endpoint == "http://corenlp:9000"
+
+    def test_attached_server_gets_language_properties(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with CoreNLPSession("http://corenlp:9000", annotators=["tokenize"], properties="german") as session:
+            session.semgrex("Studierende implementieren.", "{}=competency",
+                            properties={"annotators": "tokenize,ssplit,depparse"})
+
+        warm_up, semgrex = FakeHttpSession.properties
+        for properties in (warm_up, semgrex):
+            assert properties["pipelineLanguage"] == "german"
+            assert properties["tokenize.language"] == "de"
+            assert properties["depparse.model"].endswith("UD_German.gz")
+        assert semgrex["annotators"] == "tokenize,ssplit,depparse"
+
+    def test_started_server_gets_no_language_properties(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with CoreNLPSession(properties="german") as session:
+            session.semgrex("Studierende implementieren.", "{}=competency")
+        assert FakeHttpSession.properties == [{"outputFormat": "json"}]
+
+    def test_version_of_attached_server_is_unknown(self, monkeypatch):
+        monkeypatch.setenv("CORENLP_HOME", "/nonexistent")
+        assert CoreNLPSession("http://corenlp:9000").version is None
+        assert CoreNLPSession("http://corenlp:9000", version="corenlp-4").version == "corenlp-4"
+        assert CoreNLPSession().version == "unknown"
+
+    def test_restarts_dead_server(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with CoreNLPSession() as session:
+            FakeHttpSession.fail_next_request = True
+            response = session.semgrex(
+                "Studierende implementieren.", "{}=competency")
+            assert response["sentences"][0]["0"]["text"] == "implementieren."
+        assert len(FakeCoreNLPClient.instances) == 2
+        assert FakeCoreNLPClient.instances[0].stopped
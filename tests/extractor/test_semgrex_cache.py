@@ -0,0 +1,34 @@
+import pytest
+import os
+
+from compex.extractor.semgrex_cache import SemgrexCache
+
+
+class TestSemgrexCache:
+    def test_key_normalizes_whitespace(self):
+        key1 = SemgrexCache.create_key(
+            "Studierende  implementieren.", "{}=competency", {"annotators": "depparse"}, "3.9.1")
+        key2 = SemgrexCache.create_key(
+            " Studierende implementieren.\n", "{}=competency", {"annotators": "depparse"}, "3.9.1")
+        key3 = SemgrexCache.create_key(
+            "Studierende implementieren.", "{}=competency", {"annotators": "depparse"}, "4.0.0")
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_persists_responses(self, tmp_path):
+        path = os.path.join(str(tmp_path), "cache.db")
+        with SemgrexCache(path) as cache:
+            cache.put("a", {"sentences": [{"length": 0}]})
+        with SemgrexCache(path) as cache:
+            assert cache.get("a") == {"sentences": [{"length": 0}]}
+            assert cache.get("b") is None
+            assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_evicts_least_recently_used(self):
+        with SemgrexCache(":memory:", max_entries=2) as cache:
+            cache.put("a", {"sentences": []})
+            cache.put("b", {"sentences": []})
+            cache.get("a")
+            cache.put("c", {"sentences": []})
+            assert len(cache) == 2
+            assert cache.get_many(["a", "b", "c"]).keys() == {"a", "c"}
@@ -0,0 +1,105 @@
+import os
+import pytest
+
+from compex.benchmark.corenlp_standin import CoreNLPRecording, CoreNLPStandIn
+from compex.extractor.corenlp_session import CoreNLPSession
+from compex.extractor.dependency_graph import DependencyGraph
+from compex.extractor.semgrex_matcher import SemgrexPattern, SemgrexSyntaxError
+from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
+from compex.extractor.semgrex_cache import SemgrexCache
+
+# Hand written responses to the annotation and semgrex requests of SemgrexAnnotator in the layout of CoreNLP
+# 3.9.1, see CoreNLPRecording. Not recorded from a CoreNLP server, so they don't show which graph CoreNLP matches on.
+SYNTHETIC_RECORDING = os.path.join(os.path.dirname(__file__), "../resources/corenlp/synthetic-semgrex.ndjson")
+SYNTHETIC_SENTENCES = ["Die Studierenden kennen die Grundlagen des wissenschaftlichen Arbeitens und wenden sie an.",
+                      "Sie können komplexe Datenbanken in modernen Anwendungen entwerfen und implementieren.",
+                      "Die Prüfung ist mündlich."]
+
+
+class TestSemgrexPattern:
+    # Die Studierenden kennen die Grundlagen des wissenschaftlichen Arbeitens und wenden sie an .
+    graph = DependencyGraph(
+        [("Die", "ART"), ("Studierenden", "NN"), ("kennen", "VVFIN"), ("die", "ART"), ("Grundlagen", "NN"),
+         ("des", "ART"), ("wissenschaftlichen", "ADJA"), ("Arbeitens", "NN"), ("und", "KON"), ("wenden", "VVFIN"),
+         ("sie", "PPER"), ("an", "PTKVZ"), (".", "$.")],
+        [(1, "det", 0), (2, "nsubj", 1), (2, "dobj", 4), (4, "det", 3), (4, "det", 7), (7, "det", 5),
+         (7, "amod", 6), (2, "cc", 8), (2, "conj:und", 9), (9, "dobj", 10), (9, "compound:prt", 11),
+         (2, "punct", 12)])
+
+    def test_competency_pattern(self):
+        pattern = SemgrexPattern(SemgrexAnnotator.pattern)
+        matches = pattern.match(self.graph)
+
+        assert matches == [
+            (2, {"competency": 2, "object": 4, "objectdet": 7, "objectdetadja": 6, "objectdetart": 5,
+                 "competency2": 9}),
+            (9, {"competency": 9, "object": 10})
+        ]
+
+    def test_response_format(self):
+        pattern = SemgrexPattern("{tag:/VV.*/}=verb >dobj {}=object")
+        response = pattern.match_to_response([self.graph])
+
+        assert response == {"sentences": [{
+            "length": 2,
+            "0": {"text": "kennen", "begin": 2, "end": 3,
+                  "$verb": {"text": "kennen", "begin": 2, "end": 3},
+                  "$object": {"text": "Grundlagen", "begin": 4, "end": 5}},
+            "1": {"text": "wenden", "begin": 9, "end": 10,
+                  "$verb": {"text": "wenden", "begin": 9, "end": 10},
+                  "$object": {"text": "sie", "begin": 10, "end": 11}}
+        }]}
+
+    def test_required_relation(self):
+        pattern = SemgrexPattern("{word:kennen} >nsubj ({}=subject >det {tag:ART}=article)")
+        assert pattern.match(self.graph) == [
+            (2, {"subject": 1, "article": 0})]
+        pattern = SemgrexPattern("{word:kennen} >nmod {}")
+        assert pattern.match(self.graph) == []
+
+    def test_unsupported_pattern(self):
+        with pytest.raises(SemgrexSyntaxError):
+            SemgrexPattern("{tag:VVFIN} >> {}")
+        with pytest.raises(SemgrexSyntaxError):
+            SemgrexPattern("{lemma:kennen}")
+        with pytest.raises(SemgrexSyntaxError):
+            SemgrexPattern("{tag:VVFIN} | {tag:NN}")
+
+    def test_compact_graph(self):
+        compact = self.graph.to_compact()
+        graph = DependencyGraph.from_compact(compact)
+        assert graph.tokens == self.graph.tokens
+        assert graph.edges == self.graph.edges
+
+
+class TestSyntheticSemgrexResponses:
+    recording = CoreNLPRecording(SYNTHETIC_RECORDING)
+
+    def match_synthetic(self, sentence: str, dependencies: str) -> dict:
+        graphs = [DependencyGraph.from_corenlp(parsed, dependencies)
+                  for parsed in self.recording.replay("/", None, sentence)]
+        return SemgrexPattern(SemgrexAnnotator.pattern).match_to_response(graphs)
+
+    def test_local_matches_equal_expected_responses(self):
+        for sentence in SYNTHETIC_SENTENCES:
+            expected = self.recording.replay("/semgrex", SemgrexAnnotator.pattern, sentence)
+            assert self.match_synthetic(sentence, SemgrexAnnotator.dependencies) == {"sentences": expected}
+
+    def test_matches_depend_on_dependencies(self):
+        # The basic dependencies have no conj:und and no nmod:in, so they give other matches
+        for sentence in SYNTHETIC_SENTENCES[:2]:
+            expected = self.recording.replay("/semgrex", SemgrexAnnotator.pattern, sentence)
+            assert self.match_synthetic(sentence, "basicDependencies") != {"sentences": expected}
+
+    def test_graph_cache_extracts_like_semgrex_resource(self):
+        results = []
+        with CoreNLPStandIn(self.recording) as standin, SemgrexCache(":memory:") as graph_cache:
+            for cache in (None, graph_cache):
+                annotator = SemgrexAnnotator(batch_size=2, graph_cache=cache)
+                with CoreNLPSession(standin.url, annotators=annotator.annotators,
+                                    properties=annotator.properties, version="test") as session:
+                    annotator.session = session
+                    results.append(annotator.annotate(SYNTHETIC_SENTENCES))
+            assert standin.stats()["misses"] == 0
+        assert results[0] == results[1]
+        assert len(results[0][SYNTHETIC_SENTENCES[0]]) == 2
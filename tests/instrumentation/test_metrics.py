@@ -0,0 +1,99 @@
+import pytest
+import glob
+import os
+
+from compex.converter.tsv2competency import convert_tsv_files_to_competencies
+from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
+from compex.instrumentation.metrics import Histogram, Metrics, metrics
+from tests.extractor.fakes import install_fakes
+
+
+class TestMetrics:
+    def test_timers_counters_and_histograms(self):
+        stage_metrics = Metrics()
+        with stage_metrics.timer("stage"):
+            sum(range(10000))
+        with pytest.raises(ValueError):
+            with stage_metrics.timer("stage"):
+                raise ValueError()
+        stage_metrics.add_time("parse", 0.5, count=10)
+        stage_metrics.count("sentences", 3)
+        stage_metrics.count("sentences")
+        stage_metrics.observe("latency", 0.003)
+
+        snapshot = stage_metrics.snapshot()
+        assert snapshot["timers"]["stage"]["count"] == 2
+        assert snapshot["timers"]["stage"]["wall_seconds"] > 0
+        assert snapshot["timers"]["stage"]["cpu_seconds"] > 0
+        assert snapshot["timers"]["parse"] == {"count": 10, "wall_seconds": 0.5, "cpu_seconds": None}
+        assert snapshot["counters"] == {"sentences": 4}
+        assert stage_metrics.counter("sentences") == 4
+        assert stage_metrics.counter("missing") == 0
+        assert snapshot["histograms"]["stage"]["count"] == 2
+        assert "parse" not in snapshot["histograms"]
+        assert snapshot["histograms"]["latency"]["p50"] == 0.003
+
+        stage_metrics.reset()
+        assert stage_metrics.snapshot() == {"timers": {}, "counters": {}, "histograms": {}}
+
+    def test_histogram_percentiles(self):
+        histogram = Histogram()
+        for _ in range(98):
+            histogram.observe(0.002)
+        histogram.observe(0.04)
+        histogram.observe(100.0)
+
+        assert histogram.percentile(0.5) == 0.0025
+        assert histogram.percentile(0.99) == 0.05
+        assert histogram.percentile(1.0) == 100.0
+        assert Histogram().percentile(0.5) is None
+        assert sum(count for _, count in histogram.to_dict()["buckets"]) == 100
+
+    def test_merge(self):
+        first = Metrics()
+        second = Metrics()
+        with first.timer("stage"):
+            pass
+        first.count("sentences", 2)
+        with second.timer("stage"):
+            pass
+        second.count("sentences", 3)
+        second.count("retries")
+
+        first.merge(second.snapshot())
+        snapshot = first.snapshot()
+        assert snapshot["timers"]["stage"]["count"] == 2
+        assert snapshot["counters"] == {"retries": 1, "sentences": 5}
+        assert snapshot["histograms"]["stage"]["count"] == 2
+
+
+class TestPipelineMetrics:
+    def setup_method(self, method):
+        self.test_dir = os.path.dirname(__file__)
+        metrics.reset()
+
+    def test_tsv_conversion_in_processes(self):
+        paths = sorted(glob.glob(os.path.join(self.test_dir, "../resources/bht-annotated/**/*.tsv"),
+                                 recursive=True))[:3]
+        competencies = convert_tsv_files_to_competencies(paths, processes=2)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"]["tsv.files"] == 3
+        assert snapshot["counters"]["tsv.sentences"] == len(competencies)
+        assert snapshot["timers"]["tsv.parse"]["count"] == 3
+        assert snapshot["timers"]["tsv.convert"]["wall_seconds"] > 0
+
+    def test_extraction(self, monkeypatch):
+        install_fakes(monkeypatch)
+        with SemgrexAnnotator(batch_size=2) as annotator:
+            annotator.annotate(["Studierende implementieren Software.",
+                                "Studierende entwerfen Systeme.", "Studierende testen."])
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"]["extract.sentences"] == 3
+        assert snapshot["counters"]["extract.batches"] == 2
+        assert snapshot["counters"]["extract.matches"] == 3
+        assert snapshot["counters"]["extract.competencies"] == 3
+        assert snapshot["timers"]["corenlp.start"]["count"] == 1
+        assert snapshot["histograms"]["corenlp.semgrex"]["count"] == 2
+        assert snapshot["timers"]["extract.convert"]["count"] == 1
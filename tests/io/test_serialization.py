@@ -0,0 +1,53 @@
+import pytest
+import json
+
+from compex.io.serialization import competencies_from_dict, competencies_to_dict, dumps, encode_competencies
+from compex.model.competency import Competency, CompetencyObject, ObjectContext, Word, WordChunk
+from compex.model.taxonomy import BloomsTaxonomyDimensionEnum
+
+
+class TestSerialization:
+    competencies = {
+        "Die Studierenden kennen die Grundlagen des \"wissenschaftlichen\" Arbeitens.": [
+            Competency(
+                Word(2, "kennen"),
+                [CompetencyObject(
+                    WordChunk([Word(4, "Grundlagen")]),
+                    [ObjectContext(WordChunk([Word(6, "wissenschaftlichen"), Word(7, "Arbeitens")]))])],
+                BloomsTaxonomyDimensionEnum.REMEMBER)
+        ],
+        "Studierende können Datenbanken modellieren und Abfragen ausführen.": [
+            Competency(Word(3, "modellieren"), [CompetencyObject(WordChunk([Word(2, "Datenbanken")]))],
+                       BloomsTaxonomyDimensionEnum.CREATE),
+            Competency(Word(6, "ausführen"))
+        ],
+        "": []
+    }
+
+    def test_output_equals_jsonpickle(self):
+        # Output of jsonpickle.encode(competencies, unpicklable=False) with taxonomy dimensions flattened to their
+        # values, as written by previous versions
+        expected = '{"Die Studierenden kennen die Grundlagen des \\"wissenschaftlichen\\" Arbeitens.": [{"word": {"index": 2, "word": "kennen"}, "objects": [{"word_chunk": {"words": [{"index": 4, "word": "Grundlagen"}]}, "contexts": [{"word_chunk": {"words": [{"index": 6, "word": "wissenschaftlichen"}, {"index": 7, "word": "Arbeitens"}]}}]}], "taxonomy_dimension": 0}], "Studierende k\\u00f6nnen Datenbanken modellieren und Abfragen ausf\\u00fchren.": [{"word": {"index": 3, "word": "modellieren"}, "objects": [{"word_chunk": {"words": [{"index": 2, "word": "Datenbanken"}]}, "contexts": []}], "taxonomy_dimension": 5}, {"word": {"index": 6, "word": "ausf\\u00fchren"}, "objects": [], "taxonomy_dimension": null}], "": []}'
+
+        assert encode_competencies(self.competencies) == expected
+
+    def test_round_trip(self):
+        result = competencies_from_dict(
+            json.loads(encode_competencies(self.competencies)))
+
+        assert list(result.keys()) == list(self.competencies.keys())
+        for sentence, competencies in self.competencies.items():
+            for competency, decoded in zip(competencies, result[sentence]):
+                assert decoded == competency
+                assert decoded.objects == competency.objects
+                assert decoded.taxonomy_dimension is competency.taxonomy_dimension
+                assert [o.contexts for o in decoded.objects] == [
+                    o.contexts for o in competency.objects]
+
+    def test_compact(self):
+        data = competencies_to_dict(self.competencies)
+
+        compact = dumps(data, compact=True)
+
+        assert compact == json.dumps(
+            data, ensure_ascii=False, separators=(",", ":"))
@@ -1,6 +1,7 @@
 import pytest
+import io
 import os
-from compex.io.tsv import TsvReader, TsvDocument, TsvSchema, LayerDefinition, LayerType, FeatureDefinition
+from compex.io.tsv import TsvReader, TsvDocument, TsvSchema, TsvSentence, TsvToken, Feature, LayerDefinition, LayerType, FeatureDefinition
 
 
 class TestTsvReader:
@@ -35,3 +36,132 @@ class TestTsvReader:
 
             assert document.sentences
             assert len(document.sentences) == 7
+
+            token = document.sentences[1].tokens[1]
+            assert (token.sentence_number, token.token_number) == (2, 2)
+            assert isinstance(token.offset_begin, int) and token.offset_begin < token.offset_end
+            assert token.token is document.sentences[0].tokens[1].token
+
+    def test_iter_tsv(self):
+        test_dir = os.path.dirname(__file__)
+        reader = TsvReader()
+        with open(os.path.join(test_dir, "../resources/test.tsv"), 'r') as tsv_file:
+            document: TsvDocument = reader.read_tsv(tsv_file)
+        with open(os.path.join(test_dir, "../resources/test.tsv"), 'r') as tsv_file:
+            read_lines = []
+
+            def lines():
+                for line in tsv_file:
+                    read_lines.append(line)
+                    yield line
+
+            sentences = reader.iter_tsv(lines())
+            first = next(sentences)
+            # Only the header and the first sentence are read
+            assert len(read_lines) < len(document.sentences[0].tokens) + 10
+            assert first.text == document.sentences[0].text
+            assert [sentence.text for sentence in sentences] == [
+                sentence.text for sentence in document.sentences[1:]]
+
+    def test_parse_features(self):
+        layer = LayerDefinition(LayerType.SPAN_LAYER, "webanno.custom.TestLayer")
+        layer.add_feature_definition("CompType")
+        layer.add_feature_definition("Other")
+        reader = TsvReader()
+
+        features = reader.parse_features(
+            ["object[1]|competency|competency", "_", ""], layer.features_definitions)
+
+        assert [(f.feature_definition.name, f.value) for f in features] == [
+            ("CompType", "object"), ("CompType", "competency"), ("CompType", "competency")]
+        assert features[0].span_index == "1"
+        # Features without span index never share a span
+        assert features[1].span_index != features[2].span_index
+        assert features[1] != features[2]
+        with pytest.raises(Exception):
+            reader.parse_features(["object[x]", "_"], layer.features_definitions)
+
+    def test_read_sub_tokens(self):
+        tsv = ("#FORMAT=WebAnno TSV 3.2\n"
+               "#T_SP=webanno.custom.TestLayer|CompType\n"
+               "#T_RL=webanno.custom.TestLayerRelation|BT_webanno.custom.TestLayer\n"
+               "\n\n"
+               "#Text=Studierende kennen Datenbanksysteme.\n"
+               "1-1\t0-11\tStudierende\t_\t_\t\n"
+               "1-2\t12-18\tkennen\tcompetency\t_\t\n"
+               "1-3\t19-36\tDatenbanksysteme.\t_\t_\t\n"
+               "1-3.1\t19-29\tDatenbank\tobject[1]\t1-2[0_1]\t\n"
+               "1-3.2\t29-35\tsysteme\tcontext[2]\t1-3.1[1_2]\t\n")
+
+        sentence = TsvReader().read_tsv(io.StringIO(tsv)).sentences[0]
+
+        sub_token = sentence.tokens[3]
+        assert sub_token.position == (1, 3, 1)
+        assert sentence.tokens[2].position == (1, 3, 0)
+        chunks = {chunk.feature.value: chunk for chunk in sentence.token_chunks.values()}
+        assert chunks["object"].tokens == [sub_token]
+        assert chunks["object"].relations == [chunks["competency"]]
+        assert chunks["context"].relations == [chunks["object"]]
+
+    def test_invalid_token_id_names_file_and_line(self, tmp_path):
+        path = tmp_path / "invalid.tsv"
+        path.write_text("#FORMAT=WebAnno TSV 3.2\n"
+                        "#T_SP=webanno.custom.TestLayer|CompType\n"
+                        "\n\n"
+                        "#Text=a\n"
+                        "1-x\t0-1\ta\t_\t\n")
+
+        with open(path) as tsv_file, pytest.raises(ValueError, match=r"line 6 of .*invalid\.tsv"):
+            TsvReader().read_tsv(tsv_file)
+
+    def test_invalid_feature_value_names_file_and_line(self, tmp_path):
+        path = tmp_path / "invalid.tsv"
+        path.write_text("#FORMAT=WebAnno TSV 3.2\n"
+                        "#T_SP=webanno.custom.TestLayer|CompType\n"
+                        "\n\n"
+                        "#Text=a b\n"
+                        "1-1\t0-1\ta\t_\t\n"
+                        "1-2\t2-3\tb\tobject[x]\t\n")
+
+        with open(path) as tsv_file, pytest.raises(ValueError, match=r"line 7 of .*invalid\.tsv"):
+            TsvReader().read_tsv(tsv_file)
+
+    def test_concurrent_readers_locate_their_own_lines(self, tmp_path):
+        header = "#FORMAT=WebAnno TSV 3.2\n#T_SP=webanno.custom.TestLayer|CompType\n\n\n"
+        valid_path = tmp_path / "valid.tsv"
+        valid_path.write_text(header + "".join(f"#Text=a\n{i}-1\t0-1\ta\t_\t\n\n" for i in range(1, 10)))
+        invalid_path = tmp_path / "invalid.tsv"
+        invalid_path.write_text(header + "#Text=a\n1-1\t0-1\ta\t_\t\n\n#Text=b\n2-x\t2-3\tb\t_\t\n")
+        reader = TsvReader()
+
+        with open(valid_path) as valid_file, open(invalid_path) as invalid_file:
+            invalid_sentences = reader.iter_tsv(invalid_file)
+            next(invalid_sentences)
+            assert len(list(reader.iter_tsv(valid_file))) == 9
+            with pytest.raises(ValueError, match=r"line 9 of .*invalid\.tsv"):
+                next(invalid_sentences)
+
+
+class TestTsvSentence:
+    def test_link_relations(self):
+        span_layer = LayerDefinition(LayerType.SPAN_LAYER, "webanno.custom.TestLayer")
+        relation_layer = LayerDefinition(LayerType.RELATION_LAYER, "webanno.custom.TestLayerRelation")
+        comp_type = FeatureDefinition("CompType", span_layer)
+        relation_type = FeatureDefinition("BT_webanno.custom.TestLayer", relation_layer)
+
+        competency = Feature(comp_type, "1", "competency")
+        obj = Feature(comp_type, "2", "object")
+        context = Feature(comp_type, "3", "context")
+        relation = Feature(relation_type, "4", "1-1")
+        context_relation = Feature(relation_type, "5", "1-2")
+        self_relation = Feature(relation_type, "6", "1-3")
+        sentence = TsvSentence("a b c", [
+            TsvToken("1", "1", "0", "1", "a", [competency]),
+            TsvToken("1", "2", "2", "3", "b", [obj, relation]),
+            TsvToken("1", "3", "4", "5", "c", [context, context_relation, self_relation])
+        ])
+
+        assert list(sentence.token_chunks.keys()) == [competency, obj, context]
+        assert sentence.token_chunks[obj].relations == [sentence.token_chunks[competency]]
+        assert sentence.token_chunks[context].relations == [sentence.token_chunks[obj]]
+        assert sentence.token_chunks[competency].relations == []
@@ -0,0 +1,75 @@
+import pytest
+import copy
+import pickle
+import tracemalloc
+
+from compex.io.tsv import TsvToken
+from compex.model.competency import Competency, CompetencyObject, ObjectContext, Word, WordChunk
+
+
+class DictWord:
+    """Dict-backed word, to compare the memory of Word with."""
+
+    def __init__(self, index: int, word: str):
+        self.index = index
+        self.word = word
+
+
+def measure(create, count=10000) -> float:
+    """Measures the memory allocated per object by create."""
+
+    tracemalloc.start()
+    try:
+        objects = [create(i) for i in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return size / count
+
+
+class TestCompetency:
+    def test_objects_have_no_dict(self):
+        word = Word(1, "kennen")
+        competency = Competency(word, [CompetencyObject(
+            WordChunk([word]), [ObjectContext(WordChunk([word]))])])
+
+        for obj in (word, competency.objects[0].word_chunk, competency.objects[0],
+                    competency.objects[0].contexts[0], competency, TsvToken(1, 1, 0, 1, "a", [])):
+            assert not hasattr(obj, "__dict__")
+        with pytest.raises(AttributeError):
+            word.text = "kennen"
+
+    def test_memory_per_word(self):
+        words = ["kennen", "verstehen", "anwenden"]
+
+        slotted = measure(lambda i: Word(i, words[i % 3]))
+        dict_backed = measure(lambda i: DictWord(i, words[i % 3]))
+
+        assert slotted < 0.8 * dict_backed
+
+    def test_words_are_interned(self):
+        word = Word(1, "".join(["ken", "nen"]))
+
+        assert word.word is Word(2, "kennen").word
+
+    def test_copy_and_pickle(self):
+        competency = Competency(Word(1, "kennen"), [CompetencyObject(
+            WordChunk([Word(2, "Grundlagen")]), [ObjectContext(WordChunk([Word(3, "des")]))])])
+
+        for copied in (copy.deepcopy(competency), pickle.loads(pickle.dumps(competency))):
+            assert copied == competency
+            assert copied.objects == competency.objects
+            assert copied.objects[0].contexts == competency.objects[0].contexts
+
+    def test_chunks_are_hashable(self):
+        chunk = WordChunk([Word(2, "Grundlagen"), Word(3, "des")])
+        same_chunk = WordChunk(iter([Word(2, "Grundlagen"), Word(3, "des")]))
+
+        assert chunk.words == (Word(2, "Grundlagen"), Word(3, "des"))
+        assert hash(chunk) == hash(same_chunk)
+        assert len({chunk, same_chunk, WordChunk([Word(2, "Grundlagen")])}) == 2
+        assert len({CompetencyObject(chunk), CompetencyObject(same_chunk)}) == 1
+        assert {ObjectContext(chunk): 1}[ObjectContext(same_chunk)] == 1
+        with pytest.raises(AttributeError):
+            chunk.words = ()
@@ -0,0 +1,89 @@
+import pytest
+import asyncio
+import json
+
+from compex.extractor.corenlp_semgrex_extractor import SemgrexAnnotator
+from compex.service.batcher import MicroBatcher
+from compex.service.server import ExtractionServer
+from tests.extractor.fakes import FakeCoreNLPClient, FakeHttpSession, install_fakes
+
+
+async def request(port: int, method: str, path: str, body: bytes = b"", content_type: str = "text/plain"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {content_type}\r\n"
+                  f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def serve(test, max_wait=0.05):
+    """Runs test with a started server, which uses a fake CoreNLP server."""
+
+    async def run():
+        with SemgrexAnnotator(batch_size=10, workers=2) as annotator:
+            server = ExtractionServer(MicroBatcher(annotator, max_wait=max_wait), port=0)
+            await server.start()
+            try:
+                await test(server)
+            finally:
+                await server.stop()
+
+    asyncio.run(run())
+
+
+class TestExtractionServer:
+    def test_concurrent_requests_are_batched(self, monkeypatch):
+        install_fakes(monkeypatch)
+
+        async def test(server):
+            responses = await asyncio.gather(*[
+                request(server.port, "POST", "/extract",
+                        "Studierende verb{}.\n".format(i).encode("utf-8"))
+                for i in range(20)])
+
+            for i, (status, body) in enumerate(responses):
+                assert status == 200
+                assert body == {"Studierende verb{}.".format(i): [{
+                    "word": {"index": 1, "word": "verb{}.".format(i)}, "objects": [], "taxonomy_dimension": None}]}
+            # Batches hold up to 10 sentences
+            assert 2 <= server.metrics()["batches"] < 20
+            assert len(FakeHttpSession.requests) == server.metrics()["batches"]
+            assert server.metrics()["requests"] == 20
+
+        serve(test, max_wait=0.2)
+        assert len(FakeCoreNLPClient.instances) == 1
+
+    def test_json_requests(self, monkeypatch):
+        install_fakes(monkeypatch)
+
+        async def test(server):
+            status, body = await request(server.port, "POST", "/extract",
+                                         json.dumps({"sentences": ["Studierende kennen.", "", "Studierende kennen."]}).encode(
+                                             "utf-8"), "application/json")
+            assert status == 200
+            assert list(body) == ["Studierende kennen."]
+
+            status, body = await request(server.port, "POST", "/extract", b"{\"sentences\": 1}", "application/json")
+            assert status == 400
+
+        serve(test, max_wait=0)
+
+    def test_health_and_metrics(self, monkeypatch):
+        install_fakes(monkeypatch)
+
+        async def test(server):
+            assert await request(server.port, "GET", "/health") == (200, {"status": "ok"})
+            await request(server.port, "POST", "/extract", b"Studierende kennen.")
+
+            status, metrics = await request(server.port, "GET", "/metrics")
+            assert status == 200
+            assert metrics["requests"] == 1
+            assert metrics["queue_depth"] == 0
+            assert metrics["latency_ms"]["p99"] > 0
+            assert (await request(server.port, "GET", "/extract"))[0] == 405
+            assert (await request(server.port, "GET", "/unknown"))[0] == 404
+
+        serve(test)
@@ -0,0 +1,129 @@
+import pytest
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from compex.__main__ import FileGlob, LazyFile, check_output_paths, extract, main
+from tests.extractor.fakes import FakeCoreNLPClient, install_fakes
+
+
+class TestFileGlob:
+    def test_files_are_opened_lazily(self, tmp_path):
+        for name in ["b.tsv", "a.tsv", "sub/c.tsv", "d.txt"]:
+            path = tmp_path / name
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(name)
+        (tmp_path / "dir.tsv").mkdir()
+
+        files = FileGlob(glob_expr="*.tsv")(str(tmp_path))
+
+        assert all(isinstance(file, LazyFile) for file in files)
+        assert [os.path.relpath(file.name, tmp_path) for file in files] == [
+            "a.tsv", "b.tsv", os.path.join("sub", "c.tsv")]
+        with files[0] as tsv_file:
+            assert tsv_file.read() == "a.tsv"
+        assert tsv_file.closed
+
+    def test_invalid_path(self, tmp_path):
+        with pytest.raises(argparse.ArgumentTypeError):
+            FileGlob()(str(tmp_path / "missing"))
+
+    def test_globs_match_glob_expr_only(self, tmp_path):
+        for name in ["a.txt", "a.json", "notes.json"]:
+            (tmp_path / name).write_text(name)
+
+        files = FileGlob(glob_expr="*.txt")(str(tmp_path / "*"))
+
+        assert [file.name for file in files] == [str(tmp_path / "a.txt")]
+        with pytest.raises(argparse.ArgumentTypeError):
+            FileGlob(glob_expr="*.txt")(str(tmp_path / "*.json"))
+        with pytest.raises(argparse.ArgumentTypeError):
+            FileGlob(glob_expr="*.tsv")(str(tmp_path))
+
+    def test_single_file_and_stdin(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+
+        assert isinstance(FileGlob()(str(tmp_path / "a.txt")), LazyFile)
+        assert FileGlob(allow_stdin=True)("-") is sys.stdin
+        with pytest.raises(argparse.ArgumentTypeError):
+            FileGlob()("-")
+
+
+class TestExtract:
+    def test_files_are_written_to_output_dir(self, tmp_path, monkeypatch):
+        install_fakes(monkeypatch)
+        (tmp_path / "input" / "sub").mkdir(parents=True)
+        (tmp_path / "input" / "a.txt").write_text(
+            "Studierende implementieren.\nStudierende entwerfen.\n")
+        (tmp_path / "input" / "sub" / "b.txt").write_text(
+            "Studierende testen.\n")
+
+        files = FileGlob(glob_expr="*.txt")(str(tmp_path / "input"))
+        extract(files, None, batch_size=2, output_dir=str(tmp_path / "output"),
+                ndjson=True, file_workers=2)
+
+        with open(tmp_path / "output" / "a.ndjson") as output:
+            assert [list(json.loads(line).keys()) for line in output] == [
+                ["Studierende implementieren."], ["Studierende entwerfen."]]
+        with open(tmp_path / "output" / "sub" / "b.ndjson") as output:
+            assert json.loads(output.read()) == {"Studierende testen.": [
+                {"word": {"index": 1, "word": "testen."}, "objects": [], "taxonomy_dimension": None}]}
+        assert len(FakeCoreNLPClient.instances) == 1
+
+    def test_single_match_of_folder_is_written_to_file(self, tmp_path, monkeypatch, capsys):
+        install_fakes(monkeypatch)
+        (tmp_path / "a.txt").write_text("Studierende implementieren.\n")
+        (tmp_path / "notes.json").write_text('["keep me"]')
+
+        extract(FileGlob(glob_expr="*.txt")(str(tmp_path / "*")), None)
+
+        assert capsys.readouterr().out == ""
+        assert "Studierende implementieren." in json.loads((tmp_path / "a.json").read_text())
+        assert (tmp_path / "notes.json").read_text() == '["keep me"]'
+
+    def test_conflicting_output_paths_raise(self, tmp_path):
+        with pytest.raises(ValueError):
+            check_output_paths([str(tmp_path / "a.txt"), str(tmp_path / "a.json")],
+                               [tmp_path / "a.json", tmp_path / "a.json"])
+        with pytest.raises(ValueError):
+            check_output_paths([str(tmp_path / "a.txt"), str(tmp_path / "a.md")],
+                               [tmp_path / "a.json", tmp_path / "a.json"])
+        assert check_output_paths([str(tmp_path / "a.txt")], [Path(tmp_path / "a.json")]) == [
+            tmp_path / "a.json"]
+
+    def test_cache_of_attached_server_requires_namespace(self, tmp_path, monkeypatch):
+        (tmp_path / "a.txt").write_text("Studierende implementieren.\n")
+        monkeypatch.setattr("sys.argv", ["compex", "extract", "--corenlpurl", "http://corenlp:9000",
+                                         "--cache", str(tmp_path / "cache.db"), str(tmp_path / "a.txt")])
+        with pytest.raises(SystemExit):
+            main()
+
+    def test_compare_pattern_shares_one_server(self, monkeypatch, capsys):
+        install_fakes(monkeypatch)
+        tsv_path = os.path.join(os.path.dirname(__file__), "resources/test.tsv")
+        monkeypatch.setattr("sys.argv", ["compex", "evaluate", "--bootstrap", "10",
+                                         "--comparepattern", "{tag:/VV.*/}=competency", tsv_path])
+
+        main()
+
+        assert "comparison" in json.loads(capsys.readouterr().out)
+        assert len(FakeCoreNLPClient.instances) == 1
+        assert FakeCoreNLPClient.instances[0].stopped
+
+    def test_metrics_are_written(self, tmp_path, monkeypatch, capsys):
+        install_fakes(monkeypatch)
+        (tmp_path / "a.txt").write_text("Studierende implementieren.\n")
+        metrics_path = tmp_path / "metrics.json"
+        monkeypatch.setattr("sys.argv", ["compex", "extract", "--metrics", str(metrics_path),
+                                         str(tmp_path / "a.txt")])
+
+        main()
+
+        assert "Studierende implementieren." in json.loads(capsys.readouterr().out)
+        with open(metrics_path) as metrics_file:
+            snapshot = json.load(metrics_file)
+        assert snapshot["counters"]["extract.sentences"] >= 1
+        assert "corenlp.semgrex" in snapshot["timers"]
+        assert "json.encode" in snapshot["histograms"]